@@ -4,8 +4,11 @@ Data aggregator for combining vehicle listings from multiple sources.
 
 from typing import Dict, List, Optional, Any, Set
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
 import logging
+import weakref
 from dataclasses import dataclass
+from functools import partial
 import sys
 from pathlib import Path
 
@@ -14,7 +17,7 @@ app_dir = Path(__file__).parent.parent
 if str(app_dir) not in sys.path:
     sys.path.insert(0, str(app_dir))
 
-from data_sources.base import VehicleDataSource, VehicleListing
+from data_sources.base import VehicleDataSource, VehicleListing, REQUEST_BUDGET
 from data_sources.cars_com import CarsDotComAPI
 from data_sources.autotrader import AutoTraderAPI
 from data_sources.cargurus import CarGurusAPI
@@ -22,6 +25,16 @@ from data_sources.auto_dev import AutoDevAPI
 
 logger = logging.getLogger(__name__)
 
+# Threads shared by all source searches; enough for a truck search's per-make
+# fan-out (5 criteria) across every source to run at once
+SEARCH_WORKERS = 16
+
+def _close_aggregator(executor: ThreadPoolExecutor, sources: List[VehicleDataSource]) -> None:
+    """Release an aggregator's pool and sessions; holds no reference to the aggregator itself."""
+    executor.shutdown(wait=False, cancel_futures=True)
+    for source in sources:
+        source.close()
+
 @dataclass
 class SearchCriteria:
     """Search criteria for vehicle listings."""
@@ -49,6 +62,14 @@ class VehicleDataAggregator:
         # Initialize available data sources
         self._initialize_sources()
         
+        # Long-lived pool for the blocking source clients, reused across searches
+        # (asyncio.run would otherwise start and join a fresh default executor per search)
+        self._executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix='vehicle-source')
+        
+        # Releases the pool and sessions when the aggregator is collected or at
+        # interpreter exit; unlike atexit.register(self.close) it does not pin the instance
+        self._finalizer = weakref.finalize(self, _close_aggregator, self._executor, self.sources)
+        
     def _initialize_sources(self):
         """Initialize all available data sources."""
         # Check if Auto.dev API key is available
@@ -93,40 +114,84 @@ class VehicleDataAggregator:
             except Exception as e:
                 logger.warning(f"Failed to initialize CarGurus: {e}")
     
+    def close(self) -> None:
+        """Stop the search threads and close every source's HTTP connections (idempotent)."""
+        self._finalizer()
+    
     def search_all_sources(self, criteria: SearchCriteria) -> List[VehicleListing]:
         """
         Search all available sources concurrently.
         Returns deduplicated and ranked results.
+        
+        Each source call is bounded by its session's REQUEST_BUDGET, so the
+        whole search takes at most about that long.
         """
         all_listings = []
         
         # Search all sources concurrently
-        with ThreadPoolExecutor(max_workers=len(self.sources)) as executor:
-            future_to_source = {
-                executor.submit(
-                    source.search_vehicles,
-                    make=criteria.make,
-                    model=criteria.model,
-                    year_min=criteria.year_min,
-                    year_max=criteria.year_max,
-                    price_min=criteria.price_min,
-                    price_max=criteria.price_max,
-                    mileage_max=criteria.mileage_max,
-                    location=criteria.location,
-                    radius=criteria.radius,
-                    limit=criteria.limit_per_source
-                ): source for source in self.sources
-            }
-            
-            for future in as_completed(future_to_source):
-                source = future_to_source[future]
-                try:
-                    listings = future.result(timeout=30)
-                    all_listings.extend(listings)
-                    logger.info(f"Retrieved {len(listings)} listings from {source.__class__.__name__}")
-                except Exception as e:
-                    logger.error(f"Error retrieving data from {source.__class__.__name__}: {e}")
+        future_to_source = {
+            self._executor.submit(source.search_vehicles, **self._search_kwargs(criteria)): source
+            for source in self.sources
+        }
+        
+        for future in as_completed(future_to_source):
+            source = future_to_source[future]
+            try:
+                listings = future.result()
+                all_listings.extend(listings)
+                logger.info(f"Retrieved {len(listings)} listings from {source.__class__.__name__}")
+            except Exception as e:
+                logger.error(f"Error retrieving data from {source.__class__.__name__}: {e}")
         
+        return self._merge_listings(all_listings, criteria)
+    
+    async def search_all_sources_async(self, criteria: SearchCriteria,
+                                       timeout: float = REQUEST_BUDGET) -> List[VehicleListing]:
+        """
+        Async variant of search_all_sources for use inside an event loop.
+        Each source gets its own timeout, so a slow source is dropped
+        instead of holding up the others.
+        
+        The default timeout is the sessions' REQUEST_BUDGET, so a request
+        that retries once is still waited for. A timeout only stops waiting:
+        the source call keeps running on its pool thread until its own
+        request timeout ends it, and its listings are discarded.
+        """
+        kwargs = self._search_kwargs(criteria)
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *[asyncio.wait_for(loop.run_in_executor(self._executor, partial(source.search_vehicles, **kwargs)), timeout)
+              for source in self.sources],
+            return_exceptions=True
+        )
+        
+        all_listings = []
+        for source, listings in zip(self.sources, results):
+            if isinstance(listings, BaseException):
+                logger.error(f"Error retrieving data from {source.__class__.__name__}: {listings!r}")
+                continue
+            all_listings.extend(listings)
+            logger.info(f"Retrieved {len(listings)} listings from {source.__class__.__name__}")
+        
+        return self._merge_listings(all_listings, criteria)
+    
+    def _search_kwargs(self, criteria: SearchCriteria) -> Dict[str, Any]:
+        """Map search criteria onto VehicleDataSource.search_vehicles arguments."""
+        return {
+            'make': criteria.make,
+            'model': criteria.model,
+            'year_min': criteria.year_min,
+            'year_max': criteria.year_max,
+            'price_min': criteria.price_min,
+            'price_max': criteria.price_max,
+            'mileage_max': criteria.mileage_max,
+            'location': criteria.location,
+            'radius': criteria.radius,
+            'limit': criteria.limit_per_source
+        }
+    
+    def _merge_listings(self, all_listings: List[VehicleListing], criteria: SearchCriteria) -> List[VehicleListing]:
+        """Deduplicate and rank listings gathered from all sources."""
         # Deduplicate based on VIN or similar vehicles
         deduplicated_listings = self._deduplicate_listings(all_listings)
         
@@ -13,7 +13,7 @@ app_dir = Path(__file__).parent.parent
 if str(app_dir) not in sys.path:
     sys.path.insert(0, str(app_dir))
 
-from data_sources.base import VehicleDataSource, VehicleListing
+from data_sources.base import VehicleDataSource, VehicleListing, REQUEST_TIMEOUT
 
 logger = logging.getLogger(__name__)
 
@@ -185,7 +185,7 @@ class AutoDevAPI(VehicleDataSource):
             response = self.session.get(
                 url,
                 params=params,
-                timeout=30
+                timeout=REQUEST_TIMEOUT
             )
             
             # Handle different response status codes
@@ -5,11 +5,50 @@ Base class and utilities for vehicle data source integrations.
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, Any
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dataclasses import dataclass
 import logging
 
 logger = logging.getLogger(__name__)
 
+# (connect, read) timeout applied to every source request
+REQUEST_TIMEOUT = (3, 10)
+
+# Retries of a failed source GET and the backoff factor between them. One
+# retry absorbs a dropped connection without multiplying a dead source's wait
+REQUEST_RETRIES = 1
+REQUEST_BACKOFF = 0.3
+
+# Worst-case seconds for one source request: every attempt spends its full
+# connect and read timeout, plus urllib3's backoff sleeps (none before the
+# first retry) and a second for DNS and parsing. Callers size their own
+# timeouts from this, so a retried request is not abandoned mid-flight
+REQUEST_BUDGET = ((REQUEST_RETRIES + 1) * sum(REQUEST_TIMEOUT)
+                  + sum(REQUEST_BACKOFF * 2 ** (attempt - 1) for attempt in range(2, REQUEST_RETRIES + 1))
+                  + 1)
+
+def create_session() -> requests.Session:
+    """Create a keep-alive session with a connection pool and retry on transient errors.
+    
+    Retry-After headers are not honoured, so a 429/503 retry stays within
+    REQUEST_BUDGET.
+    """
+    retry = Retry(
+        total=REQUEST_RETRIES,
+        backoff_factor=REQUEST_BACKOFF,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset({'GET'}),
+        respect_retry_after_header=False,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=retry)
+    
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
 @dataclass
 class VehicleListing:
     """Standardized vehicle listing data structure."""
@@ -67,7 +106,7 @@ class VehicleDataSource(ABC):
     def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
         self.api_key = api_key
         self.base_url = base_url
-        self.session = requests.Session()
+        self.session = create_session()
         
     @abstractmethod
     def search_vehicles(self, 
@@ -89,6 +128,10 @@ class VehicleDataSource(ABC):
         """Get detailed information for a specific vehicle."""
         pass
     
+    def close(self) -> None:
+        """Close the session's pooled keep-alive connections."""
+        self.session.close()
+    
     def _make_request(self, endpoint: str, params: Dict[str, Any] = None) -> Optional[Dict]:
         """Make HTTP request with error handling."""
         try:
@@ -100,7 +143,7 @@ class VehicleDataSource(ABC):
                 f"{self.base_url}/{endpoint}",
                 params=params,
                 headers=headers,
-                timeout=30
+                timeout=REQUEST_TIMEOUT
             )
             response.raise_for_status()
             return response.json()
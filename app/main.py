@@ -13,14 +13,16 @@ try:
     from app.ui.sidebar import render_sidebar
     from app.ui.results import render_results
     from app.ui.components import render_header, render_chat_interface
-    from app.models.database import init_database, get_database_manager
+    from app.models.database import init_database
+    from app.utils.db import get_shared_database_manager
 except ImportError:
     # Fallback for direct imports
     from utils.config import load_config
     from ui.sidebar import render_sidebar
     from ui.results import render_results
     from ui.components import render_header, render_chat_interface
-    from models.database import init_database, get_database_manager
+    from models.database import init_database
+    from utils.db import get_shared_database_manager
 
 # Page configuration
 st.set_page_config(
@@ -30,6 +32,12 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+@st.cache_resource(show_spinner=False)
+def _init_database_once() -> bool:
+    """Create the database tables once per process instead of on every rerun."""
+    init_database()
+    return True
+
 def main():
     """Main Streamlit application entry point."""
     
@@ -37,7 +45,7 @@ def main():
     config = load_config()
     
     # Initialize database
-    init_database()
+    _init_database_once()
     
     # Render header
     render_header()
@@ -75,7 +83,7 @@ def main():
                 # Use database search with fallback for advanced features
                 try:
                     # Get database manager first (always works)
-                    db_manager = get_database_manager()
+                    db_manager = get_shared_database_manager()
                     
                     # Get basic search results
                     search_results = db_manager.search_vehicles_by_preferences(preferences, limit=20)
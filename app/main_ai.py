@@ -4,6 +4,7 @@ Uses RAG, natural language understanding, and contextual recommendations
 """
 import streamlit as st
 import sys
+from operator import itemgetter
 from pathlib import Path
 
 # Add project root to path
@@ -11,9 +12,9 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 sys.path.insert(0, str(Path(__file__).parent))
 
-from models.database import get_database_manager
-from utils.config import load_config
-from utils.simple_rag import SimpleRAG
+from app.utils.db import get_shared_database_manager, get_vehicles_frame
+from app.utils.config import get_database_url, load_config
+from app.utils.simple_rag import SimpleRAG
 
 # Page configuration
 st.set_page_config(
@@ -23,13 +24,18 @@ st.set_page_config(
     initial_sidebar_state="collapsed"  # Hide the filter sidebar
 )
 
+@st.cache_resource(show_spinner=False)
+def get_rag_system() -> SimpleRAG:
+    """Build the retrieval corpus once and share it across reruns and sessions."""
+    return SimpleRAG(get_shared_database_manager())
+
 class CarFinderAI:
     """AI-powered car shopping assistant."""
     
     def __init__(self):
         self.config = load_config()
-        self.db_manager = get_database_manager()
-        self.rag_system = SimpleRAG(self.db_manager)
+        self.db_manager = get_shared_database_manager()
+        self.rag_system = get_rag_system()
         self.conversation_history = st.session_state.get('conversation_history', [])
         self.user_profile = st.session_state.get('user_profile', {})
         
@@ -135,7 +141,7 @@ class CarFinderAI:
                 })
             
             # Re-sort by combined score
-            enhanced_results.sort(key=lambda x: x['score'], reverse=True)
+            enhanced_results.sort(key=itemgetter('score'), reverse=True)
             return enhanced_results[:10]
         
         # Fallback to traditional filtering + AI scoring
@@ -169,7 +175,7 @@ class CarFinderAI:
                 })
             
             # Sort by AI score
-            scored_vehicles.sort(key=lambda x: x['score'], reverse=True)
+            scored_vehicles.sort(key=itemgetter('score'), reverse=True)
             
             return scored_vehicles[:10]  # Return top 10 AI-curated recommendations
     
@@ -580,21 +586,17 @@ def main():
     with st.sidebar:
         st.markdown("### 📊 Current Inventory")
         
-        # Get some quick stats
-        all_vehicles = car_ai.db_manager.search_vehicles(limit=100)
-        if all_vehicles:
-            prices = [v.price for v in all_vehicles]
+        # Get some quick stats (plain column reads, no ORM objects)
+        all_vehicles = get_vehicles_frame(get_database_url(car_ai.config), ('make', 'price'), limit=100)
+        if not all_vehicles.empty:
+            prices = all_vehicles['price']
             
             st.metric("Total Vehicles", len(all_vehicles))
-            st.metric("Price Range", f"${min(prices):,} - ${max(prices):,}")
+            st.metric("Price Range", f"${prices.min():,} - ${prices.max():,}")
             
             # Make distribution
-            makes = {}
-            for v in all_vehicles:
-                makes[v.make] = makes.get(v.make, 0) + 1
-            
             st.markdown("**Top Makes:**")
-            for make, count in sorted(makes.items(), key=lambda x: x[1], reverse=True)[:5]:
+            for make, count in all_vehicles['make'].value_counts().head(5).items():
                 st.write(f"• {make}: {count}")
 
 if __name__ == "__main__":
@@ -7,42 +7,563 @@ import streamlit as st
 import sys
 from pathlib import Path
 
-# Add the app directory to Python path for imports
+# Add the app directory to Python path for imports; the project root too,
+# for modules imported through the app package (SimpleRAG)
 app_dir = Path(__file__).parent
+sys.path.insert(0, str(app_dir.parent))
 sys.path.insert(0, str(app_dir))
 
 try:
     from utils.config import load_config, get_database_url
     from models.database import DatabaseManager
-    from utils.simple_rag import SimpleRAG
+    from app.utils.simple_rag import SimpleRAG
     from agents.conversation import ConversationState, ConversationAgent
-    import json
+    import asyncio
     import re
-    from datetime import datetime
+    import html
+    import threading
+    import time
+    from functools import lru_cache
     import logging
+    import numpy as np
     
     # Import vehicle data service with fixed imports
-    from services.vehicle_data import VehicleDataService
+    from services.vehicle_data import VehicleDataService, parse_features
     
     # Configure logging
-    logging.basicConfig(level=logging.INFO)
+    logging.basicConfig(level=load_config().get('log_level', 'INFO').upper())
     logger = logging.getLogger(__name__)
     
 except ImportError as e:
     st.error(f"Import error: {e}")
     st.stop()
 
+class _KeywordMatcher:
+    """Multi-keyword substring matcher that reports every category hit in one scan.
+    
+    All keywords are compiled into a single zero-width lookahead alternation
+    (longest first), so ``finditer`` visits each position where any keyword
+    starts, including overlapping ones. A keyword also carries the categories
+    of any shorter keywords it begins with, so nothing is lost when the
+    longest keyword wins at a position.
+    """
+    
+    def __init__(self, categories):
+        owners = {}
+        for category, keywords in categories:
+            for keyword in keywords:
+                owners.setdefault(keyword, set()).add(category)
+        self._categories = {
+            keyword: frozenset().union(*(cats for other, cats in owners.items() if keyword.startswith(other)))
+            for keyword in owners
+        }
+        alternation = '|'.join(map(re.escape, sorted(owners, key=len, reverse=True)))
+        self._pattern = re.compile(f'(?=({alternation}))')
+    
+    def categories(self, text: str) -> set:
+        """Return the set of categories with at least one keyword in ``text``."""
+        hits = set()
+        for match in self._pattern.finditer(text):
+            hits |= self._categories[match.group(1)]
+        return hits
+
+
+# Free-text preference patterns (see extract_preferences_from_text).
+# Budget patterns stay separate because they are tried in priority order:
+# an explicit "budget" figure beats an "under"/"max" figure or a bare "$".
+_BUDGET_RES = tuple(re.compile(pattern) for pattern in (
+    r'budget.*?(\d+(?:,\d+)*(?:\.\d+)?)[k]?',
+    r'under.*?(\d+(?:,\d+)*(?:\.\d+)?)[k]?',
+    r'max.*?(\d+(?:,\d+)*(?:\.\d+)?)[k]?',
+    r'\$(\d+(?:,\d+)*(?:\.\d+)?)[k]?'
+))
+_WHITESPACE_RE = re.compile(r'\s+')
+_YEAR_RE = re.compile(r'(20\d{2})')
+_MILEAGE_RE = re.compile(r'under\s+(\d+(?:,\d+)*)\s*miles')
+
+_MAKES = ('toyota', 'honda', 'ford', 'chevrolet', 'nissan', 'hyundai', 'kia', 'subaru', 'mazda', 'volkswagen', 'bmw', 'mercedes', 'audi', 'lexus', 'acura', 'infiniti', 'tesla', 'jeep', 'dodge', 'chrysler')
+_MAKE_RE = re.compile(r'\b(' + '|'.join(map(re.escape, _MAKES)) + r')\b')
+
+# Vehicle types in priority order; the first type with any keyword hit wins
+_VEHICLE_TYPES = ('truck', 'suv', 'sedan', 'coupe', 'hatchback', 'wagon')
+
+# Every substring keyword category used by extract_preferences_from_text
+_PREFERENCE_KEYWORDS = _KeywordMatcher([
+    ('fuel_hint', ['hybrid', 'electric', 'ev', 'prius']),
+    ('electric', ['electric', 'ev', 'tesla']),
+    ('newer', ['new', 'newer', 'recent', 'latest']),
+    ('low_mileage', ['low mileage', 'few miles', 'barely driven']),
+    ('truck', ['truck', 'pickup', 'pickup truck', 'pick-up', 'f-150', 'silverado', 'ram', 'tacoma', 'tundra', 'sierra']),
+    ('suv', ['suv', 'sport utility', 'crossover', 'suburban', 'tahoe', 'explorer', 'pilot', 'highlander']),
+    ('sedan', ['sedan', 'car', 'four-door', '4-door']),
+    ('coupe', ['coupe', 'two-door', '2-door', 'sports car']),
+    ('hatchback', ['hatchback', 'hatch']),
+    ('wagon', ['wagon', 'estate'])
+])
+
+# Scoring keyword tables (see _score_batch)
+_TRUCK_ONLY_MAKES = frozenset({'ram'})  # Ram only makes trucks
+_MODEL_KEYWORDS = _KeywordMatcher([
+    ('truck', ['f-150', 'f150', 'silverado', 'sierra', 'tacoma', 'tundra', 'ram', 'frontier', 'ranger', 'colorado', 'canyon', 'ridgeline', 'truck']),
+    ('suv', ['suburban', 'tahoe', 'explorer', 'pilot', 'highlander', 'cr-v', 'rav4', 'escape', 'edge'])
+])
+_CRITICAL_FIELDS = ('mileage', 'mpg_city', 'mpg_highway', 'year')
+
+# Model classification bits (see _model_flags)
+_TRUCK_MODEL = 1
+_SUV_MODEL = 2
+
+
+@lru_cache(maxsize=4096)
+def _model_flags(model: str) -> int:
+    """Classify a case-folded model name as truck and/or SUV, once per distinct model."""
+    hits = _MODEL_KEYWORDS.categories(model)
+    return (_TRUCK_MODEL if 'truck' in hits else 0) | (_SUV_MODEL if 'suv' in hits else 0)
+
+
+# Numeric vehicle fields gathered into one (fields x vehicles) array per batch
+_NUMERIC_FIELDS = ('price', 'year', 'mileage', 'safety_rating', 'mpg_city', 'mpg_highway')
+
+
+def _make_lc(vehicle: dict) -> str:
+    """Case-folded make, precomputed by VehicleDataService when available."""
+    make = vehicle.get('_make_lc')
+    return make if make is not None else (vehicle.get('make') or '').casefold()
+
+
+def _model_lc(vehicle: dict) -> str:
+    """Case-folded model, precomputed by VehicleDataService when available."""
+    model = vehicle.get('_model_lc')
+    return model if model is not None else (vehicle.get('model') or '').casefold()
+
+
+def _numeric_columns(vehicles: list) -> np.ndarray:
+    """Gather the numeric fields of all vehicles in one pass; missing/falsy values become NaN."""
+    rows = [[v.get(field) or np.nan for field in _NUMERIC_FIELDS] for v in vehicles]
+    return np.array(rows, dtype=np.float64).reshape(len(vehicles), len(_NUMERIC_FIELDS)).T
+
+
+def _hard_reject_mask(vehicles: list, preferences: dict) -> np.ndarray:
+    """Flag vehicles priced at more than twice the budget; these are never worth scoring."""
+    budget_max = preferences.get('budget_max')
+    if not budget_max:
+        return np.zeros(len(vehicles), dtype=bool)
+    price = np.fromiter((v.get('price') or 0 for v in vehicles), dtype=np.float64, count=len(vehicles))
+    return price > 2 * budget_max
+
+
+def _score_batch(vehicles: list, preferences: dict) -> np.ndarray:
+    """Calculate AI compatibility scores for a whole result set in one vectorized pass."""
+    n = len(vehicles)
+    price, year, mileage, safety, mpg_city, mpg_highway = _numeric_columns(vehicles)
+    score = np.zeros(n)
+    
+    # Case-folded makes, built once and shared by the type and make checks
+    makes = None
+    
+    # Budget compatibility (30 points)
+    budget_max = preferences.get('budget_max')
+    if budget_max:
+        score += np.where(price <= budget_max, (1 - price / budget_max) * 30, 0.0)
+    
+    # Vehicle type preference (25 points) - CRITICAL for truck vs sedan distinction
+    vehicle_type = preferences.get('vehicle_type')
+    if vehicle_type:
+        vehicle_type_requested = vehicle_type.lower()
+        if vehicle_type_requested in ('truck', 'suv'):
+            model_flags = np.fromiter((_model_flags(_model_lc(v)) for v in vehicles), dtype=np.uint8, count=n)
+            if vehicle_type_requested == 'truck':
+                makes = np.array([_make_lc(v) for v in vehicles])
+                # Truck-only makes OR truck-specific model keywords
+                matched = np.isin(makes, list(_TRUCK_ONLY_MAKES)) | (model_flags & _TRUCK_MODEL).astype(bool)
+                score += np.where(matched, 25.0, -15.0)  # Penalty for wrong type (sedan when asking for truck)
+            else:
+                matched = (model_flags & _SUV_MODEL).astype(bool)
+                score += np.where(matched, 25.0, -10.0)
+        
+        # Log vehicle type matches for monitoring (high-scoring matches only)
+        if logger.isEnabledFor(logging.DEBUG):
+            for i in np.flatnonzero(score > 20):
+                vehicle = vehicles[i]
+                logger.debug("High match: %s preference → %s %s (Score: %.1f)",
+                             vehicle_type, vehicle.get('make'), vehicle.get('model'), score[i])
+    
+    # Make preference (20 points)
+    make = preferences.get('make')
+    if make:
+        if makes is None:
+            makes = np.array([_make_lc(v) for v in vehicles])
+        score += (makes == make.casefold()) * 20.0
+    
+    # Fuel type preference (15 points)
+    fuel_type = preferences.get('fuel_type')
+    if fuel_type:
+        score += np.fromiter((v.get('fuel_type') == fuel_type for v in vehicles), dtype=bool, count=n) * 15.0
+    
+    # Year preference (15 points)
+    year_min = preferences.get('year_min')
+    if year_min:
+        score += np.where(year >= year_min, np.minimum(15, (year - year_min + 1) * 3), 0.0)
+    
+    # Mileage preference (10 points)
+    mileage_max = preferences.get('mileage_max') or 100000
+    score += np.where(mileage <= mileage_max, (1 - mileage / mileage_max) * 10, 0.0)
+    
+    # Safety rating bonus (10 points)
+    score += np.nan_to_num(safety / 5 * 10)
+    
+    # Data completeness penalty - 10 points per missing critical field,
+    # plus 15 extra for vehicles missing three or more
+    missing = np.isnan(np.vstack([mileage, mpg_city, mpg_highway, year]))
+    missing_count = missing.sum(axis=0)
+    penalty = missing_count * 10 + np.where(missing_count >= 3, 15, 0)
+    
+    # Apply penalty but don't let score go below 0
+    score = np.maximum(0, score - penalty)
+    
+    # Log data completeness issues for vehicles with missing data
+    if logger.isEnabledFor(logging.DEBUG):
+        for i in np.flatnonzero(penalty):
+            vehicle = vehicles[i]
+            missing_fields = [field for field, gap in zip(_CRITICAL_FIELDS, missing[:, i]) if gap]
+            logger.debug("Data completeness check: %s %s - Missing: %s (Penalty: -%d, Final Score: %.1f)",
+                         vehicle.get('make'), vehicle.get('model'), missing_fields, penalty[i], score[i])
+    
+    return np.minimum(score, 100.0)
+
+
+# Number of ranked vehicles kept per chat message (top pick + 5 more options)
+_TOP_K = 6
+
+# Chat history limits: total entries kept, and how many recent assistant
+# turns keep their vehicle payload (older turns render from cached HTML)
+_MAX_HISTORY = 40
+_VEHICLE_TURNS = 3
+
+# Assistant turns whose vehicle cards are drawn by default
+_CARD_TURNS = 5
+
+# Listing sources counted as live market data; cards also badge Auto.dev listings as live
+_LIVE_SOURCES = frozenset({'cars.com', 'autotrader', 'cargurus'})
+_LIVE_CARD_SOURCES = _LIVE_SOURCES | {'auto.dev'}
+
+# Fixed chat replies, joined once at import (see _generate_response)
+_ALL_FILTERED_RESPONSE = (
+    "❌ **I found vehicles matching your search criteria, but they all had incomplete data (missing mileage, MPG, etc.) so I filtered them out for quality.**\n\n"
+    "💡 **Try:**\n"
+    "- Adjusting your search criteria\n"
+    "- Looking for different makes/models\n"
+    "- Expanding your budget or mileage range\n\n"
+    "The live data sources sometimes have incomplete listings - this filtering protects you from making decisions without key information!"
+)
+_OVER_BUDGET_RESPONSE = (
+    "💸 **I found vehicles matching your search, but they were all priced at more than twice your budget, so I left them out.**\n\n"
+    "💡 **Try:**\n"
+    "- Raising your budget\n"
+    "- Looking at older model years or higher-mileage vehicles\n"
+    "- Considering more affordable makes/models"
+)
+_FOLLOW_UP_PROMPT = "❓ **Questions? Want details?** Ask me anything about these vehicles - maintenance costs, insurance estimates, feature comparisons, or how they'd fit your specific lifestyle!"
+_NO_MATCH_LIVE_RESPONSE = (
+    "🤔 **Hmm, I'm having trouble finding the perfect match** for your specific requirements in our current inventory.\n\n"
+    "**💡 Here are a few suggestions:**\n"
+    "• Try expanding your budget range\n"
+    "• Consider different makes or models\n"
+    "• Adjust your year or mileage preferences\n\n"
+    "Tell me more about what's most important to you, and I'll help find alternatives!"
+)
+_NO_MATCH_RESPONSE = _NO_MATCH_LIVE_RESPONSE.replace(
+    "Tell me more",
+    "💡 **Tip:** Enable 'Live Data' above to search current market listings from multiple sources!\n\nTell me more"
+)
+_GREETING_RESPONSE = (
+    "👋 **Hello! I'm your AI car shopping assistant.** I can help you find the perfect vehicle based on your needs and budget.\n\n"
+    "**To get started, tell me:**\n"
+    "• Your budget range\n"
+    "• Preferred make or model (if any)\n"
+    "• Type of driving you do most\n"
+    "• Any specific features you want\n\n"
+    "*For example: 'I need a reliable SUV under $30,000 for family trips' or 'Looking for a fuel-efficient car around $25k'*"
+)
+
+
+@st.cache_resource
+def _card_html_store():
+    """Card markup cache and its lock; module globals are rebuilt on every rerun."""
+    return {}, threading.Lock()
+
+
+# Rendered card markup shared across reruns and sessions, keyed by listing
+# identity plus everything else that changes the card (see _card_html)
+_CARD_HTML_CACHE, _card_html_lock = _card_html_store()
+_CARD_HTML_CACHE_SIZE = 512
+
+
+def _card_html(vehicle: dict, ai_score: float = None, is_top_pick: bool = False, budget_max: float = 0) -> str:
+    """Return the markup for one vehicle card, formatting it only on first use."""
+    vehicle_id = vehicle.get('id') or vehicle.get('external_id') or vehicle.get('vin')
+    if not vehicle_id:
+        return _build_card_html(vehicle, ai_score, is_top_pick, budget_max)
+    
+    key = (vehicle.get('source'), vehicle_id, vehicle.get('price'),
+           None if ai_score is None else round(ai_score), is_top_pick, budget_max)
+    card = _CARD_HTML_CACHE.get(key)
+    if card is None:
+        card = _build_card_html(vehicle, ai_score, is_top_pick, budget_max)
+        with _card_html_lock:
+            if len(_CARD_HTML_CACHE) >= _CARD_HTML_CACHE_SIZE:
+                _CARD_HTML_CACHE.pop(next(iter(_CARD_HTML_CACHE)))  # Evict oldest
+            _CARD_HTML_CACHE[key] = card
+    return card
+
+
+def _build_card_html(vehicle: dict, ai_score: float, is_top_pick: bool, budget_max: float) -> str:
+    """Build the complete markup for one vehicle card as a single HTML string."""
+    esc = html.escape
+    
+    # Card style comes from the page stylesheet (see main)
+    card_class = "cf-card cf-top" if is_top_pick else "cf-card"
+    
+    # Header with title and source
+    title = esc(f"{vehicle.get('year', 'N/A')} {vehicle.get('make', 'Unknown')} {vehicle.get('model', 'Unknown')}")
+    if is_top_pick:
+        header = f"<h2>🏆 {title}</h2><p><strong>🎯 AI TOP RECOMMENDATION</strong></p>"
+    else:
+        header = f"<h3>{title}</h3>"
+    
+    source = vehicle.get('source', 'local')
+    if source in _LIVE_CARD_SOURCES:
+        badge = f"<strong>🌐 LIVE</strong><br><small>from {esc(source)}</small>"
+    else:
+        badge = "<strong>📱 LOCAL</strong>"
+    if ai_score is not None:
+        badge += f"<br><small>🤖 AI Match</small><br><strong>{ai_score:.0f}%</strong>"
+    
+    # Key metrics, each formatted once
+    price = vehicle.get('price')
+    if price:
+        savings = budget_max - price if budget_max > 0 else 0
+        price_text = f"${price:,}"
+        if savings > 5000:
+            price_text += f" <small>(${savings:,} saved!)</small>"
+    else:
+        price_text = "Contact Dealer"
+    
+    mileage_text = f"{vehicle['mileage']:,} mi" if vehicle.get('mileage') else "N/A"
+    
+    mpg_text = "N/A"
+    if vehicle.get('mpg_city') and vehicle.get('mpg_highway'):
+        mpg_text = f"{vehicle['mpg_city']}/{vehicle['mpg_highway']}"
+    elif vehicle.get('fuel_type') == 'Electric':
+        mpg_text = "Electric"
+    
+    safety = vehicle.get('safety_rating')
+    safety_text = "⭐" * int(safety) if safety else "Not Rated"
+    
+    metrics = "".join(
+        f'<div><small>{label}</small><br><strong>{value}</strong></div>'
+        for label, value in (("💰 Price", price_text), ("🚗 Mileage", mileage_text),
+                             ("⛽ MPG", mpg_text), ("🛡️ Safety", safety_text))
+    )
+    
+    parts = [
+        f'<div class="{card_class}">',
+        f'<div class="cf-card-header"><div>{header}</div><div class="cf-badge">{badge}</div></div>',
+        f'<div class="cf-metrics">{metrics}</div>',
+    ]
+    
+    # Description and features
+    if vehicle.get('description'):
+        parts.append(f"<p><strong>📝 Description:</strong> {esc(str(vehicle['description']))}</p>")
+    
+    features = parse_features(vehicle.get('features'))
+    if features:
+        items = "".join(f"<div>• {esc(str(feature))}</div>" for feature in features[:6])  # Show max 6 features
+        parts.append(f'<p><strong>✨ Key Features:</strong></p>'
+                     f'<div class="cf-features">{items}</div>')
+    
+    # Contact information for live listings
+    if vehicle.get('dealer_name') or vehicle.get('listing_url'):
+        contact = []
+        if vehicle.get('dealer_name'):
+            contact.append(f"<strong>Dealer:</strong> {esc(vehicle['dealer_name'])}")
+        if vehicle.get('dealer_phone'):
+            contact.append(f"<strong>Phone:</strong> {esc(vehicle['dealer_phone'])}")
+        if vehicle.get('listing_url'):
+            contact.append(f'<a href="{esc(vehicle["listing_url"])}" target="_blank">🔗 View Full Listing</a>')
+        if vehicle.get('location'):
+            contact.append(f"<strong>Location:</strong> {esc(vehicle['location'])}")
+        parts.append(f"<details><summary>📞 Contact &amp; Details</summary>{'<br>'.join(contact)}</details>")
+    
+    parts.append("</div>")
+    return "".join(parts)
+
+
+def _message_html(vehicles: list, budget_max: float = 0) -> str:
+    """Build the card block for a chat message: top pick plus up to 5 more options."""
+    top_vehicle, top_score = vehicles[0]
+    parts = [_card_html(top_vehicle, top_score, is_top_pick=True, budget_max=budget_max)]
+    if len(vehicles) > 1:
+        parts.append("<h3>🔍 Other Great Options</h3>")
+        parts.extend(_card_html(vehicle, score, budget_max=budget_max) for vehicle, score in vehicles[1:6])
+    return "".join(parts)
+
+
+def _normalize_prompt(user_input: str) -> str:
+    """Lower-case a message and collapse whitespace so equivalent prompts share cache entries."""
+    return _WHITESPACE_RE.sub(' ', user_input.strip().lower())
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _extract_preferences(text: str) -> dict:
+    """Extract preferences from a normalized message (see _normalize_prompt)."""
+    preferences = {}
+    
+    # Extract budget (patterns are tried in priority order)
+    for pattern in _BUDGET_RES:
+        match = pattern.search(text)
+        if match:
+            budget_str = match.group(1).replace(',', '')
+            budget = float(budget_str)
+            if 'k' in match.group(0) or budget < 1000:
+                budget *= 1000
+            preferences['budget_max'] = budget
+            break
+    
+    # Extract make/model
+    make_match = _MAKE_RE.search(text)
+    if make_match:
+        preferences['make'] = make_match.group(1).title()
+    
+    # All keyword categories in one scan
+    hits = _PREFERENCE_KEYWORDS.categories(text)
+    
+    # Extract fuel type
+    if 'fuel_hint' in hits:
+        if 'electric' in hits:
+            preferences['fuel_type'] = 'Electric'
+        else:
+            preferences['fuel_type'] = 'Hybrid'
+    
+    # Extract year preferences
+    year_match = _YEAR_RE.search(text)
+    if year_match:
+        preferences['year_min'] = int(year_match.group(1))
+    
+    if 'newer' in hits:
+        preferences['year_min'] = 2020
+    
+    # Extract mileage preferences
+    if 'low_mileage' in hits:
+        preferences['mileage_max'] = 30000
+    
+    # Extract specific mileage numbers
+    mileage_match = _MILEAGE_RE.search(text)
+    if mileage_match:
+        mileage_str = mileage_match.group(1).replace(',', '')
+        preferences['mileage_max'] = int(mileage_str)
+    
+    # Extract vehicle type (CRITICAL for truck detection)
+    for vehicle_type in _VEHICLE_TYPES:
+        if vehicle_type in hits:
+            preferences['vehicle_type'] = vehicle_type
+            break
+    
+    # Debug logging
+    if preferences:
+        logger.info("Extracted preferences: %s", preferences)
+    
+    return preferences
+
+
+def _preferences_key(preferences: dict) -> tuple:
+    """Hashable, order-independent key for a preferences dict (list values become tuples)."""
+    return tuple(sorted(
+        (key, tuple(value) if isinstance(value, list) else value)
+        for key, value in preferences.items()
+    ))
+
+
+# Representative inputs for _warm_up
+_WARMUP_VEHICLES = [
+    {'make': 'Ford', 'model': 'F-150', 'year': 2020, 'price': 32000, 'mileage': 40000,
+     'fuel_type': 'Gasoline', 'safety_rating': 5, 'mpg_city': 20, 'mpg_highway': 26},
+    {'make': 'Toyota', 'model': 'RAV4', 'year': 2021, 'price': 28000, 'mileage': None,
+     'fuel_type': 'Hybrid', 'safety_rating': 4, 'mpg_city': 41, 'mpg_highway': 38}
+]
+_WARMUP_PREFERENCES = ({'budget_max': 35000, 'vehicle_type': 'truck', 'make': 'Ford', 'fuel_type': 'Hybrid',
+                        'year_min': 2018, 'mileage_max': 60000},
+                       {'budget_max': 35000, 'vehicle_type': 'suv'})
+
+
+def _warm_up():
+    """Run the keyword matcher and scoring path once so their first-call
+    costs (NumPy ufunc dispatch and lazy setup) are paid at startup rather
+    than on the first chat message."""
+    _PREFERENCE_KEYWORDS.categories('warm up: a newer hybrid pickup truck with low mileage')
+    for preferences in _WARMUP_PREFERENCES:
+        scores = _score_batch(_WARMUP_VEHICLES, preferences)
+        np.argpartition(-scores, 0)
+        _hard_reject_mask(_WARMUP_VEHICLES, preferences)
+
+
+# How long search results (and responses built from them) may be reused
+_SEARCH_TTL = 120  # seconds
+
+
+@st.cache_data(ttl=_SEARCH_TTL, max_entries=64, show_spinner=False)
+def _cached_hybrid_search(_vehicle_service, preferences_key: tuple, use_live_data: bool) -> list:
+    """Hybrid search memoized on the preference set and data mode."""
+    return _vehicle_service.search_vehicles_hybrid(dict(preferences_key), use_live_data=use_live_data,
+                                                   limit=CarFinderAI.MAX_RESULTS)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_data_source_status(_vehicle_service) -> dict:
+    """Data source status, shared by the status panel and sidebar between reruns."""
+    return _vehicle_service.get_data_source_status()
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _cached_response(_app: "CarFinderAI", preferences_key: tuple, use_live_data: bool, generation: tuple):
+    """Memoized response and ranked vehicles for a preference set.
+    
+    ``use_live_data`` and ``generation`` only take part in the cache key;
+    the generation changes on every live-data refresh and every search TTL
+    window so cached responses never outlive the search results behind them.
+    """
+    return _app._generate_response(dict(preferences_key))
+
+
+@st.cache_resource(show_spinner=False)
+def _init_database(_db_manager, database_url: str) -> bool:
+    """Create the database tables once per process and database URL."""
+    _db_manager.init_database()
+    return True
+
+
 class CarFinderAI:
+    """Chat application. One instance is shared by all sessions (see get_app);
+    per-user state lives in st.session_state."""
+    
+    # Results requested per search; scoring only ever keeps the top _TOP_K
+    MAX_RESULTS = 20
+    
+    # Bumped on the shared instance whenever live data is refreshed (see _response_generation)
+    _refresh_generation = 0
+    
     def __init__(self):
         self.config = load_config()
         database_url = get_database_url(self.config)
         self.db_manager = DatabaseManager(database_url)
-        self.db_manager.init_database()  # Initialize database tables
+        _init_database(self.db_manager, database_url)
         self.vehicle_service = VehicleDataService()
-        self.rag = SimpleRAG(self.db_manager)
+        self.rag = SimpleRAG(self.db_manager, database_url)
         self.conversation_agent = ConversationAgent(self.config)
-        
-        # Initialize session state
+        _warm_up()
+    
+    def init_session_state(self):
+        """Initialize per-session state; called on every rerun."""
         if 'chat_history' not in st.session_state:
             st.session_state.chat_history = []
         if 'conversation' not in st.session_state:
@@ -51,6 +572,15 @@ class CarFinderAI:
             st.session_state.preferences = {}
         if 'use_live_data' not in st.session_state:
             st.session_state.use_live_data = True  # Enable live data for real-time listings
+        if 'rendered_html' not in st.session_state:
+            st.session_state.rendered_html = {}  # message id -> (budget_max, card HTML)
+        if 'message_counter' not in st.session_state:
+            st.session_state.message_counter = 0
+    
+    def _next_message_id(self) -> int:
+        """Return a monotonically increasing id for a chat history entry."""
+        st.session_state.message_counter += 1
+        return st.session_state.message_counter
     
     def render_header(self):
         """Render the application header with live data toggle."""
@@ -81,7 +611,7 @@ class CarFinderAI:
     def show_data_source_status(self):
         """Show data source status in a modal-like display."""
         with st.expander("🔍 Data Source Status", expanded=True):
-            status = self.vehicle_service.get_data_source_status()
+            status = _cached_data_source_status(self.vehicle_service)
             
             # Local database status
             st.subheader("📱 Local Database")
@@ -101,8 +631,11 @@ class CarFinderAI:
             with col2:
                 if st.button("🔄 Refresh Live Data"):
                     with st.spinner("Refreshing live data..."):
-                        refresh_result = self.vehicle_service.refresh_live_data()
+                        refresh_result = asyncio.run(self.vehicle_service.refresh_live_data_async())
                         if refresh_result['success']:
+                            _cached_data_source_status.clear()  # Vehicle count changed
+                            _cached_hybrid_search.clear()
+                            self._refresh_generation += 1
                             st.success(f"✅ Added {refresh_result['new_listings']} new listings")
                         else:
                             st.error(f"❌ Error: {refresh_result['error']}")
@@ -116,87 +649,17 @@ class CarFinderAI:
     
     def extract_preferences_from_text(self, user_input: str) -> dict:
         """Extract vehicle preferences from natural language input."""
-        preferences = {}
-        text = user_input.lower()
-        
-        # Extract budget
-        budget_patterns = [
-            r'budget.*?(\d+(?:,\d+)*(?:\.\d+)?)[k]?',
-            r'under.*?(\d+(?:,\d+)*(?:\.\d+)?)[k]?',
-            r'max.*?(\d+(?:,\d+)*(?:\.\d+)?)[k]?',
-            r'\$(\d+(?:,\d+)*(?:\.\d+)?)[k]?'
-        ]
-        
-        for pattern in budget_patterns:
-            match = re.search(pattern, text)
-            if match:
-                budget_str = match.group(1).replace(',', '')
-                budget = float(budget_str)
-                if 'k' in match.group(0) or budget < 1000:
-                    budget *= 1000
-                preferences['budget_max'] = budget
-                break
-        
-        # Extract make/model
-        makes = ['toyota', 'honda', 'ford', 'chevrolet', 'nissan', 'hyundai', 'kia', 'subaru', 'mazda', 'volkswagen', 'bmw', 'mercedes', 'audi', 'lexus', 'acura', 'infiniti', 'tesla', 'jeep', 'dodge', 'chrysler']
-        for make in makes:
-            if make in text:
-                preferences['make'] = make.title()
-                break
-        
-        # Extract fuel type
-        if any(word in text for word in ['hybrid', 'electric', 'ev', 'prius']):
-            if 'electric' in text or 'ev' in text or 'tesla' in text:
-                preferences['fuel_type'] = 'Electric'
-            else:
-                preferences['fuel_type'] = 'Hybrid'
-        
-        # Extract year preferences
-        year_match = re.search(r'(20\d{2})', text)
-        if year_match:
-            preferences['year_min'] = int(year_match.group(1))
-        
-        if any(word in text for word in ['new', 'newer', 'recent', 'latest']):
-            preferences['year_min'] = 2020
-        
-        # Extract mileage preferences
-        if any(word in text for word in ['low mileage', 'few miles', 'barely driven']):
-            preferences['mileage_max'] = 30000
-            
-        # Extract specific mileage numbers
-        mileage_match = re.search(r'under\s+(\d+(?:,\d+)*)\s*miles', text)
-        if mileage_match:
-            mileage_str = mileage_match.group(1).replace(',', '')
-            preferences['mileage_max'] = int(mileage_str)
-        
-        # Extract vehicle type (CRITICAL for truck detection)
-        vehicle_type_keywords = {
-            'truck': ['truck', 'pickup', 'pickup truck', 'pick-up', 'f-150', 'silverado', 'ram', 'tacoma', 'tundra', 'sierra'],
-            'suv': ['suv', 'sport utility', 'crossover', 'suburban', 'tahoe', 'explorer', 'pilot', 'highlander'],
-            'sedan': ['sedan', 'car', 'four-door', '4-door'],
-            'coupe': ['coupe', 'two-door', '2-door', 'sports car'],
-            'hatchback': ['hatchback', 'hatch'],
-            'wagon': ['wagon', 'estate']
-        }
-        
-        for vehicle_type, keywords in vehicle_type_keywords.items():
-            if any(keyword in text for keyword in keywords):
-                preferences['vehicle_type'] = vehicle_type
-                break
-        
-        # Debug logging
-        if preferences:
-            logger.info(f"Extracted preferences: {preferences}")
-        
-        return preferences
+        return dict(_extract_preferences(_normalize_prompt(user_input)))
     
     def intelligent_vehicle_search(self, preferences: dict) -> list:
         """Perform intelligent vehicle search using hybrid data sources."""
         try:
-            # Use the vehicle service for hybrid search
-            search_results = self.vehicle_service.search_vehicles_hybrid(
-                preferences, 
-                use_live_data=st.session_state.use_live_data
+            # Use the vehicle service for hybrid search; repeated turns with the
+            # same preferences reuse the previous result for a couple of minutes
+            search_results = _cached_hybrid_search(
+                self.vehicle_service,
+                _preferences_key(preferences),
+                st.session_state.use_live_data
             )
             
             return search_results
@@ -207,217 +670,11 @@ class CarFinderAI:
     
     def calculate_ai_score(self, vehicle: dict, preferences: dict) -> float:
         """Calculate AI compatibility score for a vehicle."""
-        score = 0.0
-        max_score = 100.0
-        
-        # Budget compatibility (30 points)
-        if preferences.get('budget_max') and vehicle.get('price'):
-            if vehicle['price'] <= preferences['budget_max']:
-                budget_efficiency = 1 - (vehicle['price'] / preferences['budget_max'])
-                score += budget_efficiency * 30
-        
-        # Vehicle type preference (25 points) - CRITICAL for truck vs sedan distinction
-        if preferences.get('vehicle_type'):
-            vehicle_type_requested = preferences['vehicle_type'].lower()
-            vehicle_make = vehicle.get('make', '').lower()
-            vehicle_model = vehicle.get('model', '').lower()
-            
-            # Check if vehicle matches requested type
-            if vehicle_type_requested == 'truck':
-                # Only truck-exclusive makes (Ram only makes trucks)
-                truck_only_makes = ['ram']  
-                # Truck-specific model keywords
-                truck_models = ['f-150', 'f150', 'silverado', 'sierra', 'tacoma', 'tundra', 'ram', 'frontier', 'ranger', 'colorado', 'canyon', 'ridgeline', 'truck']
-                
-                # Check for truck-only makes OR truck-specific model keywords
-                make_match = vehicle_make in truck_only_makes
-                model_match = any(model in vehicle_model for model in truck_models)
-                
-                if make_match or model_match:
-                    score += 25  # Big bonus for being the right vehicle type
-                else:
-                    score -= 15  # Penalty for being wrong vehicle type (sedan when asking for truck)
-            elif vehicle_type_requested == 'suv':
-                suv_models = ['suburban', 'tahoe', 'explorer', 'pilot', 'highlander', 'cr-v', 'rav4', 'escape', 'edge']
-                if any(model in vehicle_model for model in suv_models):
-                    score += 25
-                else:
-                    score -= 10
-        
-        # Log vehicle type matches for monitoring
-        if preferences.get('vehicle_type') and score > 20:  # Only log high-scoring matches
-            logger.info(f"High match: {preferences['vehicle_type']} preference → {vehicle.get('make')} {vehicle.get('model')} (Score: {score:.1f})")
-        
-        # Make preference (20 points)
-        if preferences.get('make') and vehicle.get('make'):
-            if vehicle['make'].lower() == preferences['make'].lower():
-                score += 20
-        
-        # Fuel type preference (15 points)
-        if preferences.get('fuel_type') and vehicle.get('fuel_type'):
-            if vehicle['fuel_type'] == preferences['fuel_type']:
-                score += 15
-        
-        # Year preference (15 points)
-        if preferences.get('year_min') and vehicle.get('year'):
-            if vehicle['year'] >= preferences['year_min']:
-                year_bonus = min(15, (vehicle['year'] - preferences['year_min'] + 1) * 3)
-                score += year_bonus
-        
-        # Mileage preference (10 points)
-        if vehicle.get('mileage'):
-            mileage_max = preferences.get('mileage_max', 100000)
-            if vehicle['mileage'] <= mileage_max:
-                mileage_efficiency = 1 - (vehicle['mileage'] / mileage_max)
-                score += mileage_efficiency * 10
-        
-        # Safety rating bonus (10 points)
-        if vehicle.get('safety_rating'):
-            score += (vehicle['safety_rating'] / 5) * 10
-        
-        # Data completeness penalty - penalize vehicles with missing critical data
-        missing_data_penalty = 0
-        critical_fields = ['mileage', 'mpg_city', 'mpg_highway', 'year']
-        
-        for field in critical_fields:
-            if not vehicle.get(field):
-                missing_data_penalty += 10  # 10 point penalty per missing field (stricter)
-        
-        # Additional penalty for vehicles missing multiple critical fields
-        missing_count = sum(1 for field in critical_fields if not vehicle.get(field))
-        if missing_count >= 3:
-            missing_data_penalty += 15  # Extra penalty for very incomplete data
-        
-        # Apply penalty but don't let score go below 0
-        score = max(0, score - missing_data_penalty)
-        
-        # Log data completeness issues for high-scoring but incomplete vehicles
-        if missing_data_penalty > 0:  # Log all vehicles with missing data
-            missing_fields = [field for field in critical_fields if not vehicle.get(field)]
-            logger.info(f"Data completeness check: {vehicle.get('make')} {vehicle.get('model')} - Missing: {missing_fields} (Penalty: -{missing_data_penalty}, Final Score: {score:.1f})")
-        
-        return min(score, max_score)
-    
-    def render_vehicle_card(self, vehicle: dict, ai_score: float = None, is_top_pick: bool = False):
+        return float(_score_batch([vehicle], preferences)[0])
+    
+    def render_vehicle_card(self, vehicle: dict, ai_score: float = None, is_top_pick: bool = False, budget_max: float = 0):
         """Render a beautiful vehicle card with enhanced information."""
-        
-        # Determine card style based on type
-        if is_top_pick:
-            card_style = """
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            """
-        else:
-            card_style = """
-            background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
-            color: #333;
-            """
-        
-        with st.container():
-            st.markdown(f"""
-            <div style="
-                {card_style}
-                padding: 20px;
-                border-radius: 15px;
-                box-shadow: 0 4px 15px rgba(0,0,0,0.1);
-                margin: 10px 0;
-                border: 1px solid rgba(255,255,255,0.2);
-            ">
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Header with title and source
-            col1, col2 = st.columns([3, 1])
-            with col1:
-                title = f"**{vehicle.get('year', 'N/A')} {vehicle.get('make', 'Unknown')} {vehicle.get('model', 'Unknown')}**"
-                if is_top_pick:
-                    st.markdown(f"## 🏆 {title}")
-                    st.markdown("**🎯 AI TOP RECOMMENDATION**")
-                else:
-                    st.markdown(f"### {title}")
-            
-            with col2:
-                # Show data source
-                source = vehicle.get('source', 'local')
-                if source in ['cars.com', 'autotrader', 'cargurus', 'auto.dev']:
-                    st.markdown("**🌐 LIVE**")
-                    st.caption(f"from {source}")
-                else:
-                    st.markdown("**📱 LOCAL**")
-                
-                if ai_score is not None:
-                    st.metric("🤖 AI Match", f"{ai_score:.0f}%")
-            
-            # Key metrics
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                if vehicle.get('price'):
-                    budget_max = st.session_state.preferences.get('budget_max', 0)
-                    if budget_max > 0:
-                        savings = budget_max - vehicle['price']
-                        if savings > 5000:
-                            st.metric("💰 Price", f"${vehicle['price']:,}", f"${savings:,} saved!")
-                        else:
-                            st.metric("💰 Price", f"${vehicle['price']:,}")
-                    else:
-                        st.metric("💰 Price", f"${vehicle['price']:,}")
-                else:
-                    st.metric("💰 Price", "Contact Dealer")
-            
-            with col2:
-                if vehicle.get('mileage'):
-                    st.metric("🚗 Mileage", f"{vehicle['mileage']:,} mi")
-                else:
-                    st.metric("🚗 Mileage", "N/A")
-            
-            with col3:
-                mpg_display = "N/A"
-                if vehicle.get('mpg_city') and vehicle.get('mpg_highway'):
-                    mpg_display = f"{vehicle['mpg_city']}/{vehicle['mpg_highway']}"
-                elif vehicle.get('fuel_type') == 'Electric':
-                    mpg_display = "Electric"
-                st.metric("⛽ MPG", mpg_display)
-            
-            with col4:
-                safety = vehicle.get('safety_rating')
-                if safety:
-                    stars = "⭐" * int(safety)
-                    st.metric("🛡️ Safety", stars)
-                else:
-                    st.metric("🛡️ Safety", "Not Rated")
-            
-            # Description and features
-            if vehicle.get('description'):
-                st.markdown(f"**📝 Description:** {vehicle['description']}")
-            
-            if vehicle.get('features'):
-                features = vehicle['features']
-                if isinstance(features, str):
-                    try:
-                        features = json.loads(features.replace("'", '"'))
-                    except:
-                        features = [features]
-                
-                if features:
-                    st.markdown("**✨ Key Features:**")
-                    # Display features in a nice grid
-                    feature_cols = st.columns(3)
-                    for i, feature in enumerate(features[:6]):  # Show max 6 features
-                        with feature_cols[i % 3]:
-                            st.markdown(f"• {feature}")
-            
-            # Contact information for live listings
-            if vehicle.get('dealer_name') or vehicle.get('listing_url'):
-                with st.expander("📞 Contact & Details"):
-                    if vehicle.get('dealer_name'):
-                        st.write(f"**Dealer:** {vehicle['dealer_name']}")
-                    if vehicle.get('dealer_phone'):
-                        st.write(f"**Phone:** {vehicle['dealer_phone']}")
-                    if vehicle.get('listing_url'):
-                        st.markdown(f"[🔗 View Full Listing]({vehicle['listing_url']})")
-                    if vehicle.get('location'):
-                        st.write(f"**Location:** {vehicle['location']}")
+        st.markdown(_card_html(vehicle, ai_score, is_top_pick, budget_max), unsafe_allow_html=True)
     
     def process_message(self, user_input: str):
         """Process user message and generate AI response with vehicle recommendations."""
@@ -440,12 +697,42 @@ class CarFinderAI:
         st.session_state.preferences.update(new_preferences)
         preferences = st.session_state.preferences
         
-        # Add to chat history
+        # Add to chat history; both entries of the turn share one timestamp
+        now = time.strftime('%H:%M')
         st.session_state.chat_history.append({
+            'id': self._next_message_id(),
             'user': user_input,
-            'timestamp': datetime.now().strftime('%H:%M')
+            'timestamp': now
+        })
+        
+        # Reuse the previous turn when nothing that drives the search changed
+        # (e.g. "thanks", "tell me more"); its ranked results and the response
+        # built from them would come out identical
+        search_key = (_preferences_key(preferences), st.session_state.use_live_data)
+        previous = next((m for m in reversed(st.session_state.chat_history) if 'assistant' in m), None)
+        if preferences and previous and previous.get('vehicles') and previous.get('search_key') == search_key:
+            response, final_vehicles = previous['assistant'], previous['vehicles']
+        else:
+            response, final_vehicles = _cached_response(self, search_key[0], search_key[1], self._response_generation())
+        
+        # Add response to chat history
+        st.session_state.chat_history.append({
+            'id': self._next_message_id(),
+            'assistant': response,
+            'timestamp': now,
+            'vehicles': final_vehicles,
+            'search_key': search_key
         })
+        self._trim_chat_history()
         
+        return response, final_vehicles
+    
+    def _response_generation(self) -> tuple:
+        """Cache generation for responses: live-data refreshes plus the search TTL window."""
+        return (self._refresh_generation, int(time.monotonic() // _SEARCH_TTL))
+    
+    def _generate_response(self, preferences: dict):
+        """Search, rank and describe vehicles for the current preferences."""
         # Generate response
         response = ""
         search_results = []
@@ -455,125 +742,155 @@ class CarFinderAI:
             search_results = self.intelligent_vehicle_search(preferences)
             
             if search_results:
-                # Calculate AI scores for all results
-                scored_results = []
-                for vehicle in search_results:
-                    ai_score = self.calculate_ai_score(vehicle, preferences)
-                    scored_results.append((vehicle, ai_score))
+                # Reject vehicles that fail hard constraints before scoring;
+                # they are counted apart from the low-score (incomplete data) results
+                scores = np.zeros(len(search_results))
+                over_budget = _hard_reject_mask(search_results, preferences)
+                budget_count = int(over_budget.sum())
+                candidates = np.flatnonzero(~over_budget)
+                if len(candidates):
+                    # Calculate AI scores for the remaining results in one pass
+                    scores[candidates] = _score_batch([search_results[i] for i in candidates], preferences)
                 
-                # Filter out vehicles with very low scores (less than 5% compatibility)
+                # Filter out vehicles with very low scores (less than 5% compatibility).
                 # These are likely vehicles with missing data or wrong type
                 min_score_threshold = 5.0
-                original_count = len(scored_results)
-                scored_results = [(vehicle, score) for vehicle, score in scored_results if score >= min_score_threshold]
-                filtered_count = original_count - len(scored_results)
+                passing = np.flatnonzero(scores >= min_score_threshold)
+                match_count = len(passing)
+                filtered_count = len(search_results) - match_count - budget_count
                 
-                if filtered_count > 0:
-                    logger.info(f"Filtered out {filtered_count} vehicles with scores below {min_score_threshold}% (likely incomplete data)")
+                # Keep only the top picks: partial selection in O(N), then sort
+                # just those by AI score (ties keep search order)
+                top = passing
+                if len(passing) > _TOP_K:
+                    top = passing[np.argpartition(-scores[passing], _TOP_K - 1)[:_TOP_K]]
+                top = top[np.lexsort((top, -scores[top]))]
+                scored_results = [(search_results[i], float(scores[i])) for i in top]
                 
-                # Sort by AI score
-                scored_results.sort(key=lambda x: x[1], reverse=True)
+                if filtered_count > 0:
+                    logger.info("Filtered out %d vehicles with scores below %s%% (likely incomplete data)", filtered_count, min_score_threshold)
+                if budget_count > 0:
+                    logger.info("Filtered out %d vehicles priced over twice the budget", budget_count)
                 
                 if not scored_results:
-                    response = "❌ **I found vehicles matching your search criteria, but they all had incomplete data (missing mileage, MPG, etc.) so I filtered them out for quality.**\n\n"
-                    response += "💡 **Try:**\n"
-                    response += "- Adjusting your search criteria\n"
-                    response += "- Looking for different makes/models\n"
-                    response += "- Expanding your budget or mileage range\n\n"
-                    response += "The live data sources sometimes have incomplete listings - this filtering protects you from making decisions without key information!"
-                    return response, []
+                    return (_OVER_BUDGET_RESPONSE if filtered_count == 0 else _ALL_FILTERED_RESPONSE), []
                 
-                # Generate contextual response
-                top_vehicle = scored_results[0][0]
-                top_score = scored_results[0][1]
+                # Generate contextual response; read each top-pick field once
+                top_vehicle, top_score = scored_results[0]
+                year, make, model, price, mileage, mpg_city, mpg_highway, fuel_type = (
+                    top_vehicle.get(field) for field in
+                    ('year', 'make', 'model', 'price', 'mileage', 'mpg_city', 'mpg_highway', 'fuel_type')
+                )
+                budget_max = preferences.get('budget_max')
                 
                 data_source_info = ""
                 if st.session_state.use_live_data:
-                    live_count = sum(1 for v, _ in scored_results if v.get('source') in ['cars.com', 'autotrader', 'cargurus'])
+                    is_live = np.fromiter((v.get('source') in _LIVE_SOURCES for v in search_results), dtype=bool, count=len(search_results))
+                    live_count = int(is_live[passing].sum())
                     if live_count > 0:
                         data_source_info = f" I found {live_count} live listings from current market data!"
                 
-                quality_info = ""
+                filtered_notes = []
                 if filtered_count > 0:
-                    quality_info = f" (filtered out {filtered_count} with incomplete data for quality)"
+                    filtered_notes.append(f"{filtered_count} with incomplete data for quality")
+                if budget_count > 0:
+                    filtered_notes.append(f"{budget_count} priced over twice your budget")
+                quality_info = f" (filtered out {' and '.join(filtered_notes)})" if filtered_notes else ""
                 
-                response = f"🎯 **Perfect! I found {len(scored_results)} high-quality vehicles matching your criteria{quality_info}.{data_source_info}**\n\n"
-                response += f"**🏆 My #1 recommendation** is the **{top_vehicle.get('year')} {top_vehicle.get('make')} {top_vehicle.get('model')}** "
-                response += f"with a {top_score:.0f}% AI compatibility match!\n\n"
+                parts = [
+                    f"🎯 **Perfect! I found {match_count} high-quality vehicles matching your criteria{quality_info}.{data_source_info}**\n\n",
+                    f"**🏆 My #1 recommendation** is the **{year} {make} {model}** ",
+                    f"with a {top_score:.0f}% AI compatibility match!\n\n"
+                ]
                 
-                if preferences.get('budget_max') and top_vehicle.get('price'):
-                    savings = preferences['budget_max'] - top_vehicle['price']
+                if budget_max and price:
+                    savings = budget_max - price
                     if savings > 5000:
-                        price_context = f"**${top_vehicle['price']:,}** *(${savings:,} under budget - great value!)*"
+                        price_context = f"**${price:,}** *(${savings:,} under budget - great value!)*"
                     elif savings > 0:
-                        price_context = f"**${top_vehicle['price']:,}** *(within budget)*"
+                        price_context = f"**${price:,}** *(within budget)*"
                     else:
-                        price_context = f"**${top_vehicle['price']:,}** *(slightly over budget, but worth considering)*"
-                    response += f"💰 **Price:** {price_context}\n"
+                        price_context = f"**${price:,}** *(slightly over budget, but worth considering)*"
+                    parts.append(f"💰 **Price:** {price_context}\n")
                 
-                if top_vehicle.get('mileage'):
-                    response += f"🚗 **Mileage:** {top_vehicle['mileage']:,} miles\n"
+                if mileage:
+                    parts.append(f"🚗 **Mileage:** {mileage:,} miles\n")
                 
-                if top_vehicle.get('mpg_city') and top_vehicle.get('mpg_highway'):
-                    response += f"⛽ **Fuel Economy:** {top_vehicle['mpg_city']}/{top_vehicle['mpg_highway']} MPG\n"
-                elif top_vehicle.get('fuel_type') == 'Electric':
-                    response += f"⚡ **Fuel Type:** Electric (no gas needed!)\n"
+                if mpg_city and mpg_highway:
+                    parts.append(f"⛽ **Fuel Economy:** {mpg_city}/{mpg_highway} MPG\n")
+                elif fuel_type == 'Electric':
+                    parts.append("⚡ **Fuel Type:** Electric (no gas needed!)\n")
                 
-                response += f"\n📍 **Why it's perfect for you:**\n"
+                parts.append("\n📍 **Why it's perfect for you:**\n")
                 
                 # Add personalized reasoning
-                if preferences.get('fuel_type') and top_vehicle.get('fuel_type') == preferences['fuel_type']:
-                    response += f"• Matches your {preferences['fuel_type'].lower()} preference\n"
-                if preferences.get('make') and top_vehicle.get('make', '').lower() == preferences['make'].lower():
-                    response += f"• You specifically mentioned {preferences['make']}\n"
-                if preferences.get('budget_max') and top_vehicle.get('price') and top_vehicle['price'] <= preferences['budget_max']:
-                    response += f"• Fits within your ${preferences['budget_max']:,} budget\n"
+                if preferences.get('fuel_type') and fuel_type == preferences['fuel_type']:
+                    parts.append(f"• Matches your {preferences['fuel_type'].lower()} preference\n")
+                if preferences.get('make') and (make or '').casefold() == preferences['make'].casefold():
+                    parts.append(f"• You specifically mentioned {preferences['make']}\n")
+                if budget_max and price and price <= budget_max:
+                    parts.append(f"• Fits within your ${budget_max:,} budget\n")
                 
-                response += f"\n🔍 **See all {len(search_results)} results below** - I've ranked them by how well they match your needs!\n\n"
-                response += "❓ **Questions? Want details?** Ask me anything about these vehicles - maintenance costs, insurance estimates, feature comparisons, or how they'd fit your specific lifestyle!"
+                parts.append(f"\n🔍 **See all {len(search_results)} results below** - I've ranked them by how well they match your needs!\n\n")
+                parts.append(_FOLLOW_UP_PROMPT)
+                response = ''.join(parts)
             else:
-                response = "🤔 **Hmm, I'm having trouble finding the perfect match** for your specific requirements in our current inventory.\n\n"
-                response += "**💡 Here are a few suggestions:**\n"
-                response += "• Try expanding your budget range\n"
-                response += "• Consider different makes or models\n"
-                response += "• Adjust your year or mileage preferences\n\n"
-                if not st.session_state.use_live_data:
-                    response += "💡 **Tip:** Enable 'Live Data' above to search current market listings from multiple sources!\n\n"
-                response += "Tell me more about what's most important to you, and I'll help find alternatives!"
+                response = _NO_MATCH_LIVE_RESPONSE if st.session_state.use_live_data else _NO_MATCH_RESPONSE
         
         else:
             # Initial greeting or clarification
-            response = "👋 **Hello! I'm your AI car shopping assistant.** I can help you find the perfect vehicle based on your needs and budget.\n\n"
-            response += "**To get started, tell me:**\n"
-            response += "• Your budget range\n"
-            response += "• Preferred make or model (if any)\n" 
-            response += "• Type of driving you do most\n"
-            response += "• Any specific features you want\n\n"
-            response += "*For example: 'I need a reliable SUV under $30,000 for family trips' or 'Looking for a fuel-efficient car around $25k'*"
+            response = _GREETING_RESPONSE
         
         # Ensure we always have a valid vehicles list for return
         final_vehicles = []
         if 'scored_results' in locals() and scored_results:
             final_vehicles = scored_results
         
-        # Add response to chat history
-        st.session_state.chat_history.append({
-            'assistant': response,
-            'timestamp': datetime.now().strftime('%H:%M'),
-            'vehicles': final_vehicles
-        })
-        
         return response, final_vehicles
     
+    def _trim_chat_history(self):
+        """Cap the chat history and drop vehicle payloads from older turns.
+        
+        Evicted messages keep rendering from their cached card HTML.
+        """
+        history = st.session_state.chat_history[-_MAX_HISTORY:]
+        rendered_html = st.session_state.rendered_html
+        budget_max = st.session_state.preferences.get('budget_max', 0)
+        
+        for message in history[:-2 * _VEHICLE_TURNS]:
+            vehicles = message.pop('vehicles', None)
+            if vehicles and message.get('id') not in rendered_html:
+                rendered_html[message['id']] = (budget_max, _message_html(vehicles, budget_max))
+        
+        live_ids = {message.get('id') for message in history}
+        for message_id in [key for key in rendered_html if key not in live_ids]:
+            del rendered_html[message_id]
+        
+        st.session_state.chat_history = history
+    
+    @st.fragment
     def render_chat_interface(self):
-        """Render the conversational chat interface."""
+        """Render the conversational chat interface.
+        
+        Runs as a fragment so a chat submission only reruns the chat panel;
+        the header and sidebar refresh on the next full-app rerun.
+        """
         st.markdown("### 💬 Chat with Your AI Assistant")
         
         # Chat history
         chat_container = st.container()
+        budget_max = st.session_state.preferences.get('budget_max', 0)
+        
+        # Only the most recent turns draw their vehicle cards by default, so
+        # a rerun costs the same however long the conversation gets
+        history = st.session_state.chat_history
+        assistant_ids = [m.get('id') for m in history if 'assistant' in m]
+        card_ids = set(assistant_ids[-_CARD_TURNS:])
+        if len(assistant_ids) > _CARD_TURNS and st.toggle("🕘 Show vehicles from earlier turns", key='show_earlier_cards'):
+            card_ids = set(assistant_ids)
         
         with chat_container:
-            for message in st.session_state.chat_history:
+            for message in history:
                 if 'user' in message:
                     with st.chat_message("user"):
                         st.write(message['user'])
@@ -581,21 +898,8 @@ class CarFinderAI:
                 elif 'assistant' in message:
                     with st.chat_message("assistant"):
                         st.markdown(message['assistant'])
-                        
-                        # Show vehicles if any
-                        if 'vehicles' in message and message['vehicles']:
-                            st.markdown("---")
-                            
-                            # Show top pick first
-                            if message['vehicles']:
-                                top_vehicle, top_score = message['vehicles'][0]
-                                self.render_vehicle_card(top_vehicle, top_score, is_top_pick=True)
-                                
-                                # Show other results
-                                if len(message['vehicles']) > 1:
-                                    st.markdown("### 🔍 Other Great Options")
-                                    for vehicle, score in message['vehicles'][1:6]:  # Show up to 5 more
-                                        self.render_vehicle_card(vehicle, score)
+                        if message.get('id') in card_ids:
+                            self._render_message_cards(message, budget_max)
         
         # Input for new messages
         if prompt := st.chat_input("Ask me about cars, describe what you're looking for..."):
@@ -609,16 +913,40 @@ class CarFinderAI:
                     
                     # Display vehicles if any found
                     if vehicles:
+                        # This turn may have changed the budget
+                        budget_max = st.session_state.preferences.get('budget_max', 0)
+                        
                         # Show top recommendation
                         if len(vehicles) > 0:
                             st.markdown("### 🏆 Top Recommendation")
-                            self.render_vehicle_card(vehicles[0][0], vehicles[0][1])
+                            self.render_vehicle_card(vehicles[0][0], vehicles[0][1], budget_max=budget_max)
                         
                         # Show other options
                         if len(vehicles) > 1:
                             st.markdown("### 🔍 Other Great Options")
                             for vehicle, score in vehicles[1:5]:  # Show up to 4 more
-                                self.render_vehicle_card(vehicle, score)
+                                self.render_vehicle_card(vehicle, score, budget_max=budget_max)
+    
+    def _render_message_cards(self, message: dict, budget_max: float):
+        """Show a history message's vehicles (top pick first) as one HTML block.
+        
+        Reuses the card HTML built the last time this message was drawn for
+        the same budget. Older messages have had their vehicles evicted and
+        always render from the cached HTML.
+        """
+        rendered_html = st.session_state.rendered_html
+        cached = rendered_html.get(message.get('id'))
+        if not (message.get('vehicles') or cached):
+            return
+        
+        st.markdown("---")
+        if cached and (cached[0] == budget_max or not message.get('vehicles')):
+            cards_html = cached[1]
+        else:
+            cards_html = _message_html(message['vehicles'], budget_max)
+            if 'id' in message:
+                rendered_html[message['id']] = (budget_max, cards_html)
+        st.markdown(cards_html, unsafe_allow_html=True)
     
     def render_sidebar(self):
         """Render sidebar with preferences and controls."""
@@ -646,11 +974,11 @@ class CarFinderAI:
         with col1:
             if st.button("🗑️ Clear All"):
                 st.session_state.preferences = {}
-                st.rerun()
+                st.rerun(scope="app")
         
         with col2:
             if st.button("🔄 Refresh"):
-                st.rerun()
+                st.rerun(scope="app")
         
         # Data source info
         st.sidebar.markdown("---")
@@ -667,7 +995,7 @@ class CarFinderAI:
         
         # Quick stats
         try:
-            status = self.vehicle_service.get_data_source_status()
+            status = _cached_data_source_status(self.vehicle_service)
             st.sidebar.metric("Local Vehicles", status['local_database']['vehicle_count'])
             
             if st.session_state.use_live_data:
@@ -681,6 +1009,60 @@ class CarFinderAI:
         except Exception as e:
             st.sidebar.error(f"Error loading stats: {e}")
 
+# Page stylesheet; the base theme is set in .streamlit/config.toml
+_APP_CSS = """
+<style>
+.main > div {
+    padding-top: 2rem;
+}
+.stChatMessage {
+    background-color: #f8f9fa;
+    border-radius: 10px;
+    padding: 1rem;
+    margin: 0.5rem 0;
+}
+.cf-card {
+    background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
+    color: #333;
+    padding: 20px;
+    border-radius: 15px;
+    box-shadow: 0 4px 15px rgba(0,0,0,0.1);
+    margin: 10px 0;
+    border: 1px solid rgba(255,255,255,0.2);
+}
+.cf-top {
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    color: white;
+}
+.cf-card-header {
+    display: flex;
+    justify-content: space-between;
+}
+.cf-badge {
+    text-align: right;
+}
+.cf-metrics {
+    display: flex;
+    gap: 10px;
+    margin: 10px 0;
+}
+.cf-metrics > div {
+    flex: 1;
+}
+.cf-features {
+    display: grid;
+    grid-template-columns: repeat(3, 1fr);
+}
+</style>
+"""
+
+
+@st.cache_resource(show_spinner="Starting CarFinder AI...")
+def get_app() -> CarFinderAI:
+    """Build the application and its services once per process."""
+    return CarFinderAI()
+
+
 def main():
     """Main application entry point."""
     st.set_page_config(
@@ -690,23 +1072,14 @@ def main():
         initial_sidebar_state="expanded"
     )
     
-    # Custom CSS for better appearance
-    st.markdown("""
-    <style>
-    .main > div {
-        padding-top: 2rem;
-    }
-    .stChatMessage {
-        background-color: #f8f9fa;
-        border-radius: 10px;
-        padding: 1rem;
-        margin: 0.5rem 0;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    # Component styling the theme can't express. Streamlit drops any element a
+    # rerun doesn't re-emit, so this must be sent on every run; it is one
+    # prebuilt string (see _APP_CSS) rather than rebuilt here
+    st.markdown(_APP_CSS, unsafe_allow_html=True)
     
     # Initialize and run the application
-    app = CarFinderAI()
+    app = get_app()
+    app.init_session_state()
     
     # Render components
     app.render_header()
@@ -3,6 +3,7 @@ import sys
 import os
 from pathlib import Path
 import pandas as pd
+import numpy as np
 
 # Add paths for imports
 project_root = Path(__file__).parent.parent
@@ -79,8 +80,9 @@ def render_simple_sidebar():
     
     return preferences
 
+@st.cache_data
 def get_sample_vehicles():
-    """Get sample vehicle data."""
+    """Get sample vehicle data (built once, not on every rerun)."""
     return [
         {
             'id': 1, 'make': 'Toyota', 'model': 'Camry', 'year': 2022, 'price': 28500,
@@ -114,57 +116,111 @@ def get_sample_vehicles():
         }
     ]
 
-def filter_vehicles(vehicles, preferences):
-    """Filter vehicles based on user preferences."""
-    filtered = vehicles.copy()
+def build_vehicle_frame(vehicles):
+    """Build the vehicle DataFrame used by filter_vehicles, with lower-cased match columns."""
+    df = pd.DataFrame(vehicles)
+    df['_make'] = df['make'].str.lower()
+    df['_fuel'] = df['fuel_type'].str.lower()
+    return df
+
+@st.cache_data
+def get_sample_vehicle_frame():
+    """Sample vehicles as a filter-ready DataFrame, cached across reruns."""
+    return build_vehicle_frame(get_sample_vehicles())
+
+def build_vehicle_buckets(vehicles_df):
+    """Row positions for each lower-cased make and fuel type, so a chosen value is a dict lookup."""
+    return {column: vehicles_df.groupby(column).indices for column in ('_make', '_fuel')}
+
+@st.cache_data
+def get_sample_vehicle_buckets():
+    """Make/fuel buckets of the sample vehicle frame, cached across reruns."""
+    return build_vehicle_buckets(get_sample_vehicle_frame())
+
+def filter_vehicles(vehicles_df, preferences, buckets=None):
+    """Filter vehicles based on user preferences.
+    
+    With ``buckets`` (see build_vehicle_buckets), make and fuel type narrow the
+    rows by lookup first; the remaining filters are one combined boolean mask.
+    """
+    if buckets is not None:
+        rows = None
+        for column, key in (('_make', 'make'), ('_fuel', 'fuel_type')):
+            if preferences.get(key):
+                bucket = buckets[column].get(preferences[key].lower(), np.empty(0, dtype=np.intp))
+                rows = bucket if rows is None else np.intersect1d(rows, bucket)
+        if rows is not None:
+            vehicles_df = vehicles_df.iloc[np.sort(rows)]
+    
+    mask = np.ones(len(vehicles_df), dtype=bool)
     
     if preferences.get('budget_max'):
-        filtered = [v for v in filtered if v['price'] <= preferences['budget_max']]
+        mask &= vehicles_df['price'].to_numpy() <= preferences['budget_max']
     
-    if preferences.get('make'):
-        filtered = [v for v in filtered if v['make'].lower() == preferences['make'].lower()]
+    if preferences.get('make') and buckets is None:
+        mask &= vehicles_df['_make'].to_numpy() == preferences['make'].lower()
     
     if preferences.get('min_year'):
-        filtered = [v for v in filtered if v['year'] >= preferences['min_year']]
+        mask &= vehicles_df['year'].to_numpy() >= preferences['min_year']
     
     if preferences.get('max_year'):
-        filtered = [v for v in filtered if v['year'] <= preferences['max_year']]
+        mask &= vehicles_df['year'].to_numpy() <= preferences['max_year']
     
-    if preferences.get('fuel_type'):
-        filtered = [v for v in filtered if v['fuel_type'].lower() == preferences['fuel_type'].lower()]
+    if preferences.get('fuel_type') and buckets is None:
+        mask &= vehicles_df['_fuel'].to_numpy() == preferences['fuel_type'].lower()
     
-    return filtered
+    return vehicles_df.loc[mask].drop(columns=['_make', '_fuel']).to_dict('records')
+
+@st.cache_data(max_entries=256)
+def format_vehicle_card(vehicle, rank=None):
+    """Pre-format the non-interactive part of a vehicle card as one markdown string."""
+    title = f"{vehicle['year']} {vehicle['make']} {vehicle['model']}"
+    stats = [f"**Price:** ${vehicle['price']:,}", f"**Mileage:** {vehicle['mileage']:,} miles"]
+    if vehicle['mpg_city'] and vehicle['mpg_highway']:
+        stats.append(f"**MPG:** {vehicle['mpg_city']}/{vehicle['mpg_highway']}")
+    
+    details = [f"**Fuel Type:** {vehicle['fuel_type']}"]
+    if vehicle['safety_rating']:
+        details.append(f"**Safety Rating:** {'⭐' * vehicle['safety_rating']} ({vehicle['safety_rating']}/5)")
+    
+    return (
+        f"### {f'{rank}. ' if rank else ''}{title}\n\n"
+        f"{' &nbsp;&nbsp; '.join(stats)}\n\n"
+        f"{' &nbsp;&nbsp; '.join(details)}\n\n"
+        f"**Description:** {vehicle['description']}"
+    )
 
 def render_vehicle_card(vehicle, rank=None):
-    """Render a vehicle card."""
+    """Render a vehicle card: one markdown block plus the features expander."""
     with st.container():
-        if rank:
-            st.subheader(f"{rank}. {vehicle['year']} {vehicle['make']} {vehicle['model']}")
-        else:
-            st.subheader(f"{vehicle['year']} {vehicle['make']} {vehicle['model']}")
-        
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.metric("Price", f"${vehicle['price']:,}")
-        with col2:
-            st.metric("Mileage", f"{vehicle['mileage']:,} miles")
-        with col3:
-            if vehicle['mpg_city'] and vehicle['mpg_highway']:
-                st.metric("MPG", f"{vehicle['mpg_city']}/{vehicle['mpg_highway']}")
-        
-        st.write(f"**Fuel Type:** {vehicle['fuel_type']}")
-        if vehicle['safety_rating']:
-            st.write(f"**Safety Rating:** {'⭐' * vehicle['safety_rating']} ({vehicle['safety_rating']}/5)")
+        st.markdown(format_vehicle_card(vehicle, rank))
         
         if vehicle.get('features'):
             with st.expander("Features"):
-                for feature in vehicle['features']:
-                    st.write(f"✓ {feature}")
+                st.markdown("\n".join(f"- ✓ {feature}" for feature in vehicle['features']))
         
-        st.write(f"**Description:** {vehicle['description']}")
         st.markdown("---")
 
+# Cards rendered up front; the rest are revealed on demand
+INITIAL_CARDS = 5
+
+@st.fragment
+def render_vehicle_list(vehicles, start_rank=1):
+    """Render the first INITIAL_CARDS cards and page in the rest with "Show more".
+    
+    Runs as a fragment, so paging reruns only this list, not the whole script.
+    """
+    shown_key = f"cards_shown_{hash(tuple(vehicle['id'] for vehicle in vehicles))}"
+    shown = st.session_state.get(shown_key, INITIAL_CARDS)
+    
+    for i, vehicle in enumerate(vehicles[:shown], start_rank):
+        render_vehicle_card(vehicle, rank=i)
+    
+    remaining = len(vehicles) - shown
+    if remaining > 0 and st.button(f"Show {min(remaining, INITIAL_CARDS)} more", key=f"{shown_key}_more"):
+        st.session_state[shown_key] = shown + INITIAL_CARDS
+        st.rerun(scope="fragment")
+
 def main():
     """Main application."""
     
@@ -189,7 +245,7 @@ def main():
         
         if any(preferences.values()):
             # Filter vehicles based on preferences
-            filtered_vehicles = filter_vehicles(all_vehicles, preferences)
+            filtered_vehicles = filter_vehicles(get_sample_vehicle_frame(), preferences, get_sample_vehicle_buckets())
             
             if filtered_vehicles:
                 st.markdown(f"### 🎯 Found {len(filtered_vehicles)} vehicles matching your criteria")
@@ -202,8 +258,7 @@ def main():
                 # Show other results
                 if len(filtered_vehicles) > 1:
                     st.markdown("#### 📋 Other Great Options")
-                    for i, vehicle in enumerate(filtered_vehicles[1:], 2):
-                        render_vehicle_card(vehicle, rank=i)
+                    render_vehicle_list(filtered_vehicles[1:], start_rank=2)
             
             else:
                 st.warning("🔍 No vehicles found matching your criteria. Try adjusting your preferences.")
@@ -233,10 +288,15 @@ def main():
             **Start by setting your preferences in the sidebar →**
             """)
             
-            # Show all available vehicles as examples
+            # Show available vehicles as examples; cards below the fold render only when expanded
             st.markdown("### 📋 Sample Vehicles Available")
-            for i, vehicle in enumerate(all_vehicles, 1):
+            for i, vehicle in enumerate(all_vehicles[:INITIAL_CARDS], 1):
                 render_vehicle_card(vehicle, rank=i)
+            
+            if len(all_vehicles) > INITIAL_CARDS:
+                with st.expander(f"Show {len(all_vehicles) - INITIAL_CARDS} more"):
+                    for i, vehicle in enumerate(all_vehicles[INITIAL_CARDS:], INITIAL_CARDS + 1):
+                        render_vehicle_card(vehicle, rank=i)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
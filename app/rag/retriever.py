@@ -1,35 +1,205 @@
 """Vehicle retriever with RAG capabilities."""
 import numpy as np
+import pandas as pd
 from typing import List, Dict, Any, Optional
-import pickle
+from functools import lru_cache
+from operator import itemgetter
+import hashlib
+import json
+import os
+from importlib.util import find_spec
 from pathlib import Path
 
-try:
-    from sentence_transformers import SentenceTransformer
-    SENTENCE_TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    SENTENCE_TRANSFORMERS_AVAILABLE = False
+# Probed without importing: sentence-transformers (with torch) and faiss take
+# seconds to import, so they load on first use (get_embedding_model, _faiss)
+SENTENCE_TRANSFORMERS_AVAILABLE = find_spec('sentence_transformers') is not None
+FAISS_AVAILABLE = find_spec('faiss') is not None
 
 try:
-    import faiss
-    FAISS_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    FAISS_AVAILABLE = False
+    ORJSON_AVAILABLE = False
 
 try:
-    from app.models.database import get_database_manager, Vehicle
+    from app.models.database import Vehicle
+    from app.utils.config import get_database_url
+    from app.utils.db import get_shared_database_manager, get_vehicles_by_ids, get_vehicles_frame
 except ImportError:
     import sys
     from pathlib import Path
     sys.path.append(str(Path(__file__).parent.parent))
-    from models.database import get_database_manager, Vehicle
+    from models.database import Vehicle
+    from utils.config import get_database_url
+    from utils.db import get_shared_database_manager, get_vehicles_by_ids, get_vehicles_frame
+
+# HNSW graph parameters: neighbours per node and candidate list sizes
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+# Descriptions encoded per forward pass of the embedding model
+ENCODE_BATCH_SIZE = 64
+
+# Candidate sets below this fraction of the index are scored exactly: the
+# filtered HNSW walk is bounded by efSearch and seldom reaches a small allowed set
+FILTERED_SEARCH_MIN_FRACTION = 0.1
+
+# OpenMP threads FAISS may use per search; capped so concurrent sessions don't oversubscribe
+FAISS_SEARCH_THREADS = min(4, os.cpu_count() or 1)
+
+
+@lru_cache(maxsize=None)
+def _faiss():
+    """Import faiss on first use and cap its search threads (FAISS_SEARCH_THREADS)."""
+    import faiss
+    faiss.omp_set_num_threads(FAISS_SEARCH_THREADS)
+    return faiss
+
+
+def create_faiss_index(dimension: int, training_vectors: Optional[np.ndarray] = None):
+    """Create an empty HNSW inner-product index (cosine on normalized vectors).
+    
+    The index is wrapped in an IndexIDMap2, so vectors are added and found
+    by vehicle ID. With training vectors, the stored vectors are int8
+    scalar-quantized (4x smaller than float32); without them there is
+    nothing to train the quantizer on, so a float32 index is returned.
+    """
+    faiss = _faiss()
+    if training_vectors is not None and len(training_vectors):
+        index = faiss.IndexHNSWSQ(dimension, faiss.ScalarQuantizer.QT_8bit, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index.train(training_vectors)
+    else:
+        index = faiss.IndexHNSWFlat(dimension, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    
+    return faiss.IndexIDMap2(index)
+
+
+@lru_cache(maxsize=None)
+def get_embedding_model(model_name: str = 'all-MiniLM-L6-v2'):
+    """Load a sentence transformer model once per process.
+    
+    Returns None if sentence-transformers is unavailable or loading fails.
+    """
+    if not SENTENCE_TRANSFORMERS_AVAILABLE:
+        print("Warning: sentence-transformers not available, semantic search disabled")
+        return None
+    
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError as e:
+        print(f"Warning: could not import sentence-transformers ({e}), semantic search disabled")
+        return None
+    
+    try:
+        # Try to load with explicit device and trust_remote_code settings
+        import torch
+        device = 'cpu'  # Force CPU to avoid GPU compatibility issues
+        return SentenceTransformer(
+            model_name, 
+            device=device,
+            trust_remote_code=True
+        )
+    except Exception as e:
+        print(f"Failed to load {model_name}: {e}")
+        try:
+            # Try a different approach with explicit CPU device
+            return SentenceTransformer('all-MiniLM-L6-v2', device='cpu')
+        except Exception as e2:
+            print(f"Failed to load fallback model: {e2}")
+            # Disable embedding model if all loading attempts fail
+            return None
+
+
+def _description_hash(model_name: str, description: str) -> int:
+    """64-bit hash of a vehicle description under a given embedding model."""
+    digest = hashlib.blake2b(f"{model_name}\0{description}".encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+
+@lru_cache(maxsize=4096)
+def _features_text_from_json(features: str) -> str:
+    # Stored feature lists repeat across vehicles and rebuilds, so each
+    # distinct JSON string is parsed once per process
+    try:
+        return _features_text(_json_loads(features))
+    except (json.JSONDecodeError, TypeError):
+        return ""
+
+
+def _features_text(features) -> str:
+    """The "features ..." description part for a raw features value ('' if none)."""
+    if not features:
+        return ""
+    if isinstance(features, str):
+        return _features_text_from_json(features)
+    try:
+        return f"features {' '.join(features)}"
+    except TypeError:
+        return ""
+
+
+# Vehicle columns read for index descriptions (see describe_vehicles)
+DESCRIPTION_COLUMNS = ('id', 'year', 'make', 'model', 'fuel_type', 'transmission',
+                       'features', 'description', 'mpg_city', 'mpg_highway')
+
+
+def describe_vehicles(df) -> List[str]:
+    """Build the searchable description of every vehicle in a DataFrame at once.
+    
+    Column-wise equivalent of VehicleRetriever._create_vehicle_description:
+    each optional part is a Series that is either '' or ' <part>', so the
+    parts concatenate without per-row branching.
+    """
+    def present(column):
+        # Truthiness per value: not missing, empty or zero
+        values = df[column]
+        empty = 0 if pd.api.types.is_numeric_dtype(values) else ''
+        return (values.fillna(empty) != empty).astype(bool)
+    
+    def part(mask, text):
+        return text.where(mask, '')
+    
+    text = df['year'].astype(str) + ' ' + df['make'].astype(str) + ' ' + df['model'].astype(str)
+    text += part(present('fuel_type'), ' fuel type ' + df['fuel_type'].astype(str))
+    text += part(present('transmission'), ' transmission ' + df['transmission'].astype(str))
+    
+    features = df['features'].map(_features_text, na_action='ignore').fillna('')
+    text += part(features != '', ' ' + features)
+    text += part(present('description'), ' ' + df['description'].astype(str))
+    
+    mpg = present('mpg_city') & present('mpg_highway')
+    text += part(mpg, ' fuel efficiency ' + df['mpg_city'].astype(str) + ' city '
+                 + df['mpg_highway'].astype(str) + ' highway mpg')
+    
+    return text.str.lower().tolist()
+
+
+def get_retriever(config: Dict[str, Any]) -> "VehicleRetriever":
+    """Return the shared retriever (model and index) for a configuration."""
+    return _get_retriever(tuple(sorted(config.items())))
+
+
+@lru_cache(maxsize=4)
+def _get_retriever(config_key: tuple) -> "VehicleRetriever":
+    return VehicleRetriever(dict(config_key))
+
 
 class VehicleRetriever:
-    """RAG-based vehicle retriever with semantic search."""
+    """RAG-based vehicle retriever with semantic search.
+    
+    Prefer get_retriever() over constructing this directly, so the model and
+    index are loaded once per process rather than per caller.
+    """
     
     def __init__(self, config: Dict[str, Any]):
         self.config = config
-        self.db_manager = get_database_manager()
+        self.db_manager = get_shared_database_manager()
         self.embedding_model = None
         self.faiss_index = None
         self.vehicle_ids = []
@@ -39,46 +209,30 @@ class VehicleRetriever:
         self._load_or_create_index()
     
     def _load_embedding_model(self):
-        """Load the sentence transformer model."""
-        if not SENTENCE_TRANSFORMERS_AVAILABLE:
-            print("Warning: sentence-transformers not available, semantic search disabled")
-            self.embedding_model = None
-            return
-            
-        model_name = self.config.get('embedding_model', 'all-MiniLM-L6-v2')
-        try:
-            # Try to load with explicit device and trust_remote_code settings
-            import torch
-            device = 'cpu'  # Force CPU to avoid GPU compatibility issues
-            self.embedding_model = SentenceTransformer(
-                model_name, 
-                device=device,
-                trust_remote_code=True
-            )
-        except Exception as e:
-            print(f"Failed to load {model_name}: {e}")
-            try:
-                # Try a different approach with explicit CPU device
-                self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2', device='cpu')
-            except Exception as e2:
-                print(f"Failed to load fallback model: {e2}")
-                # Disable embedding model if all loading attempts fail
-                self.embedding_model = None
+        """Load the sentence transformer model (shared across instances)."""
+        self.embedding_model = get_embedding_model(self.config.get('embedding_model', 'all-MiniLM-L6-v2'))
+    
+    def _index_paths(self):
+        """Paths of the native FAISS index file and its vehicle ID array."""
+        data_dir = Path(self.config['data_dir'])
+        return data_dir / 'faiss_index.faiss', data_dir / 'vehicle_ids.npy'
     
     def _load_or_create_index(self):
         """Load existing FAISS index or create new one."""
-        index_path = Path(self.config['data_dir']) / 'faiss_index.pkl'
-        ids_path = Path(self.config['data_dir']) / 'vehicle_ids.pkl'
+        index_path, ids_path = self._index_paths()
         
-        if index_path.exists() and ids_path.exists():
+        if FAISS_AVAILABLE and index_path.exists() and ids_path.exists():
             try:
-                with open(index_path, 'rb') as f:
-                    self.faiss_index = pickle.load(f)
-                with open(ids_path, 'rb') as f:
-                    self.vehicle_ids = pickle.load(f)
-                return
-            except Exception:
-                pass
+                faiss = _faiss()
+                index = faiss.read_index(str(index_path))
+                # Older indexes are positional rather than keyed by vehicle ID; rebuild those
+                if isinstance(index, faiss.IndexIDMap2):
+                    self.faiss_index = index
+                    self.vehicle_ids = np.load(ids_path).tolist()
+                    return
+                print("Warning: FAISS index is not keyed by vehicle ID, rebuilding")
+            except Exception as e:
+                print(f"Warning: Could not load FAISS index ({e}), rebuilding")
         
         # Create new index
         self._create_new_index()
@@ -91,42 +245,104 @@ class VehicleRetriever:
             self.vehicle_ids = []
             return
             
-        vehicles = self.db_manager.get_all_vehicles()
+        vehicles_df = get_vehicles_frame(get_database_url(self.config), DESCRIPTION_COLUMNS)
         
-        if not vehicles:
+        if vehicles_df.empty:
             # Create empty index
             if FAISS_AVAILABLE:
-                self.faiss_index = faiss.IndexFlatIP(384)  # Default embedding dimension
+                self.faiss_index = create_faiss_index(384)  # Default embedding dimension
             else:
                 self.faiss_index = None
             self.vehicle_ids = []
             return
         
-        # Generate embeddings for all vehicles
-        descriptions = []
-        vehicle_ids = []
-        
-        for vehicle in vehicles:
-            description = self._create_vehicle_description(vehicle)
-            descriptions.append(description)
-            vehicle_ids.append(vehicle.id)
+        # Describe every vehicle column-wise; hashes decide which embeddings can be reused
+        descriptions = describe_vehicles(vehicles_df)
+        vehicle_ids = vehicles_df['id'].to_numpy(dtype=np.int64)
         
-        # Generate embeddings
-        embeddings = self.embedding_model.encode(descriptions)
+        model_name = self.config.get('embedding_model', 'all-MiniLM-L6-v2')
+        hashes = np.fromiter(
+            (_description_hash(model_name, description) for description in descriptions),
+            dtype=np.uint64, count=len(descriptions)
+        )
         
-        # Create FAISS index
+        # Reuse embeddings of unchanged descriptions, encode only the rest in batches.
+        # Rows are written straight into one float32 matrix, so no extra copies are made
+        cache, rows = self._cached_embedding_rows(hashes)
+        hit = rows >= 0
+        if not hit.any():
+            embeddings = self._encode(descriptions)
+        else:
+            embeddings = np.empty((len(descriptions), cache.shape[1]), dtype=np.float32)
+            embeddings[hit] = cache[rows[hit]]
+            stale = np.flatnonzero(~hit)
+            if len(stale):
+                embeddings[stale] = self._encode([descriptions[i] for i in stale])
+        del cache  # Release the memory map before the cache file is rewritten
+        self._save_embedding_cache(hashes, embeddings)
+        
+        # Create FAISS index, quantizer trained on the normalized embeddings
         dimension = embeddings.shape[1]
-        self.faiss_index = faiss.IndexFlatIP(dimension)
-        
-        # Normalize embeddings for cosine similarity
-        faiss.normalize_L2(embeddings.astype(np.float32))
-        self.faiss_index.add(embeddings.astype(np.float32))
+        self.faiss_index = create_faiss_index(dimension, embeddings)
+        self.faiss_index.add_with_ids(embeddings, vehicle_ids)
         
-        self.vehicle_ids = vehicle_ids
+        self.vehicle_ids = vehicle_ids.tolist()
         
         # Save index
         self._save_index()
     
+    def _embedding_cache_paths(self):
+        """Paths of the embedding cache: description hashes and their embedding rows."""
+        data_dir = Path(self.config['data_dir'])
+        return data_dir / 'desc_hashes.npy', data_dir / 'embeddings.npy'
+    
+    def _cached_embedding_rows(self, hashes: np.ndarray):
+        """Look up cached embeddings by description hash.
+        
+        Returns the memory-mapped embedding cache (or None) and, per hash, its
+        row in the cache or -1 where the description must be re-encoded.
+        """
+        hashes_path, embeddings_path = self._embedding_cache_paths()
+        rows = np.full(len(hashes), -1, dtype=np.int64)
+        if not (hashes_path.exists() and embeddings_path.exists()):
+            return None, rows
+        
+        try:
+            cached_hashes = np.load(hashes_path)
+            cached_embeddings = np.load(embeddings_path, mmap_mode='r')
+        except Exception:
+            return None, rows
+        if len(cached_hashes) != len(cached_embeddings):
+            return None, rows
+        
+        row_by_hash = {h: i for i, h in enumerate(cached_hashes.tolist())}
+        rows[:] = [row_by_hash.get(h, -1) for h in hashes.tolist()]
+        return cached_embeddings, rows
+    
+    def _save_embedding_cache(self, hashes: np.ndarray, embeddings: np.ndarray):
+        """Save description hashes and embeddings for the next rebuild."""
+        hashes_path, embeddings_path = self._embedding_cache_paths()
+        try:
+            np.save(hashes_path, hashes)
+            np.save(embeddings_path, embeddings)
+        except Exception as e:
+            print(f"Warning: Could not save embedding cache: {e}")
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts in batches into L2-normalized float32 rows (cosine = inner product).
+        
+        The model normalizes and returns float32 already, so this normally
+        hands back its output array without copying.
+        """
+        embeddings = self.embedding_model.encode(
+            texts,
+            batch_size=ENCODE_BATCH_SIZE,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
+    
     def _create_vehicle_description(self, vehicle: Vehicle) -> str:
         """Create searchable description for vehicle."""
         parts = [
@@ -139,14 +355,9 @@ class VehicleRetriever:
         if vehicle.transmission:
             parts.append(f"transmission {vehicle.transmission}")
         
-        if vehicle.features:
-            import json
-            try:
-                features = json.loads(vehicle.features) if isinstance(vehicle.features, str) else vehicle.features
-                if features:
-                    parts.append(f"features {' '.join(features)}")
-            except (json.JSONDecodeError, TypeError):
-                pass
+        features = _features_text(vehicle.features)
+        if features:
+            parts.append(features)
         
         if vehicle.description:
             parts.append(vehicle.description)
@@ -157,15 +368,12 @@ class VehicleRetriever:
         return " ".join(parts).lower()
     
     def _save_index(self):
-        """Save FAISS index and vehicle IDs."""
-        index_path = Path(self.config['data_dir']) / 'faiss_index.pkl'
-        ids_path = Path(self.config['data_dir']) / 'vehicle_ids.pkl'
+        """Save FAISS index (native format) and vehicle IDs."""
+        index_path, ids_path = self._index_paths()
         
         try:
-            with open(index_path, 'wb') as f:
-                pickle.dump(self.faiss_index, f)
-            with open(ids_path, 'wb') as f:
-                pickle.dump(self.vehicle_ids, f)
+            _faiss().write_index(self.faiss_index, str(index_path))
+            np.save(ids_path, np.asarray(self.vehicle_ids, dtype=np.int64))
         except Exception as e:
             print(f"Warning: Could not save FAISS index: {e}")
     
@@ -176,7 +384,8 @@ class VehicleRetriever:
         
         # If we have semantic search query, use RAG
         if preferences.get('query') or preferences.get('description'):
-            semantic_results = self._semantic_search(preferences)
+            # Rank only the vehicles that passed the filters
+            semantic_results = self._semantic_search(preferences, candidates=db_results)
             # Combine and deduplicate results
             combined_results = self._combine_results(db_results, semantic_results)
             return combined_results
@@ -198,12 +407,74 @@ class VehicleRetriever:
             limit=self.config.get('max_results', 20)
         )
     
-    def _semantic_search(self, preferences: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Perform semantic search using FAISS."""
+    def _semantic_search(self, preferences: Dict[str, Any],
+                         candidates: Optional[List[Vehicle]] = None) -> List[Dict[str, Any]]:
+        """Perform semantic search using FAISS.
+        
+        With ``candidates``, only those vehicles are ranked and no second
+        database fetch is needed. Small candidate sets are scored exactly
+        from their stored vectors; sets of at least FILTERED_SEARCH_MIN_FRACTION
+        of the index are searched inside FAISS (IDSelectorArray).
+        """
         if not self.faiss_index or not self.vehicle_ids or not self.embedding_model:
             return []
+        if candidates is not None and not candidates:
+            return []
+        
+        query = self._build_semantic_query(preferences)
+        if not query:
+            return []
         
-        # Create search query
+        # Generate query embedding
+        query_embedding = self._encode([query])
+        
+        # Search (the index returns vehicle IDs directly)
+        faiss = _faiss()
+        params = faiss.SearchParametersHNSW()
+        if candidates is None:
+            k = min(self.config.get('max_results', 20), len(self.vehicle_ids))
+        else:
+            candidate_ids = np.fromiter((vehicle.id for vehicle in candidates), dtype=np.int64, count=len(candidates))
+            k = min(self.config.get('max_results', 20), len(candidate_ids))
+            if len(candidate_ids) < FILTERED_SEARCH_MIN_FRACTION * len(self.vehicle_ids):
+                similarities, ids = self._score_candidates(query_embedding[0], candidate_ids, k)
+                return self._hits_to_results(self._collect_hits(similarities, ids),
+                                             {vehicle.id: vehicle for vehicle in candidates})
+            params.sel = faiss.IDSelectorArray(candidate_ids)
+        params.efSearch = max(HNSW_EF_SEARCH, k)
+        similarities, ids = self.faiss_index.search(query_embedding, k, params=params)
+        
+        hits = self._collect_hits(similarities[0], ids[0])
+        if candidates is None:
+            # Load the hit vehicles in one query
+            vehicles = get_vehicles_by_ids(get_database_url(self.config), (vehicle_id for _, _, vehicle_id in hits))
+        else:
+            vehicles = {vehicle.id: vehicle for vehicle in candidates}
+        
+        return self._hits_to_results(hits, vehicles)
+    
+    def _score_candidates(self, query_embedding: np.ndarray, candidate_ids: np.ndarray, k: int):
+        """Exact inner products of the query with each indexed candidate, best ``k`` first.
+        
+        Returns (similarities, vehicle IDs) like one row of an index search;
+        candidates missing from the index are skipped.
+        """
+        vectors, ids = [], []
+        for vehicle_id in candidate_ids.tolist():
+            try:
+                vectors.append(self.faiss_index.reconstruct(vehicle_id))
+            except RuntimeError:  # Not indexed (added since the last rebuild)
+                continue
+            ids.append(vehicle_id)
+        if not ids:
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+        
+        similarities = np.vstack(vectors) @ query_embedding
+        order = np.argsort(-similarities, kind='stable')[:k]
+        return similarities[order], np.asarray(ids, dtype=np.int64)[order]
+    
+    def _build_semantic_query(self, preferences: Dict[str, Any]) -> str:
+        """Build the lower-cased semantic search query text ('' if nothing to search for)."""
         query_parts = []
         
         if preferences.get('query'):
@@ -222,34 +493,29 @@ class VehicleRetriever:
         if preferences.get('desired_features'):
             query_parts.extend(preferences['desired_features'])
         
-        if not query_parts:
-            return []
-        
-        query = " ".join(query_parts).lower()
-        
-        # Generate query embedding
-        query_embedding = self.embedding_model.encode([query])
-        faiss.normalize_L2(query_embedding.astype(np.float32))
-        
-        # Search
-        k = min(self.config.get('max_results', 20), len(self.vehicle_ids))
-        similarities, indices = self.faiss_index.search(query_embedding.astype(np.float32), k)
+        return " ".join(query_parts).lower()
+    
+    def _collect_hits(self, similarities: np.ndarray, ids: np.ndarray) -> List[tuple]:
+        """(rank index, similarity, vehicle ID) for one query's hits above the threshold.
         
-        # Get vehicles and scores
-        results = []
+        One mask over the row; only the survivors become Python objects.
+        """
         threshold = self.config.get('similarity_threshold', 0.7)
-        
-        for i, (similarity, idx) in enumerate(zip(similarities[0], indices[0])):
-            if similarity >= threshold and idx < len(self.vehicle_ids):
-                vehicle_id = self.vehicle_ids[idx]
-                vehicle = self.db_manager.get_vehicle_by_id(vehicle_id)
-                
-                if vehicle:
-                    results.append({
-                        'vehicle': vehicle.to_dict(),
-                        'score': float(similarity),
-                        'rank': i + 1
-                    })
+        keep = np.flatnonzero((similarities >= threshold) & (ids >= 0))
+        return list(zip(keep.tolist(), similarities[keep].tolist(), ids[keep].tolist()))
+    
+    def _hits_to_results(self, hits: List[tuple], vehicles: Dict[int, Vehicle]) -> List[Dict[str, Any]]:
+        """Turn hits into result dicts, in similarity order."""
+        results = []
+        for i, similarity, vehicle_id in hits:
+            vehicle = vehicles.get(vehicle_id)
+            
+            if vehicle:
+                results.append({
+                    'vehicle': vehicle.to_dict(),
+                    'score': similarity,
+                    'rank': i + 1
+                })
         
         return results
     
@@ -268,7 +534,7 @@ class VehicleRetriever:
         
         # Sort by score and return
         combined = list(db_dict.values())
-        combined.sort(key=lambda x: x['score'], reverse=True)
+        combined.sort(key=itemgetter('score'), reverse=True)
         
         return combined[:self.config.get('max_results', 20)]
     
@@ -278,15 +544,21 @@ class VehicleRetriever:
     
     def add_vehicle_to_index(self, vehicle: Vehicle):
         """Add a single vehicle to the existing index."""
+        self.add_vehicles_to_index([vehicle])
+    
+    def add_vehicles_to_index(self, vehicles: List[Vehicle]):
+        """Add vehicles to the existing index, encoding them in one batched call."""
+        if not vehicles:
+            return
+        
         if not self.faiss_index:
             self._create_new_index()
             return
         
-        description = self._create_vehicle_description(vehicle)
-        embedding = self.embedding_model.encode([description])
-        faiss.normalize_L2(embedding.astype(np.float32))
+        embeddings = self._encode([self._create_vehicle_description(vehicle) for vehicle in vehicles])
+        vehicle_ids = np.fromiter((vehicle.id for vehicle in vehicles), dtype=np.int64, count=len(vehicles))
         
-        self.faiss_index.add(embedding.astype(np.float32))
-        self.vehicle_ids.append(vehicle.id)
+        self.faiss_index.add_with_ids(embeddings, vehicle_ids)
+        self.vehicle_ids.extend(vehicle_ids.tolist())
         
         self._save_index()
\ No newline at end of file
@@ -0,0 +1,71 @@
+"""Compiled scoring kernel for large recommendation batches.
+
+Numba is optional; without it NUMBA_AVAILABLE is False, score_batch is None
+and the engine scores every batch with NumPy.
+"""
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _curve(x, curve):
+        """Piecewise-linear score of x on a (2, n) curve of (points, scores)."""
+        points, values = curve[0], curve[1]
+        if x <= points[0]:
+            return values[0]
+        for j in range(1, points.shape[0]):
+            if x <= points[j]:
+                t = (x - points[j - 1]) / (points[j] - points[j - 1])
+                return values[j - 1] + t * (values[j] - values[j - 1])
+        return values[points.shape[0] - 1]
+
+    # nogil: concurrent requests can score on separate cores at the same time
+    @njit(nogil=True, parallel=True, cache=True)
+    def score_batch(price, year, mileage, mpg_city, mpg_highway, safety, reliability, features,
+                    budget_max, weights, price_curve, age_curve, mileage_curve, fuel_curve,
+                    scores, out):
+        """Score N vehicles in one fused pass.
+
+        Fills the preallocated ``scores`` (5, N) with the per-objective scores
+        in SCORE_NAMES order and ``out`` (N,) with the clipped weighted
+        objective score; nothing is allocated per call.
+        """
+        for i in prange(price.shape[0]):
+            p = price[i]
+            if np.isnan(p) or p == 0:
+                price_score = 0.5
+            elif budget_max <= 0:
+                price_score = 0.8
+            else:
+                price_score = _curve(p / budget_max, price_curve)
+
+            y = 2020.0 if np.isnan(year[i]) else year[i]
+            m = 50000.0 if np.isnan(mileage[i]) else mileage[i]
+            reliability_score = (reliability[i] * _curve(2024.0 - y, age_curve)
+                                 * _curve(m, mileage_curve))
+
+            c, h = mpg_city[i], mpg_highway[i]
+            if np.isnan(c) or c == 0 or np.isnan(h) or h == 0:
+                fuel_score = 0.5
+            else:
+                fuel_score = _curve((c + h) / 2, fuel_curve)
+
+            s = safety[i]
+            safety_score = 0.6 if np.isnan(s) or s == 0 else s / 5.0
+
+            scores[0, i] = price_score
+            scores[1, i] = reliability_score
+            scores[2, i] = fuel_score
+            scores[3, i] = safety_score
+            scores[4, i] = features[i]
+
+            total = (weights[0] * price_score + weights[1] * reliability_score + weights[2] * fuel_score
+                     + weights[3] * safety_score + weights[4] * features[i])
+            out[i] = min(1.0, max(0.0, total))
+else:
+    score_batch = None
@@ -1,16 +1,112 @@
 """Recommendation engine for vehicle suggestions."""
+import threading
 import numpy as np
-from typing import List, Dict, Any, Tuple
-from dataclasses import dataclass
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+from dataclasses import dataclass, fields
+from functools import cached_property, lru_cache
 
-@dataclass
+from ._kernels import NUMBA_AVAILABLE, score_batch
+
+@dataclass(frozen=True)
 class ScoringWeights:
-    """Weights for different scoring factors."""
+    """Weights for different scoring factors.
+    
+    Frozen, because normalized weights are cached and shared between requests.
+    """
     price: float = 0.3
     reliability: float = 0.25
     fuel_efficiency: float = 0.2
     safety: float = 0.15
     features: float = 0.1
+    
+    @cached_property
+    def vector(self) -> np.ndarray:
+        """Weights in SCORE_NAMES order, for a dot product with the score matrix."""
+        return np.array([self.price, self.reliability, self.fuel_efficiency, self.safety, self.features],
+                        dtype=np.float64)
+
+@dataclass(slots=True)
+class ScoredVehicle:
+    """One recommendation: the vehicle, its scores and (optionally) why it was picked."""
+    vehicle: Dict[str, Any]
+    score: float
+    base_score: float
+    objective_score: float
+    scores_breakdown: Dict[str, float]
+    explanation: Optional[str] = None
+
+@lru_cache(maxsize=256)
+def _weights_from_tuple(key: Tuple[float, ...]) -> ScoringWeights:
+    """Normalized ScoringWeights for raw (price, reliability, fuel_efficiency, safety, features) weights."""
+    # Normalize weights to sum to 1
+    total = sum(key)
+    if total > 0:
+        key = tuple(weight / total for weight in key)
+    return ScoringWeights(*key)
+
+# Features earning a small bonus whatever the user asked for
+COMMON_DESIRABLE_FEATURES = ('backup camera', 'bluetooth', 'navigation', 'heated seats')
+
+def feature_vocabulary(desired_features: Iterable[str]) -> Dict[str, int]:
+    """Bit per feature name that scoring can match: the common desirable and the desired ones.
+    
+    Built per batch, so it stays as small as the preferences; features
+    outside it never affect a score.
+    """
+    return {feature: bit for bit, feature in enumerate(dict.fromkeys((*COMMON_DESIRABLE_FEATURES, *desired_features)))}
+
+def feature_mask(features: Iterable[str], vocabulary: Dict[str, int]) -> int:
+    """Bitmask of the ``vocabulary`` features in a feature list, so set
+    intersections become an AND and a bit count."""
+    mask = 0
+    for feature in features:
+        bit = vocabulary.get(feature)
+        if bit is not None:
+            mask |= 1 << bit
+    return mask
+
+@lru_cache(maxsize=1024)
+def _lower(text: str) -> str:
+    # Makes repeat heavily across results, so each distinct spelling is lowered once
+    return text.lower()
+
+def _make_key(vehicle: Dict[str, Any]) -> str:
+    """Lower-cased make: '_make_lc' from ingestion (see VehicleDataService) when present."""
+    make = vehicle.get('_make_lc')
+    return _lower(vehicle.get('make') or '') if make is None else make
+
+def top_k_order(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, in the order a stable descending sort would list them.
+    
+    Partitions in O(N) and sorts only the k winners; ties at the cut are
+    taken in input order, as the full sort would.
+    """
+    if k >= len(scores):
+        return np.argsort(-scores, kind='stable')
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    
+    kth = np.partition(-scores, k - 1)[k - 1]
+    above = np.flatnonzero(-scores < kth)
+    ties = np.flatnonzero(-scores == kth)[:k - len(above)]
+    top = np.sort(np.concatenate([above, ties]))
+    return top[np.argsort(-scores[top], kind='stable')]
+
+# Objectives in score-matrix row order
+SCORE_NAMES = ('price', 'reliability', 'fuel_efficiency', 'safety', 'features')
+
+# Piecewise-linear scoring curves as (x points, scores); values outside the
+# points take the nearest end score
+PRICE_CURVE = ((0.7, 0.9, 1.0, 1.1, 1.2), (1.0, 0.9, 0.7, 0.4, 0.1))  # price / budget_max
+AGE_CURVE = ((2, 5, 8, 12), (1.0, 0.95, 0.85, 0.7))  # years
+MILEAGE_CURVE = ((30000, 60000, 100000, 150000), (1.0, 0.95, 0.85, 0.7))  # miles
+FUEL_CURVE = ((15, 20, 25, 30, 40), (0.2, 0.4, 0.6, 0.8, 1.0))  # average MPG
+
+# Batches at least this large are scored by the compiled kernel when numba is installed
+COMPILED_MIN_BATCH = 256
+
+# The curves as (2, n) float arrays, in the compiled kernel's argument order
+_CURVE_ARRAYS = tuple(np.array(curve, dtype=np.float64) for curve in (PRICE_CURVE, AGE_CURVE, MILEAGE_CURVE, FUEL_CURVE))
 
 class RecommendationEngine:
     """Multi-objective vehicle recommendation engine."""
@@ -24,9 +120,31 @@ class RecommendationEngine:
             'hyundai': 0.82, 'kia': 0.80, 'ford': 0.75, 'chevrolet': 0.72,
             'bmw': 0.70, 'mercedes-benz': 0.68, 'audi': 0.66, 'volkswagen': 0.64
         }
+        
+        # Makes sorted for np.searchsorted, and a parallel lookup table whose
+        # extra last entry is the default for unknown makes
+        self._sorted_makes = np.array(sorted(self.reliability_scores))
+        self._reliability_lut = np.array([self.reliability_scores[make] for make in self._sorted_makes] + [0.6],
+                                         dtype=np.float64)
+        
+        # Explanation sentence for each make singled out for reliability
+        self._reliability_phrases = {make: f"{make.title()} has excellent reliability ratings"
+                                     for make in ('toyota', 'honda', 'mazda')}
+        
+        # Per-thread output buffers for the compiled kernel (see _score_compiled)
+        self._scratch = threading.local()
     
-    def recommend(self, search_results: List[Dict[str, Any]], preferences: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Generate personalized recommendations from search results."""
+    def recommend(self, search_results: List[Dict[str, Any]], preferences: Dict[str, Any],
+                  limit: Optional[int] = None, include_explanations: bool = True) -> List[ScoredVehicle]:
+        """Generate personalized recommendations from search results.
+        
+        All candidates are scored at once as columns (one array per vehicle
+        attribute) rather than vehicle by vehicle. Only the top ``limit``
+        (default preferences['limit'], else all) are ranked and get
+        explanations and score breakdowns built. Callers that only need
+        scores can pass ``include_explanations=False`` to leave
+        ``explanation`` as None.
+        """
         
         if not search_results:
             return []
@@ -34,185 +152,183 @@ class RecommendationEngine:
         # Extract weights from preferences
         weights = self._get_scoring_weights(preferences)
         
-        # Score each vehicle
+        # Score all vehicles: one row per objective, one column per vehicle
+        columns = self._vectorize_results(search_results, preferences)
+        if NUMBA_AVAILABLE and len(search_results) >= COMPILED_MIN_BATCH:
+            scores, objective_scores = self._score_compiled(columns, preferences, weights)
+        else:
+            scores = self._score_matrix(columns, preferences)
+            objective_scores = weights.vector @ scores
+            np.clip(objective_scores, 0, 1, out=objective_scores)
+        
+        # Combine RAG and objective scores (ranking stays in float64: scores
+        # often differ only in the third decimal, which 8-bit steps would tie)
+        final_scores = 0.6 * objective_scores
+        final_scores += 0.4 * columns['base_score']
+        
+        # Sort by final score (stable, so ties keep their search order)
+        limit = limit or preferences.get('limit')
+        order = top_k_order(final_scores, limit) if limit else np.argsort(-final_scores, kind='stable')
+        
         scored_vehicles = []
-        for result in search_results:
-            vehicle = result['vehicle']
-            base_score = result.get('score', 1.0)  # RAG similarity score
-            
-            # Calculate multi-objective score
-            objective_score = self._calculate_objective_score(vehicle, preferences, weights)
-            
-            # Combine RAG and objective scores
-            final_score = 0.4 * base_score + 0.6 * objective_score
-            
-            # Generate explanation
-            explanation = self._generate_explanation(vehicle, preferences, weights)
-            
-            scored_vehicles.append({
-                'vehicle': vehicle,
-                'score': final_score,
-                'base_score': base_score,
-                'objective_score': objective_score,
-                'explanation': explanation,
-                'scores_breakdown': self._get_scores_breakdown(vehicle, preferences, weights)
-            })
-        
-        # Sort by final score
-        scored_vehicles.sort(key=lambda x: x['score'], reverse=True)
+        for i in order.tolist():
+            vehicle = search_results[i]['vehicle']
+            scored_vehicles.append(ScoredVehicle(
+                vehicle=vehicle,
+                score=float(final_scores[i]),
+                base_score=search_results[i].get('score', 1.0),
+                objective_score=float(objective_scores[i]),
+                scores_breakdown=self._get_scores_breakdown(scores[:, i], weights),
+                explanation=self._generate_explanation(vehicle, preferences, weights) if include_explanations else None
+            ))
         
         return scored_vehicles
     
+    def _vectorize_results(self, search_results: List[Dict[str, Any]],
+                           preferences: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """Pull the scored vehicle attributes into one float array per attribute.
+        
+        Missing values become NaN; the scorers map them to neutral scores.
+        Feature lists become masks over this batch's feature_vocabulary.
+        """
+        vehicles = [result['vehicle'] for result in search_results]
+        
+        def column(key):
+            return np.array([np.nan if vehicle.get(key) is None else vehicle[key] for vehicle in vehicles],
+                            dtype=np.float64)
+        
+        columns = {key: column(key) for key in ('price', 'year', 'mileage', 'mpg_city', 'mpg_highway', 'safety_rating')}
+        columns['base_score'] = np.array([result.get('score', 1.0) for result in search_results], dtype=np.float64)
+        columns['make_reliability'] = self._reliability_lut[self._make_codes(vehicles)]
+        vocabulary = feature_vocabulary(preferences.get('desired_features', []))
+        columns['features_mask'] = [feature_mask(vehicle.get('features') or (), vocabulary) for vehicle in vehicles]
+        columns['has_features'] = np.array([bool(vehicle.get('features')) for vehicle in vehicles], dtype=bool)
+        columns['feature_vocabulary'] = vocabulary
+        return columns
+    
+    def _make_codes(self, vehicles: List[Dict[str, Any]]) -> np.ndarray:
+        """Index of each vehicle's make in _sorted_makes, or len(_sorted_makes) if unknown.
+        
+        One binary search over all makes, no per-vehicle dict lookups.
+        """
+        makes = np.array([_make_key(vehicle) for vehicle in vehicles], dtype=str)
+        known = len(self._sorted_makes)
+        codes = np.searchsorted(self._sorted_makes, makes)
+        found = self._sorted_makes[np.minimum(codes, known - 1)] == makes
+        return np.where(found, codes, known)
+    
+    def _score_matrix(self, columns: Dict[str, np.ndarray], preferences: Dict[str, Any]) -> np.ndarray:
+        """Score every vehicle on every objective, as a (len(SCORE_NAMES), N) array."""
+        return np.vstack([
+            self._score_price(columns, preferences),
+            self._score_reliability(columns),
+            self._score_fuel_efficiency(columns),
+            self._score_safety(columns),
+            self._score_features(columns, preferences)
+        ])
+    
+    def _score_compiled(self, columns: Dict[str, np.ndarray], preferences: Dict[str, Any],
+                        weights: ScoringWeights) -> Tuple[np.ndarray, np.ndarray]:
+        """Score matrix and objective scores from the numba kernel in one fused pass.
+        
+        The kernel writes into this thread's scratch buffers, which only grow
+        (to twice the batch size) when a larger batch arrives; the returned
+        arrays are views into them, valid until this thread's next call.
+        """
+        n = len(columns['base_score'])
+        buffers = getattr(self._scratch, 'buffers', None)
+        if buffers is None or buffers[1].shape[0] < n:
+            size = max(2 * n, COMPILED_MIN_BATCH)
+            buffers = (np.empty((len(SCORE_NAMES), size), dtype=np.float64), np.empty(size, dtype=np.float64))
+            self._scratch.buffers = buffers
+        scores, objective_scores = buffers[0][:, :n], buffers[1][:n]
+        
+        score_batch(
+            columns['price'], columns['year'], columns['mileage'], columns['mpg_city'],
+            columns['mpg_highway'], columns['safety_rating'], columns['make_reliability'],
+            self._score_features(columns, preferences), float(preferences.get('budget_max') or 0),
+            weights.vector, *_CURVE_ARRAYS, scores, objective_scores
+        )
+        return scores, objective_scores
+    
     def _get_scoring_weights(self, preferences: Dict[str, Any]) -> ScoringWeights:
-        """Extract and normalize scoring weights from preferences."""
+        """Extract and normalize scoring weights from preferences (cached per distinct weights)."""
         user_weights = preferences.get('weights', {})
-        
-        weights = ScoringWeights(
-            price=user_weights.get('price', 0.3),
-            reliability=user_weights.get('reliability', 0.25),
-            fuel_efficiency=user_weights.get('fuel_efficiency', 0.2),
-            safety=user_weights.get('safety', 0.15),
-            features=user_weights.get('features', 0.1)
-        )
-        
-        # Normalize weights to sum to 1
-        total = weights.price + weights.reliability + weights.fuel_efficiency + weights.safety + weights.features
-        if total > 0:
-            weights.price /= total
-            weights.reliability /= total
-            weights.fuel_efficiency /= total
-            weights.safety /= total
-            weights.features /= total
-        
-        return weights
+        return _weights_from_tuple(tuple(user_weights.get(field.name, field.default) for field in fields(ScoringWeights)))
     
-    def _calculate_objective_score(self, vehicle: Dict[str, Any], preferences: Dict[str, Any], weights: ScoringWeights) -> float:
-        """Calculate multi-objective score for a vehicle."""
-        
-        scores = {
-            'price': self._score_price(vehicle, preferences),
-            'reliability': self._score_reliability(vehicle),
-            'fuel_efficiency': self._score_fuel_efficiency(vehicle),
-            'safety': self._score_safety(vehicle),
-            'features': self._score_features(vehicle, preferences)
-        }
-        
-        # Calculate weighted score
-        total_score = (
-            weights.price * scores['price'] +
-            weights.reliability * scores['reliability'] +
-            weights.fuel_efficiency * scores['fuel_efficiency'] +
-            weights.safety * scores['safety'] +
-            weights.features * scores['features']
-        )
-        
-        return max(0, min(1, total_score))
+    def _calculate_scores(self, vehicle: Dict[str, Any], preferences: Dict[str, Any],
+                          weights: ScoringWeights) -> Tuple[float, Dict[str, float]]:
+        """Multi-objective score and per-objective scores of a single vehicle, from one scoring pass."""
+        scores = self._score_matrix(self._vectorize_results([{'vehicle': vehicle}], preferences), preferences)[:, 0]
+        return float(np.clip(weights.vector @ scores, 0, 1)), dict(zip(SCORE_NAMES, scores.tolist()))
     
-    def _score_price(self, vehicle: Dict[str, Any], preferences: Dict[str, Any]) -> float:
-        """Score vehicle based on price preference."""
-        price = vehicle.get('price')
-        if not price:
-            return 0.5  # Neutral score for unknown price
+    def _score_price(self, columns: Dict[str, np.ndarray], preferences: Dict[str, Any]) -> np.ndarray:
+        """Score vehicles based on price preference."""
+        price = columns['price']
+        unknown = np.isnan(price) | (price == 0)
         
         budget_max = preferences.get('budget_max')
         if not budget_max:
-            return 0.8  # Good score if no budget constraint
-        
-        # Score based on how well it fits budget
-        if price <= budget_max * 0.7:  # Well under budget
-            return 1.0
-        elif price <= budget_max * 0.9:  # Comfortably within budget
-            return 0.9
-        elif price <= budget_max:  # Just within budget
-            return 0.7
-        elif price <= budget_max * 1.1:  # Slightly over budget
-            return 0.4
-        else:  # Significantly over budget
-            return 0.1
+            return np.where(unknown, 0.5, 0.8)  # Good score if no budget constraint
+        
+        # Score based on how well it fits budget, from well under to significantly over
+        score = np.interp(price / budget_max, *PRICE_CURVE)
+        return np.where(unknown, 0.5, score)  # Neutral score for unknown price
     
-    def _score_reliability(self, vehicle: Dict[str, Any]) -> float:
-        """Score vehicle based on reliability."""
-        make = vehicle.get('make', '').lower()
-        base_score = self.reliability_scores.get(make, 0.6)  # Default average
+    def _score_reliability(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Score vehicles based on reliability."""
+        base_score = columns['make_reliability']
         
         # Adjust for age
-        year = vehicle.get('year', 2020)
         current_year = 2024
-        age = current_year - year
-        
-        if age <= 2:
-            age_multiplier = 1.0
-        elif age <= 5:
-            age_multiplier = 0.95
-        elif age <= 8:
-            age_multiplier = 0.85
-        else:
-            age_multiplier = 0.7
+        age = current_year - np.nan_to_num(columns['year'], nan=2020)
+        age_multiplier = np.interp(age, *AGE_CURVE)
         
         # Adjust for mileage
-        mileage = vehicle.get('mileage', 50000)
-        if mileage <= 30000:
-            mileage_multiplier = 1.0
-        elif mileage <= 60000:
-            mileage_multiplier = 0.95
-        elif mileage <= 100000:
-            mileage_multiplier = 0.85
-        else:
-            mileage_multiplier = 0.7
+        mileage = np.nan_to_num(columns['mileage'], nan=50000)
+        mileage_multiplier = np.interp(mileage, *MILEAGE_CURVE)
         
         return base_score * age_multiplier * mileage_multiplier
     
-    def _score_fuel_efficiency(self, vehicle: Dict[str, Any]) -> float:
-        """Score vehicle based on fuel efficiency."""
-        mpg_city = vehicle.get('mpg_city', 0)
-        mpg_highway = vehicle.get('mpg_highway', 0)
-        
-        if not mpg_city or not mpg_highway:
-            return 0.5  # Neutral for unknown
+    def _score_fuel_efficiency(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Score vehicles based on fuel efficiency."""
+        mpg_city = columns['mpg_city']
+        mpg_highway = columns['mpg_highway']
+        unknown = np.isnan(mpg_city) | (mpg_city == 0) | np.isnan(mpg_highway) | (mpg_highway == 0)
         
         avg_mpg = (mpg_city + mpg_highway) / 2
         
-        # Score based on MPG ranges
-        if avg_mpg >= 40:  # Excellent
-            return 1.0
-        elif avg_mpg >= 30:  # Good
-            return 0.8
-        elif avg_mpg >= 25:  # Average
-            return 0.6
-        elif avg_mpg >= 20:  # Below average
-            return 0.4
-        else:  # Poor
-            return 0.2
+        # Score based on MPG, from poor to excellent
+        score = np.interp(avg_mpg, *FUEL_CURVE)
+        return np.where(unknown, 0.5, score)  # Neutral for unknown
     
-    def _score_safety(self, vehicle: Dict[str, Any]) -> float:
-        """Score vehicle based on safety rating."""
-        safety_rating = vehicle.get('safety_rating')
-        if not safety_rating:
-            return 0.6  # Neutral for unknown
+    def _score_safety(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Score vehicles based on safety rating."""
+        safety_rating = columns['safety_rating']
+        unknown = np.isnan(safety_rating) | (safety_rating == 0)
         
-        return safety_rating / 5.0  # Normalize to 0-1 scale
+        return np.where(unknown, 0.6, safety_rating / 5.0)  # Normalize to 0-1 scale, neutral for unknown
     
-    def _score_features(self, vehicle: Dict[str, Any], preferences: Dict[str, Any]) -> float:
-        """Score vehicle based on desired features match."""
-        vehicle_features = set(vehicle.get('features', []))
+    def _score_features(self, columns: Dict[str, np.ndarray], preferences: Dict[str, Any]) -> np.ndarray:
+        """Score vehicles based on desired features match."""
         desired_features = set(preferences.get('desired_features', []))
+        masks = columns['features_mask']
         
         if not desired_features:
-            return 0.8  # Good score if no specific requirements
-        
-        if not vehicle_features:
-            return 0.3  # Low score for no features listed
+            return np.full(len(masks), 0.8)  # Good score if no specific requirements
         
         # Calculate feature match ratio
-        matched_features = vehicle_features.intersection(desired_features)
-        match_ratio = len(matched_features) / len(desired_features)
+        vocabulary = columns['feature_vocabulary']
+        desired_mask = feature_mask(desired_features, vocabulary)
+        matched = np.array([(mask & desired_mask).bit_count() for mask in masks], dtype=np.float64)
+        match_ratio = matched / len(desired_features)
         
         # Bonus for having extra desirable features
-        common_desirable = {'backup camera', 'bluetooth', 'navigation', 'heated seats'}
-        bonus_features = vehicle_features.intersection(common_desirable)
-        bonus_score = len(bonus_features) * 0.05  # 5% bonus per feature
+        common_mask = feature_mask(COMMON_DESIRABLE_FEATURES, vocabulary)
+        bonus = np.array([(mask & common_mask).bit_count() for mask in masks], dtype=np.float64)
+        bonus_score = bonus * 0.05  # 5% bonus per feature
         
-        return min(1.0, match_ratio + bonus_score)
+        return np.where(columns['has_features'], np.minimum(1.0, match_ratio + bonus_score), 0.3)  # Low score for no features listed
     
     def _generate_explanation(self, vehicle: Dict[str, Any], preferences: Dict[str, Any], weights: ScoringWeights) -> str:
         """Generate human-readable explanation for recommendation."""
@@ -230,9 +346,9 @@ class RecommendationEngine:
         
         # Reliability explanation
         if weights.reliability > 0.2:
-            make = vehicle.get('make', '').lower()
-            if make in ['toyota', 'honda', 'mazda']:
-                explanations.append(f"{make.title()} has excellent reliability ratings")
+            phrase = self._reliability_phrases.get(_make_key(vehicle))
+            if phrase:
+                explanations.append(phrase)
         
         # Fuel efficiency explanation
         if weights.fuel_efficiency > 0.2:
@@ -251,28 +367,24 @@ class RecommendationEngine:
         
         # Features explanation
         desired_features = preferences.get('desired_features', [])
-        vehicle_features = vehicle.get('features', [])
-        if desired_features and vehicle_features:
-            matched = set(vehicle_features).intersection(set(desired_features))
+        if desired_features:
+            matched = len(set(desired_features).intersection(vehicle.get('features') or ()))
             if matched:
-                explanations.append(f"includes {len(matched)} of your desired features")
+                explanations.append(f"includes {matched} of your desired features")
         
         if not explanations:
             return "Good overall match for your preferences"
         
-        return "Great choice because it offers " + ", ".join(explanations) + "."
+        return "Great choice because it offers %s." % ", ".join(explanations)
     
-    def _get_scores_breakdown(self, vehicle: Dict[str, Any], preferences: Dict[str, Any], weights: ScoringWeights) -> Dict[str, float]:
-        """Get detailed score breakdown for transparency."""
-        return {
-            'price_score': self._score_price(vehicle, preferences),
-            'reliability_score': self._score_reliability(vehicle),
-            'fuel_efficiency_score': self._score_fuel_efficiency(vehicle),
-            'safety_score': self._score_safety(vehicle),
-            'features_score': self._score_features(vehicle, preferences),
+    def _get_scores_breakdown(self, scores: np.ndarray, weights: ScoringWeights) -> Dict[str, float]:
+        """Get detailed score breakdown for transparency from one vehicle's column of the score matrix."""
+        breakdown = {f'{name}_score': score for name, score in zip(SCORE_NAMES, scores.tolist())}
+        breakdown.update({
             'price_weight': weights.price,
             'reliability_weight': weights.reliability,
             'fuel_efficiency_weight': weights.fuel_efficiency,
             'safety_weight': weights.safety,
             'features_weight': weights.features
-        }
\ No newline at end of file
+        })
+        return breakdown
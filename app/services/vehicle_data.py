@@ -2,12 +2,28 @@
 Vehicle data service that integrates live data sources with the existing CarFinder system.
 """
 
+import ast
 import asyncio
-from typing import Dict, List, Optional, Any
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import fields
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 import logging
 import json
 
+import numpy as np
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 import sys
 from pathlib import Path
 
@@ -18,47 +34,134 @@ if str(app_dir) not in sys.path:
 
 from models.database import DatabaseManager, Vehicle
 from utils.config import load_config, get_database_url
+from utils.db import insert_new_vehicles, search_vehicles_by_makes
 from data_sources.aggregator import VehicleDataAggregator, SearchCriteria
 from data_sources.base import VehicleListing
+from recommendations.engine import top_k_order
 
 logger = logging.getLogger(__name__)
 
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+# Sources whose listings get the freshness bonus in _sort_by_relevance
+_LIVE_SOURCES = frozenset({'cars.com', 'autotrader', 'cargurus'})
+
+# Live searches kept in the per-criteria cache (see _search_criteria_cached)
+LIVE_CACHE_SIZE = 512
+
+# Live listings per canonical search criteria: key -> (fetched at, listings).
+# Module-level, so every VehicleDataService in the process (one per app or
+# script) serves and fills the same entries
+_LIVE_CACHE: 'OrderedDict[tuple, Tuple[float, List[VehicleListing]]]' = OrderedDict()
+_LIVE_CACHE_LOCK = threading.Lock()
+
+
+def _close_service(cache_writer: ThreadPoolExecutor, aggregator: VehicleDataAggregator) -> None:
+    """Release a VehicleDataService's resources; holds no reference to the service itself."""
+    cache_writer.shutdown(wait=True)
+    aggregator.close()
+
+
+def parse_features(features: Any) -> List[str]:
+    """
+    Normalize a stored features value into a list.
+    
+    Live listings are cached as JSON; older local rows hold a Python list
+    repr, so fall back to a literal parse before treating the value as a
+    single feature.
+    """
+    if not features:
+        return []
+    if not isinstance(features, str):
+        return features
+    try:
+        return _json_loads(features)
+    except ValueError:
+        try:
+            return ast.literal_eval(features)
+        except (ValueError, SyntaxError):
+            return [features]
+
+
+def _features_json(features: Any) -> str:
+    """Serialize a features list for the features TEXT column ('[]' when empty)."""
+    if not features:
+        return '[]'
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(features).decode()
+    return json.dumps(features)
+
+
 class VehicleDataService:
     """
     Service for managing vehicle data from multiple sources.
     Integrates live data with local database and caching.
     """
     
+    # Any truck-specific keyword anywhere in a lower-cased model name, in one C-level scan
+    _TRUCK_MODEL_RE = re.compile('|'.join(map(re.escape, [
+        'f-150', 'f150', 'silverado', 'sierra', 'tacoma', 'tundra', 'ram', 'frontier', 'ranger',
+        'colorado', 'canyon', 'ridgeline', 'truck', '1500', '2500', '3500'
+    ])))
+    
+    # Makes queried for live truck searches; the sources match models exactly,
+    # so trucks are picked out of each make's listings by _filter_truck_models
+    _TRUCK_MAKES = ('Ford', 'Chevrolet', 'Toyota', 'Ram', 'GMC')
+    
     def __init__(self):
         self.config = load_config()
-        database_url = get_database_url(self.config)
-        self.db_manager = DatabaseManager(database_url)
+        self.database_url = get_database_url(self.config)
+        self.db_manager = DatabaseManager(self.database_url)
         self.aggregator = VehicleDataAggregator(self.config)
-        self.cache_duration = timedelta(hours=2)  # Cache live data for 2 hours
+        self.cache_duration = timedelta(hours=self.config['cache_duration_hours'])  # Cache live data (2 hours by default)
+        
+        # Shared live-listings cache (see _LIVE_CACHE)
+        self._live_cache = _LIVE_CACHE
+        self._live_cache_lock = _LIVE_CACHE_LOCK
+        
+        # Writes live results to the database off the request path, one batch at a time
+        self._cache_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='live-cache')
         
-    def search_vehicles_hybrid(self, preferences: Dict[str, Any], use_live_data: bool = True) -> List[Dict[str, Any]]:
+        # Same lifetime hook as the aggregator's: runs close() when the service
+        # is collected or at interpreter exit, without pinning the instance
+        self._finalizer = weakref.finalize(self, _close_service, self._cache_writer, self.aggregator)
+    
+    def close(self) -> None:
+        """Finish pending cache writes, then release the aggregator (idempotent)."""
+        self._finalizer()
+        
+    def search_vehicles_hybrid(self, preferences: Dict[str, Any], use_live_data: bool = True,
+                               limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Hybrid search combining local database and live data sources.
         
         Args:
             preferences: Search preferences from user
             use_live_data: Whether to include live data sources
+            limit: Maximum number of results; defaults to preferences['limit'] or 20
             
         Returns:
             Combined results from local DB and/or live sources
         """
+        return asyncio.run(self.search_vehicles_hybrid_async(preferences, use_live_data, limit))
+    
+    async def search_vehicles_hybrid_async(self, preferences: Dict[str, Any], use_live_data: bool = True,
+                                           limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Async variant of search_vehicles_hybrid; all live-source queries run concurrently."""
+        limit = limit or preferences.get('limit', 20)
         results = []
         
         if use_live_data:
             # When live data is ON, use ONLY live sources for pure live experience
             try:
-                live_results = self._search_live_sources(preferences)
+                live_results = await self._search_live_sources_async(preferences, limit)
                 results.extend(live_results)
                 logger.info(f"Live mode: Found {len(live_results)} vehicles from live sources only")
                 
-                # Optionally cache live results to local database
+                # Optionally cache live results to local database, without
+                # holding up the response on the writes
                 if live_results:
-                    self._cache_live_results(live_results)
+                    self._cache_writer.submit(self._cache_live_results, live_results)
                     
                 # DON'T mix local results when in pure live mode
                 # local_results = self._search_local_database(preferences)
@@ -67,21 +170,20 @@ class VehicleDataService:
                     
             except Exception as e:
                 logger.error(f"Error searching live sources: {e}")
-                # Fallback to local database if live sources fail
-                local_results = self._search_local_database(preferences)
+                # Fallback to local database if live sources fail; the blocking
+                # query runs in a worker thread, off the event loop
+                local_results = await asyncio.to_thread(self._search_local_database, preferences)
                 results.extend(local_results)
                 logger.info(f"Fallback: Found {len(local_results)} vehicles in local database")
         else:
             # When live data is OFF, use only local database
-            local_results = self._search_local_database(preferences)
+            local_results = await asyncio.to_thread(self._search_local_database, preferences)
             results.extend(local_results)
             logger.info(f"Local only: Found {len(local_results)} vehicles in local database")
         
-        # Remove duplicates and sort by relevance
+        # Remove duplicates and keep the most relevant results
         unique_results = self._deduplicate_results(results)
-        sorted_results = self._sort_by_relevance(unique_results, preferences)
-        
-        return sorted_results[:preferences.get('limit', 20)]
+        return self._sort_by_relevance(unique_results, preferences, limit)
     
     def _search_local_database(self, preferences: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Search the local SQLite database."""
@@ -92,22 +194,19 @@ class VehicleDataService:
         # If looking for trucks, filter by truck makes/models
         if vehicle_type == 'truck' and not make_filter:
             truck_makes = ['Ford', 'Chevrolet', 'Toyota', 'Ram', 'GMC', 'Nissan']
-            # For now, search each truck make (this could be optimized)
-            all_vehicles = []
-            for truck_make in truck_makes[:3]:  # Limit to top 3 makes
-                vehicles = self.db_manager.search_vehicles(
-                    make=truck_make,
-                    model=preferences.get('model'),
-                    min_year=preferences.get('year_min'),
-                    max_year=preferences.get('year_max'),
-                    min_price=preferences.get('price_min'),
-                    max_price=preferences.get('budget_max'),
-                    max_mileage=preferences.get('mileage_max'),
-                    fuel_type=preferences.get('fuel_type'),
-                    limit=20
-                )
-                all_vehicles.extend(vehicles)
-            return [self._vehicle_to_dict(vehicle) for vehicle in all_vehicles]
+            # One make IN (...) query covers every truck make
+            vehicles = search_vehicles_by_makes(
+                self.database_url,
+                truck_makes,
+                model=preferences.get('model'),
+                min_year=preferences.get('year_min'),
+                max_year=preferences.get('year_max'),
+                min_price=preferences.get('price_min'),
+                max_price=preferences.get('budget_max'),
+                max_mileage=preferences.get('mileage_max'),
+                fuel_type=preferences.get('fuel_type'),
+                limit=50
+            )
         else:
             vehicles = self.db_manager.search_vehicles(
                 make=make_filter,
@@ -123,39 +222,77 @@ class VehicleDataService:
         
         return [self._vehicle_to_dict(vehicle) for vehicle in vehicles]
     
-    def _search_live_sources(self, preferences: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Search live data sources through the aggregator."""
+    async def _search_live_sources_async(self, preferences: Dict[str, Any], limit: Optional[int] = None,
+                                         force: bool = False) -> List[Dict[str, Any]]:
+        """
+        Search live data sources with every criteria set fanned out concurrently.
+        
+        Batches are converted (and truck-filtered) in criteria order, not in
+        the order the queries finish, so which duplicate survives and how ties
+        rank do not depend on network timing. Once twice ``limit`` listings are
+        in hand, the remaining queries are cancelled; the 2x headroom leaves
+        room for duplicates dropped later.
+        """
+        tasks = [asyncio.ensure_future(self._search_criteria_cached(criteria, force))
+                 for criteria in self._live_search_criteria(preferences, limit)]
+        results = []
+        try:
+            for task in tasks:
+                results.extend(self._live_listings_to_dicts(await task, preferences))
+                if limit and len(results) >= 2 * limit:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+        return results
+    
+    async def _search_criteria_cached(self, criteria: SearchCriteria, force: bool = False) -> List[VehicleListing]:
+        """
+        Query all live sources for one criteria set, reusing listings fetched
+        for the same (case-insensitive) criteria within cache_duration.
+        
+        With ``force`` the sources are always queried and the fresh listings
+        replace the cached entry.
+        """
+        key = tuple(
+            value.casefold() if isinstance(value, str) else value
+            for value in (getattr(criteria, field.name) for field in fields(criteria))
+        )
+        ttl = self.cache_duration.total_seconds()
+        
+        with self._live_cache_lock:
+            cached = None if force else self._live_cache.get(key)
+            if cached and time.monotonic() - cached[0] < ttl:
+                self._live_cache.move_to_end(key)
+                return cached[1]
+        
+        listings = await self.aggregator.search_all_sources_async(criteria)
+        
+        # Empty results may be a transient source failure, so they are not kept
+        if listings:
+            with self._live_cache_lock:
+                self._live_cache[key] = (time.monotonic(), listings)
+                self._live_cache.move_to_end(key)
+                while len(self._live_cache) > LIVE_CACHE_SIZE:
+                    self._live_cache.popitem(last=False)  # Evict least recently used
+        
+        return listings
+    
+    def invalidate_live_cache(self) -> None:
+        """Drop all cached live listings, for every service instance, so the next searches query the sources again."""
+        with self._live_cache_lock:
+            self._live_cache.clear()
+    
+    def _live_search_criteria(self, preferences: Dict[str, Any], limit: Optional[int] = None) -> List[SearchCriteria]:
+        """Build the aggregator queries for a set of preferences, capping each source at ``limit`` rows."""
         make_filter = preferences.get('make')
-        vehicle_type = preferences.get('vehicle_type')
         
-        # If searching for trucks, use truck-specific makes
-        if vehicle_type == 'truck' and not make_filter:
-            truck_results = []
-            truck_makes = ['Ford', 'Chevrolet', 'Toyota', 'Ram', 'GMC']
-            
-            for truck_make in truck_makes:
-                criteria = SearchCriteria(
-                    make=truck_make,
-                    model=preferences.get('model'), 
-                    year_min=preferences.get('year_min'),
-                    year_max=preferences.get('year_max'),
-                    price_min=preferences.get('price_min'),
-                    price_max=preferences.get('budget_max'),
-                    mileage_max=preferences.get('mileage_max'),
-                    location=preferences.get('location'),
-                    radius=preferences.get('radius', 50),
-                    limit_per_source=3
-                )
-                listings = self.aggregator.search_all_sources(criteria)
-                truck_results.extend(listings)
-            
-            # Filter to only include actual truck models and specific class if requested
-            filtered_trucks = self._filter_truck_models(truck_results, preferences)
-            return [self._listing_to_dict(listing) for listing in filtered_trucks]
-        else:
-            criteria = SearchCriteria(
-                make=make_filter,
-                model=preferences.get('model'), 
+        def criteria_for(make: Optional[str], limit_per_source: int) -> SearchCriteria:
+            if limit:
+                limit_per_source = min(limit_per_source, limit)
+            return SearchCriteria(
+                make=make,
+                model=preferences.get('model'),
                 year_min=preferences.get('year_min'),
                 year_max=preferences.get('year_max'),
                 price_min=preferences.get('price_min'),
@@ -163,16 +300,24 @@ class VehicleDataService:
                 mileage_max=preferences.get('mileage_max'),
                 location=preferences.get('location'),
                 radius=preferences.get('radius', 50),
-                limit_per_source=10
+                limit_per_source=limit_per_source
             )
         
-        live_listings = self.aggregator.search_all_sources(criteria)
-        return [self._listing_to_dict(listing) for listing in live_listings]
+        # If searching for trucks, use truck-specific makes
+        if preferences.get('vehicle_type') == 'truck' and not make_filter:
+            return [criteria_for(truck_make, 3) for truck_make in self._TRUCK_MAKES]
+        
+        return [criteria_for(make_filter, 10)]
+    
+    def _live_listings_to_dicts(self, listings: List[VehicleListing], preferences: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Convert aggregated listings to dicts, keeping only trucks for truck searches."""
+        if preferences.get('vehicle_type') == 'truck' and not preferences.get('make'):
+            # Filter to only include actual truck models and specific class if requested
+            listings = self._filter_truck_models(listings, preferences)
+        return [self._listing_to_dict(listing) for listing in listings]
     
     def _filter_truck_models(self, listings, preferences=None):
         """Filter listings to only include actual truck models, optionally by truck class."""
-        truck_models = ['f-150', 'f150', 'silverado', 'sierra', 'tacoma', 'tundra', 'ram', 'frontier', 'ranger', 'colorado', 'canyon', 'ridgeline', 'truck', '1500', '2500', '3500']
-        
         # Get truck class preference if specified (1500, 2500, 3500)
         truck_class = preferences.get('truck_class') if preferences else None
         
@@ -181,143 +326,160 @@ class VehicleDataService:
             model = listing.model.lower() if listing.model else ''
             
             # Check if the model contains truck-specific keywords
-            is_truck = any(truck_model in model for truck_model in truck_models)
+            is_truck = self._TRUCK_MODEL_RE.search(model) is not None
             
             if is_truck:
                 # If truck class is specified, filter by that class
                 if truck_class:
                     if truck_class in model:
                         filtered.append(listing)
-                        logger.info(f"Kept {truck_class} truck: {listing.make} {listing.model}")
+                        logger.debug("Kept %s truck: %s %s", truck_class, listing.make, listing.model)
                     else:
-                        logger.info(f"Filtered out wrong truck class: {listing.make} {listing.model} (wanted {truck_class})")
+                        logger.debug("Filtered out wrong truck class: %s %s (wanted %s)", listing.make, listing.model, truck_class)
                 else:
                     filtered.append(listing)
-                    logger.info(f"Kept truck: {listing.make} {listing.model}")
+                    logger.debug("Kept truck: %s %s", listing.make, listing.model)
             else:
-                logger.info(f"Filtered out non-truck: {listing.make} {listing.model}")
+                logger.debug("Filtered out non-truck: %s %s", listing.make, listing.model)
         
+        logger.info("Truck filter: kept %d / %d listings", len(filtered), len(listings))
         return filtered
     
     def _cache_live_results(self, live_results: List[Dict[str, Any]]) -> None:
-        """Cache live results to local database for future searches."""
+        """
+        Cache live results to local database for future searches.
+        
+        Vehicles whose VIN is already stored are skipped; the VIN check and a
+        single executemany insert run in one transaction.
+        """
         try:
+            rows = []
             for result in live_results:
-                # Check if vehicle already exists by VIN or external ID
-                existing = None
-                if result.get('vin'):
-                    existing = self.db_manager.get_vehicle_by_vin(result['vin'])
-                
-                if not existing:
-                    # Create new vehicle record
-                    vehicle_data = {
-                        'make': result['make'],
-                        'model': result['model'],
-                        'year': result['year'],
-                        'price': result['price'],
-                        'mileage': result['mileage'],
-                        'fuel_type': result['fuel_type'],
-                        'transmission': result['transmission'],
-                        'location': result['location'],
-                        'safety_rating': result['safety_rating'],
-                        'mpg_city': result['mpg_city'],
-                        'mpg_highway': result['mpg_highway'],
-                        'vin': result['vin'],
-                        'description': result['description'],
-                        'features': json.dumps(result.get('features', []))  # Convert to JSON string
-                    }
-                    
-                    vehicle = Vehicle(**vehicle_data)
-                    self.db_manager.add_vehicle(vehicle)
-                    
-            logger.info(f"Cached {len(live_results)} live results to database")
+                # Create new vehicle record
+                rows.append({
+                    'make': result['make'],
+                    'model': result['model'],
+                    'year': result['year'],
+                    'price': result['price'],
+                    'mileage': result['mileage'],
+                    'fuel_type': result['fuel_type'],
+                    'transmission': result['transmission'],
+                    'location': result['location'],
+                    'safety_rating': result['safety_rating'],
+                    'mpg_city': result['mpg_city'],
+                    'mpg_highway': result['mpg_highway'],
+                    'vin': result['vin'],
+                    'description': result['description'],
+                    'features': _features_json(result.get('features'))  # Convert to JSON string
+                })
+            
+            inserted = insert_new_vehicles(self.database_url, rows)
+            logger.info(f"Cached {inserted} new of {len(live_results)} live results to database")
             
         except Exception as e:
             logger.error(f"Error caching live results: {e}")
     
     def _deduplicate_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Remove duplicate vehicles from combined results."""
+        """
+        Remove duplicate vehicles from combined results, keeping the first of each.
+        
+        A result is dropped when its VIN or its similarity key matches a result
+        already kept; rows dropped earlier do not count.
+        """
+        # VINs (str) and similarity keys (tuple) share one set; they never compare equal
         unique_results = []
-        seen_vins = set()
-        seen_similar = set()
+        seen = set()
         
         for result in results:
-            # Check for VIN duplicates
-            vin = result.get('vin')
-            if vin and vin in seen_vins:
-                continue
-                
-            # Check for similar vehicles
             similarity_key = (
-                result.get('make', '').lower(),
-                result.get('model', '').lower(),
+                result['_make_lc'],
+                result['_model_lc'],
                 result.get('year'),
                 result.get('mileage'),
-                int(result.get('price', 0))
+                int(result.get('price') or 0)
             )
-            
-            if similarity_key in seen_similar:
+            vin = result.get('vin')
+            if similarity_key in seen or (vin and vin in seen):
                 continue
-                
-            unique_results.append(result)
             
+            unique_results.append(result)
+            seen.add(similarity_key)
             if vin:
-                seen_vins.add(vin)
-            seen_similar.add(similarity_key)
+                seen.add(vin)
         
         return unique_results
     
-    def _sort_by_relevance(self, results: List[Dict[str, Any]], preferences: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Sort results by relevance to user preferences."""
+    def _sort_by_relevance(self, results: List[Dict[str, Any]], preferences: Dict[str, Any],
+                           limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Sort results by relevance to user preferences, keeping only the top ``limit`` if given.
         
-        def relevance_score(vehicle: Dict[str, Any]) -> float:
-            score = 0.0
-            
-            # Prefer vehicles from live sources (more up-to-date)
-            if vehicle.get('source') in ['cars.com', 'autotrader', 'cargurus']:
-                score += 10
-            
-            # Price preference
-            budget_max = preferences.get('budget_max')
-            if budget_max and vehicle.get('price'):
-                if vehicle['price'] <= budget_max:
-                    price_ratio = vehicle['price'] / budget_max
-                    score += (1 - price_ratio) * 20  # Cheaper is better within budget
-            
-            # Mileage preference (lower is better)
-            mileage = vehicle.get('mileage', 0)
-            if mileage:
-                mileage_score = max(0, 15 * (1 - mileage / 150000))  # Normalize to 150k miles
-                score += mileage_score
-            
-            # Year preference (newer is better)
-            year = vehicle.get('year')
-            if year:
-                current_year = datetime.now().year
-                age_score = max(0, 10 * (1 - (current_year - year) / 15))  # Normalize to 15 years
-                score += age_score
-            
-            # Fuel type preference
-            preferred_fuel = preferences.get('fuel_type')
-            if preferred_fuel and vehicle.get('fuel_type') == preferred_fuel:
-                score += 15
-            
-            # Safety rating
-            safety_rating = vehicle.get('safety_rating')
-            if safety_rating:
-                score += safety_rating * 3
-            
-            return score
+        Relevance is computed for all results at once from NumPy columns and
+        ranked stably, so ties keep their incoming order; with a limit only the
+        top rows are sorted (see top_k_order).
+        """
+        if not results:
+            return []
+        
+        n = len(results)
+        
+        def column(key: str) -> np.ndarray:
+            # Missing and zero values are both "unknown" (NaN) here
+            return np.fromiter((result.get(key) or np.nan for result in results), dtype=np.float64, count=n)
+        
+        def matches(key: str, values) -> np.ndarray:
+            return np.fromiter((result.get(key) in values for result in results), dtype=bool, count=n)
+        
+        score = np.zeros(n)
         
-        return sorted(results, key=relevance_score, reverse=True)
+        # Prefer vehicles from live sources (more up-to-date)
+        score[matches('source', _LIVE_SOURCES)] += 10
+        
+        # Price preference: cheaper is better within budget
+        budget_max = preferences.get('budget_max')
+        if budget_max:
+            price = column('price')
+            score += np.where(price <= budget_max, (1 - price / budget_max) * 20, 0)
+        
+        # Mileage preference (lower is better), normalized to 150k miles
+        mileage = column('mileage')
+        score += np.where(np.isnan(mileage), 0, np.maximum(0, 15 * (1 - mileage / 150000)))
+        
+        # Year preference (newer is better), normalized to 15 years
+        year = column('year')
+        current_year = datetime.now().year
+        score += np.where(np.isnan(year), 0, np.maximum(0, 10 * (1 - (current_year - year) / 15)))
+        
+        # Fuel type preference
+        preferred_fuel = preferences.get('fuel_type')
+        if preferred_fuel:
+            score[matches('fuel_type', (preferred_fuel,))] += 15
+        
+        # Safety rating
+        safety_rating = column('safety_rating')
+        score += np.where(np.isnan(safety_rating), 0, safety_rating * 3)
+        
+        order = np.argsort(-score, kind='stable') if limit is None else top_k_order(score, limit)
+        return [results[i] for i in order.tolist()]
     
     def _vehicle_to_dict(self, vehicle: Vehicle) -> Dict[str, Any]:
-        """Convert Vehicle model to dictionary."""
-        return vehicle.to_dict()
+        """Convert Vehicle model to dictionary, with features parsed into a list."""
+        data = vehicle.to_dict()
+        data['features'] = parse_features(data.get('features'))
+        return self._add_match_keys(data)
     
     def _listing_to_dict(self, listing: VehicleListing) -> Dict[str, Any]:
         """Convert VehicleListing to dictionary."""
-        return listing.to_dict()
+        return self._add_match_keys(listing.to_dict())
+    
+    def _add_match_keys(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Attach interned, case-folded make/model ('_make_lc', '_model_lc') so
+        dedup and scoring compare normalized strings without re-lowering them.
+        """
+        data['_make_lc'] = sys.intern((data.get('make') or '').casefold())
+        data['_model_lc'] = sys.intern((data.get('model') or '').casefold())
+        return data
     
     def get_data_source_status(self) -> Dict[str, Any]:
         """Get status information about data sources."""
@@ -331,11 +493,16 @@ class VehicleDataService:
     
     def refresh_live_data(self, preferences: Dict[str, Any] = None) -> Dict[str, Any]:
         """Manually refresh live data for current search criteria."""
+        return asyncio.run(self.refresh_live_data_async(preferences))
+    
+    async def refresh_live_data_async(self, preferences: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Refresh live data, querying all sources concurrently."""
         if not preferences:
             preferences = {'budget_max': 50000, 'limit': 50}  # Default broad search
-            
+        
         try:
-            live_results = self._search_live_sources(preferences)
+            # A manual refresh always goes to the sources; other cached searches are kept
+            live_results = await self._search_live_sources_async(preferences, force=True)
             if live_results:
                 self._cache_live_results(live_results)
                 
@@ -350,4 +517,4 @@ class VehicleDataService:
                 'success': False,
                 'error': str(e),
                 'timestamp': datetime.now().isoformat()
-            }
\ No newline at end of file
+            }
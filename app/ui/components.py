@@ -1,6 +1,9 @@
 """Streamlit UI components for CarFinder."""
+import random
 import streamlit as st
-from typing import Dict, List, Any, Optional
+import pandas as pd
+from typing import Dict, List, Any, Optional, Tuple
+from .sidebar import PREFERENCE_KEYS
 
 def render_header():
     """Render the application header."""
@@ -11,55 +14,98 @@ def render_header():
     Find your perfect car match with personalized AI recommendations.
     """)
 
-def render_vehicle_card(vehicle: Dict[str, Any], show_score: bool = False, score: float = None):
-    """Render a vehicle card with details."""
+def vehicle_key(vehicle: Dict[str, Any], position: Optional[int] = None) -> str:
+    """Stable widget key for a vehicle: its id or VIN, else a hash of its identifying fields.
+    
+    Live listings without id or VIN can match on every identifying field, so
+    the fallback key also carries ``position``, the vehicle's place in the
+    list being rendered, when one is given.
+    """
+    vehicle_id = vehicle.get('id') or vehicle.get('vin')
+    if vehicle_id:
+        return str(vehicle_id)
+    identity = (vehicle.get('year'), vehicle.get('make'), vehicle.get('model'), vehicle.get('mileage'), vehicle.get('price'))
+    key = f"{vehicle.get('year')}_{vehicle.get('make')}_{vehicle.get('model')}_{hash(identity) & 0xffffffff:08x}"
+    return key if position is None else f"{key}_{position}"
+
+@st.cache_data(max_entries=256)
+def format_vehicle_card(vehicle: Dict[str, Any]) -> Dict[str, Any]:
+    """Pre-format the static text of a vehicle card.
+    
+    Holds the title, metric values and detail lines, plus all of them as one
+    markdown block for compact cards.
+    """
+    details = []
+    if vehicle['fuel_type']:
+        details.append(f"**Fuel Type:** {vehicle['fuel_type']}")
+    if vehicle['transmission']:
+        details.append(f"**Transmission:** {vehicle['transmission']}")
+    if vehicle['location']:
+        details.append(f"**Location:** {vehicle['location']}")
+    if vehicle['safety_rating']:
+        details.append(f"**Safety Rating:** {'⭐' * int(vehicle['safety_rating'])} ({vehicle['safety_rating']}/5)")
+    
+    card = {
+        'title': f"{vehicle['year']} {vehicle['make']} {vehicle['model']}",
+        'price': f"${vehicle['price']:,.0f}" if vehicle['price'] else "N/A",
+        'mileage': f"{vehicle['mileage']:,} miles" if vehicle['mileage'] else "N/A",
+        'mpg': f"{vehicle['mpg_city']}/{vehicle['mpg_highway']}" if vehicle['mpg_city'] and vehicle['mpg_highway'] else "N/A",
+        'details': "  \n".join(details),
+    }
+    card['markdown'] = (
+        f"### {card['title']}\n\n"
+        f"**Price:** {card['price']} &nbsp;&nbsp; **Mileage:** {card['mileage']} &nbsp;&nbsp; **MPG:** {card['mpg']}\n\n"
+        f"{card['details']}"
+    )
+    return card
+
+def render_vehicle_card(vehicle: Dict[str, Any], show_score: bool = False, score: float = None,
+                        key_prefix: str = "card", compact: bool = False, position: Optional[int] = None):
+    """Render a vehicle card with details.
+    
+    Button keys are stable across reruns; pass a distinct ``key_prefix`` when the
+    same vehicle can appear in more than one list on a page, and the card's
+    ``position`` in its list (see vehicle_key) when listings may lack an id
+    and VIN. ``compact`` cards
+    send their static text as one markdown element instead of a subheader,
+    three metrics and a details block, for long result lists.
+    """
     with st.container():
         col1, col2 = st.columns([2, 1])
         
+        card = format_vehicle_card(vehicle)
+        
         with col1:
-            st.subheader(f"{vehicle['year']} {vehicle['make']} {vehicle['model']}")
-            
-            # Basic info
-            info_cols = st.columns(3)
-            with info_cols[0]:
-                st.metric("Price", f"${vehicle['price']:,.0f}" if vehicle['price'] else "N/A")
-            with info_cols[1]:
-                st.metric("Mileage", f"{vehicle['mileage']:,} miles" if vehicle['mileage'] else "N/A")
-            with info_cols[2]:
-                if vehicle['mpg_city'] and vehicle['mpg_highway']:
-                    st.metric("MPG", f"{vehicle['mpg_city']}/{vehicle['mpg_highway']}")
-                else:
-                    st.metric("MPG", "N/A")
-            
-            # Additional details
-            if vehicle['fuel_type']:
-                st.write(f"**Fuel Type:** {vehicle['fuel_type']}")
-            if vehicle['transmission']:
-                st.write(f"**Transmission:** {vehicle['transmission']}")
-            if vehicle['location']:
-                st.write(f"**Location:** {vehicle['location']}")
-            
-            # Safety rating
-            if vehicle['safety_rating']:
-                st.write(f"**Safety Rating:** {'⭐' * int(vehicle['safety_rating'])} ({vehicle['safety_rating']}/5)")
+            if compact:
+                st.markdown(card['markdown'])
+            else:
+                st.subheader(card['title'])
+                
+                # Basic info
+                info_cols = st.columns(3)
+                with info_cols[0]:
+                    st.metric("Price", card['price'])
+                with info_cols[1]:
+                    st.metric("Mileage", card['mileage'])
+                with info_cols[2]:
+                    st.metric("MPG", card['mpg'])
+                
+                # Additional details and safety rating, one markdown block
+                if card['details']:
+                    st.markdown(card['details'])
         
         with col2:
             if show_score and score is not None:
                 st.metric("Match Score", f"{score:.1%}")
             
             # Action buttons
-            import hashlib
-            import time
-            import random
-            # Create a more unique key using multiple factors
-            unique_suffix = str(int(time.time() * 1000000)) + str(random.randint(1000, 9999))
-            vehicle_id = vehicle.get('id', hashlib.md5(str(vehicle).encode()).hexdigest()[:8])
+            vehicle_id = vehicle_key(vehicle, position)
             
-            if st.button(f"View Details", key=f"details_{vehicle_id}_{unique_suffix}"):
+            if st.button(f"View Details", key=f"{key_prefix}_details_{vehicle_id}"):
                 st.session_state[f"show_details_{vehicle_id}"] = True
             
             if vehicle.get('vin'):
-                if st.button(f"Check Recalls", key=f"recalls_{vehicle_id}_{unique_suffix}"):
+                if st.button(f"Check Recalls", key=f"{key_prefix}_recalls_{vehicle_id}"):
                     # Implement recall check
                     st.info("Recall check feature coming soon!")
         
@@ -83,8 +129,8 @@ def render_vehicle_card(vehicle: Dict[str, Any], show_score: bool = False, score
         
         st.markdown("---")
 
-def render_recommendation_summary(recommendations: List[Dict[str, Any]], preferences: Dict[str, Any]):
-    """Render recommendation summary and insights."""
+def render_recommendation_summary(recommendations: List[Any], preferences: Dict[str, Any]):
+    """Render recommendation summary and insights from RecommendationEngine.recommend() results."""
     if not recommendations:
         st.warning("No vehicles found matching your criteria. Try adjusting your preferences.")
         return
@@ -95,21 +141,38 @@ def render_recommendation_summary(recommendations: List[Dict[str, Any]], prefere
     top_pick = recommendations[0]
     with st.container():
         st.markdown("#### 🏆 Our Top Pick for You")
-        render_vehicle_card(top_pick['vehicle'], show_score=True, score=top_pick['score'])
+        render_vehicle_card(top_pick.vehicle, show_score=True, score=top_pick.score, key_prefix="rec", position=0)
         
         # Explanation
-        if 'explanation' in top_pick:
-            st.info(f"**Why we recommend this:** {top_pick['explanation']}")
+        if top_pick.explanation:
+            st.info(f"**Why we recommend this:** {top_pick.explanation}")
     
     # Other recommendations
     if len(recommendations) > 1:
         st.markdown("#### 📋 Other Great Options")
         
         for i, rec in enumerate(recommendations[1:], 1):
-            with st.expander(f"{i+1}. {rec['vehicle']['year']} {rec['vehicle']['make']} {rec['vehicle']['model']} (Score: {rec['score']:.1%})"):
-                render_vehicle_card(rec['vehicle'], show_score=True, score=rec['score'])
-                if 'explanation' in rec:
-                    st.write(f"**Match reason:** {rec['explanation']}")
+            vehicle = rec.vehicle
+            with st.expander(f"{i+1}. {vehicle['year']} {vehicle['make']} {vehicle['model']} (Score: {rec.score:.1%})"):
+                render_vehicle_card(vehicle, show_score=True, score=rec.score, key_prefix="rec", position=i)
+                if rec.explanation:
+                    st.write(f"**Match reason:** {rec.explanation}")
+
+@st.cache_data(max_entries=64)
+def build_comparison_frame(selected: Tuple[Tuple[str, Dict[str, Any]], ...]) -> pd.DataFrame:
+    """Comparison table for (name, vehicle) pairs, cached while the selection is unchanged."""
+    comparison_data = []
+    for name, vehicle in selected:
+        comparison_data.append({
+            "Vehicle": name,
+            "Price": f"${vehicle['price']:,.0f}" if vehicle['price'] else "N/A",
+            "Mileage": f"{vehicle['mileage']:,}" if vehicle['mileage'] else "N/A",
+            "MPG City": vehicle['mpg_city'] or "N/A",
+            "MPG Highway": vehicle['mpg_highway'] or "N/A",
+            "Fuel Type": vehicle['fuel_type'] or "N/A",
+            "Safety Rating": vehicle['safety_rating'] or "N/A",
+        })
+    return pd.DataFrame(comparison_data).set_index("Vehicle")
 
 def render_comparison_tool(vehicles: List[Dict[str, Any]]):
     """Render side-by-side vehicle comparison."""
@@ -127,23 +190,8 @@ def render_comparison_tool(vehicles: List[Dict[str, Any]]):
     )
     
     if len(selected) >= 2:
-        comparison_data = []
-        for name in selected:
-            vehicle = vehicle_options[name]
-            comparison_data.append({
-                "Vehicle": name,
-                "Price": f"${vehicle['price']:,.0f}" if vehicle['price'] else "N/A",
-                "Mileage": f"{vehicle['mileage']:,}" if vehicle['mileage'] else "N/A",
-                "MPG City": vehicle['mpg_city'] or "N/A",
-                "MPG Highway": vehicle['mpg_highway'] or "N/A",
-                "Fuel Type": vehicle['fuel_type'] or "N/A",
-                "Safety Rating": vehicle['safety_rating'] or "N/A",
-            })
-        
         # Display comparison table
-        import pandas as pd
-        df = pd.DataFrame(comparison_data)
-        st.table(df.set_index("Vehicle"))
+        st.table(build_comparison_frame(tuple((name, vehicle_options[name]) for name in selected)))
 
 def render_chat_interface():
     """Render the conversational chat interface."""
@@ -196,24 +244,33 @@ def generate_chat_response(user_input: str, conversation_history: List[Dict[str,
         "I found some excellent options for you! Would you like me to explain why each vehicle might be a good fit for your needs?",
     ]
     
-    import random
     return random.choice(responses)
 
 def render_filters_applied(preferences: Dict[str, Any]):
     """Show applied filters in a compact format."""
+    summary = format_filters_applied(preferences.get('budget_max'), preferences.get('make'),
+                                     preferences.get('fuel_type'), preferences.get('min_year'))
+    if summary:
+        st.markdown(summary)
+
+@st.cache_data(max_entries=64)
+def format_filters_applied(budget_max: Optional[int], make: Optional[str],
+                           fuel_type: Optional[str], min_year: Optional[int]) -> str:
+    """Active-filters line for the given filter values ("" when none are set)."""
     applied_filters = []
     
-    if preferences.get('budget_max'):
-        applied_filters.append(f"Budget: ≤${preferences['budget_max']:,}")
-    if preferences.get('make'):
-        applied_filters.append(f"Make: {preferences['make']}")
-    if preferences.get('fuel_type'):
-        applied_filters.append(f"Fuel: {preferences['fuel_type']}")
-    if preferences.get('min_year'):
-        applied_filters.append(f"Year: ≥{preferences['min_year']}")
+    if budget_max:
+        applied_filters.append(f"Budget: ≤${budget_max:,}")
+    if make:
+        applied_filters.append(f"Make: {make}")
+    if fuel_type:
+        applied_filters.append(f"Fuel: {fuel_type}")
+    if min_year:
+        applied_filters.append(f"Year: ≥{min_year}")
     
     if applied_filters:
-        st.markdown("**Active Filters:** " + " | ".join(applied_filters))
+        return "**Active Filters:** " + " | ".join(applied_filters)
+    return ""
 
 def render_loading_placeholder():
     """Render loading placeholder while searching."""
@@ -237,7 +294,6 @@ def render_no_results_message(preferences: Dict[str, Any]):
     
     if st.button("Clear All Filters"):
         # Clear session state preferences
-        for key in list(st.session_state.keys()):
-            if key.startswith('pref_'):
-                del st.session_state[key]
+        for key in PREFERENCE_KEYS:
+            st.session_state.pop(key, None)
         st.experimental_rerun()
\ No newline at end of file
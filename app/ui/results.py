@@ -1,9 +1,11 @@
 """Results display component for CarFinder."""
+import numpy as np
 import streamlit as st
-from typing import Dict, List, Any
-from .components import render_vehicle_card, render_recommendation_summary, render_comparison_tool
+from typing import Dict, List, Any, Optional, Tuple
+from .components import render_vehicle_card, render_recommendation_summary, render_comparison_tool, vehicle_key
+from .sidebar import PREFERENCE_KEYS
 
-def render_results(recommendations: List[Dict[str, Any]], search_results: List[Dict[str, Any]]):
+def render_results(recommendations: List[Any], search_results: List[Dict[str, Any]]):
     """Render search results and recommendations."""
     
     if not recommendations and not search_results:
@@ -31,73 +33,116 @@ def render_results(recommendations: List[Dict[str, Any]], search_results: List[D
         else:
             st.info("No vehicles available for comparison.")
 
+# Result cards rendered per page of the All Results tab
+RESULTS_PAGE_SIZE = 20
+
+# Sort options of the All Results tab, in menu order, with their labels
+SORT_LABELS = {
+    "price_asc": "Price (Low to High)",
+    "price_desc": "Price (High to Low)",
+    "year_desc": "Year (Newest First)",
+    "mileage_asc": "Mileage (Low to High)",
+    "mpg_desc": "MPG (Best First)",
+}
+
 def render_all_results(search_results: List[Dict[str, Any]]):
-    """Render all search results in a grid."""
+    """Render all search results in a grid, one page of RESULTS_PAGE_SIZE cards at a time."""
     
     if not search_results:
         st.info("No vehicles found matching your criteria.")
         return
     
-    # Sorting options
-    col1, col2 = st.columns([3, 1])
+    # Unwrap recommendation dicts once: (vehicle, score) per result
+    entries = [unwrap_result(result) for result in search_results]
     
-    with col1:
-        st.markdown(f"Showing {len(search_results)} vehicles")
+    # Sorting options (the column is filled first: the page depends on the sort)
+    col1, col2 = st.columns([3, 1])
     
     with col2:
         sort_by = st.selectbox(
             "Sort by:",
-            options=["price_asc", "price_desc", "year_desc", "mileage_asc", "mpg_desc"],
-            format_func=lambda x: {
-                "price_asc": "Price (Low to High)",
-                "price_desc": "Price (High to Low)", 
-                "year_desc": "Year (Newest First)",
-                "mileage_asc": "Mileage (Low to High)",
-                "mpg_desc": "MPG (Best First)"
-            }.get(x, x)
+            options=list(SORT_LABELS),
+            format_func=SORT_LABELS.__getitem__
         )
     
-    # Sort results
-    sorted_results = sort_results(search_results, sort_by)
+    # A new result set or sort order starts again on the first page
+    results_key = (hash(tuple(vehicle_key(vehicle) for vehicle, _ in entries)), sort_by)
+    if st.session_state.get('results_page_key') != results_key:
+        st.session_state['results_page_key'] = results_key
+        st.session_state['results_page'] = 0
+    
+    page_count = -(-len(search_results) // RESULTS_PAGE_SIZE)
+    page = min(st.session_state.get('results_page', 0), page_count - 1)
+    start = page * RESULTS_PAGE_SIZE
+    end = min(start + RESULTS_PAGE_SIZE, len(search_results))
     
-    # Display results
-    for i, result in enumerate(sorted_results):
-        # Handle both direct vehicle dicts and recommendation dicts
-        if isinstance(result, dict) and 'vehicle' in result:
-            vehicle = result['vehicle']
-            score = result.get('score')
+    with col1:
+        if page_count > 1:
+            st.markdown(f"Showing {start + 1}-{end} of {len(search_results)} vehicles")
         else:
-            vehicle = result
-            score = None
-        
-        render_vehicle_card(vehicle, show_score=score is not None, score=score)
-        
-        # Add some spacing every few results
-        if (i + 1) % 3 == 0 and i < len(sorted_results) - 1:
-            st.markdown("---")
+            st.markdown(f"Showing {len(search_results)} vehicles")
+    
+    # Sort results (cached, so page flips do not sort again)
+    order = _sorted_order([vehicle for vehicle, _ in entries], sort_by)
+    
+    # Display this page's results; each card ends with its own divider
+    for i in order[start:end]:
+        vehicle, score = entries[i]
+        render_vehicle_card(vehicle, show_score=score is not None, score=score, key_prefix="all", compact=True,
+                            position=i)
+    
+    if page_count > 1:
+        prev_col, page_col, next_col = st.columns([1, 2, 1])
+        with prev_col:
+            if st.button("← Previous", disabled=page == 0, key="results_prev"):
+                st.session_state['results_page'] = page - 1
+                st.rerun()
+        with page_col:
+            st.markdown(f"Page {page + 1} of {page_count}")
+        with next_col:
+            if st.button("Next →", disabled=page >= page_count - 1, key="results_next"):
+                st.session_state['results_page'] = page + 1
+                st.rerun()
+
+def unwrap_result(result: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[float]]:
+    """(vehicle, score) for a direct vehicle dict or a recommendation dict."""
+    if isinstance(result, dict) and 'vehicle' in result:
+        return result['vehicle'], result.get('score')
+    return result, None
 
 def sort_results(results: List[Dict[str, Any]], sort_by: str) -> List[Dict[str, Any]]:
-    """Sort search results by the specified criteria."""
+    """Sort search results by the specified criteria.
+    
+    The order is cached per (vehicles, sort_by), so reruns that only touch
+    other widgets reuse it instead of sorting again.
+    """
+    return [results[i] for i in _sorted_order([unwrap_result(result)[0] for result in results], sort_by)]
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _sorted_order(vehicles: List[Dict[str, Any]], sort_by: str) -> List[int]:
+    # Returns positions rather than the sorted vehicles, so a cache hit copies
+    # a list of ints instead of every vehicle dict
     
-    def get_vehicle_data(result):
-        if isinstance(result, dict) and 'vehicle' in result:
-            return result['vehicle']
-        return result
+    def column(key: str, default: float) -> np.ndarray:
+        # Missing values sort as ``default``
+        return np.fromiter((default if vehicle.get(key) is None else vehicle[key] for vehicle in vehicles),
+                           dtype=np.float64, count=len(vehicles))
     
     if sort_by == "price_asc":
-        return sorted(results, key=lambda x: get_vehicle_data(x).get('price', float('inf')))
+        keys = column('price', np.inf)
     elif sort_by == "price_desc":
-        return sorted(results, key=lambda x: get_vehicle_data(x).get('price', 0), reverse=True)
+        keys = -column('price', 0)
     elif sort_by == "year_desc":
-        return sorted(results, key=lambda x: get_vehicle_data(x).get('year', 0), reverse=True)
+        keys = -column('year', 0)
     elif sort_by == "mileage_asc":
-        return sorted(results, key=lambda x: get_vehicle_data(x).get('mileage', float('inf')))
+        keys = column('mileage', np.inf)
     elif sort_by == "mpg_desc":
-        return sorted(results, key=lambda x: (
-            get_vehicle_data(x).get('mpg_city', 0) + get_vehicle_data(x).get('mpg_highway', 0)
-        ) / 2, reverse=True)
+        keys = -(column('mpg_city', 0) + column('mpg_highway', 0)) / 2
+    else:
+        return list(range(len(vehicles)))
     
-    return results
+    # Descending sorts negate the keys, so a stable ascending argsort keeps ties in input order
+    return np.argsort(keys, kind='stable').tolist()
 
 def render_no_results():
     """Render message when no results found."""
@@ -119,9 +164,8 @@ def render_no_results():
         
         if st.button("Clear All Filters"):
             # Clear session state
-            keys_to_clear = [k for k in st.session_state.keys() if k.startswith('pref_')]
-            for key in keys_to_clear:
-                del st.session_state[key]
+            for key in PREFERENCE_KEYS:
+                st.session_state.pop(key, None)
             st.experimental_rerun()
     
     with col2:
@@ -133,8 +177,14 @@ def render_no_results():
         - Cars with high safety ratings
         """)
 
-def render_vehicle_details_modal(vehicle: Dict[str, Any]):
-    """Render detailed vehicle information in a modal-like container."""
+@st.fragment
+def render_vehicle_details_modal(vehicle: Dict[str, Any], position: Optional[int] = None):
+    """Render detailed vehicle information in a modal-like container.
+    
+    Runs as a fragment, so its action buttons rerun only this panel instead
+    of the whole search and results page. ``position`` keeps the button keys
+    of listings without an id or VIN apart (see vehicle_key).
+    """
     
     st.markdown(f"## {vehicle['year']} {vehicle['make']} {vehicle['model']}")
     
@@ -186,21 +236,22 @@ def render_vehicle_details_modal(vehicle: Dict[str, Any]):
         st.markdown("### 📍 Location")
         st.write(vehicle['location'])
     
-    # Action buttons
+    # Action buttons, keyed per vehicle so several open panels do not collide
     st.markdown("### 🎯 Next Steps")
     col1, col2, col3 = st.columns(3)
+    vehicle_id = vehicle_key(vehicle, position)
     
     with col1:
-        if st.button("💾 Save to Favorites"):
+        if st.button("💾 Save to Favorites", key=f"modal_favorite_{vehicle_id}"):
             st.success("Added to favorites!")
     
     with col2:
-        if st.button("🔍 Check Recalls"):
+        if st.button("🔍 Check Recalls", key=f"modal_recalls_{vehicle_id}"):
             if vehicle.get('vin'):
                 st.info("Recall check feature coming soon!")
             else:
                 st.warning("VIN not available for recall check.")
     
     with col3:
-        if st.button("📊 Calculate TCO"):
+        if st.button("📊 Calculate TCO", key=f"modal_tco_{vehicle_id}"):
             st.info("Total Cost of Ownership calculator coming soon!")
\ No newline at end of file
@@ -1,6 +1,14 @@
 """Sidebar component for user preferences input."""
 import streamlit as st
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+
+# Session-state keys of the preference and weight widgets below, so a reset
+# clears exactly these instead of scanning all of session state
+PREFERENCE_KEYS = (
+    "pref_budget_max", "pref_make", "pref_year_range", "pref_fuel_type", "pref_min_mpg",
+    "pref_max_mileage", "pref_features", "pref_min_safety", "pref_location", "pref_radius",
+)
+WEIGHT_KEYS = ("weight_price", "weight_reliability", "weight_fuel", "weight_safety")
 
 def render_sidebar() -> Dict[str, Any]:
     """Render the preferences sidebar and return user selections."""
@@ -142,29 +150,40 @@ def render_sidebar() -> Dict[str, Any]:
     # Reset button
     if st.sidebar.button("🔄 Reset Preferences", use_container_width=True):
         # Clear all preference keys from session state
-        keys_to_clear = [k for k in st.session_state.keys() if k.startswith('pref_') or k.startswith('weight_')]
-        for key in keys_to_clear:
-            del st.session_state[key]
+        for key in PREFERENCE_KEYS + WEIGHT_KEYS:
+            st.session_state.pop(key, None)
         st.rerun()
     
     return preferences
 
 def render_preference_summary(preferences: Dict[str, Any]):
     """Render a summary of current preferences."""
+    lines = build_preference_summary(preferences.get('budget_max'), preferences.get('make'),
+                                     preferences.get('fuel_type'), preferences.get('min_year'),
+                                     preferences.get('max_year'))
+    if lines:
+        st.sidebar.markdown("\n\n".join(lines))
+
+@st.cache_data(max_entries=64)
+def build_preference_summary(budget_max: Optional[int], make: Optional[str], fuel_type: Optional[str],
+                             min_year: Optional[int], max_year: Optional[int]) -> List[str]:
+    """Markdown lines of the current-filters summary for the given values ([] when none are set)."""
     active_prefs = []
     
-    if preferences.get('budget_max'):
-        active_prefs.append(f"Budget: ≤${preferences['budget_max']:,}")
-    if preferences.get('make'):
-        active_prefs.append(f"Make: {preferences['make']}")
-    if preferences.get('fuel_type'):
-        active_prefs.append(f"Fuel: {preferences['fuel_type']}")
-    if preferences.get('min_year') and preferences.get('max_year'):
-        active_prefs.append(f"Year: {preferences['min_year']}-{preferences['max_year']}")
-    
-    if active_prefs:
-        st.sidebar.markdown("**Current filters:**")
-        for pref in active_prefs[:3]:  # Show max 3
-            st.sidebar.markdown(f"• {pref}")
-        if len(active_prefs) > 3:
-            st.sidebar.markdown(f"• ... and {len(active_prefs) - 3} more")
\ No newline at end of file
+    if budget_max:
+        active_prefs.append(f"Budget: ≤${budget_max:,}")
+    if make:
+        active_prefs.append(f"Make: {make}")
+    if fuel_type:
+        active_prefs.append(f"Fuel: {fuel_type}")
+    if min_year and max_year:
+        active_prefs.append(f"Year: {min_year}-{max_year}")
+    
+    if not active_prefs:
+        return []
+    
+    lines = ["**Current filters:**"]
+    lines.extend(f"• {pref}" for pref in active_prefs[:3])  # Show max 3
+    if len(active_prefs) > 3:
+        lines.append(f"• ... and {len(active_prefs) - 3} more")
+    return lines
@@ -0,0 +1,31 @@
+"""Compiled BM25 accumulation kernel for SimpleRAG.
+
+Numba is optional; without it NUMBA_AVAILABLE is False, accumulate_postings
+is None and SimpleRAG scores queries with np.bincount.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    # Serial on purpose: postings of different query terms hit the same
+    # vehicles, so a parallel loop would race on ``out``
+    @njit(nogil=True, cache=True)
+    def accumulate_postings(ptr, docs, weights, cols, weight_scale, term_bonus, out):
+        """Add one query's term scores to ``out`` in a single pass over its postings.
+
+        For each query column ``cols[q]`` every posting ``j`` adds
+        ``weights[j] * weight_scale + term_bonus[q]`` to ``out[docs[j]]``;
+        nothing is allocated per call.
+        """
+        for q in range(cols.shape[0]):
+            col = cols[q]
+            bonus = term_bonus[q]
+            for j in range(ptr[col], ptr[col + 1]):
+                out[docs[j]] += weights[j] * weight_scale + bonus
+else:
+    accumulate_postings = None
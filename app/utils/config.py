@@ -1,61 +1,84 @@
 """Configuration management for CarFinder application."""
 import os
+from functools import lru_cache
 from pathlib import Path
-from dotenv import load_dotenv
 from typing import Dict, Any
 
-# Load environment variables from project root
+# Environment variables are loaded from the project root's .env
 project_root = Path(__file__).parent.parent.parent
 env_path = project_root / ".env"
-load_dotenv(env_path)
+app_root = Path(__file__).parent.parent
 
 def load_config() -> Dict[str, Any]:
-    """Load application configuration from environment variables."""
+    """Load application configuration from environment variables.
+    
+    The environment is read once per process; each call returns a fresh copy
+    so callers may modify their config without affecting others.
+    """
+    return dict(_load_config())
+
+@lru_cache(maxsize=1)
+def _load_config() -> Dict[str, Any]:
+    # Imported and parsed on first use rather than at import, and only once
+    from dotenv import load_dotenv
+    load_dotenv(env_path)
+    
+    # One snapshot of the environment, read after .env is applied
+    env = dict(os.environ)
+    
+    def env_int(key: str, default: str) -> int:
+        return int(env.get(key, default))
+    
+    def env_float(key: str, default: str) -> float:
+        return float(env.get(key, default))
+    
+    def env_bool(key: str, default: str) -> bool:
+        return env.get(key, default).lower() == "true"
     
     config = {
         # Ollama Configuration
-        "ollama_host": os.getenv("OLLAMA_HOST", "http://localhost:11434"),
-        "ollama_model": os.getenv("OLLAMA_MODEL", "llama3.1"),
-        "embedding_model": os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2"),
+        "ollama_host": env.get("OLLAMA_HOST", "http://localhost:11434"),
+        "ollama_model": env.get("OLLAMA_MODEL", "llama3.1"),
+        "embedding_model": env.get("EMBEDDING_MODEL", "all-MiniLM-L6-v2"),
         
         # Database Configuration
-        "database_path": os.getenv("DATABASE_PATH", "data/carfinder.db"),
+        "database_path": env.get("DATABASE_PATH", "data/carfinder.db"),
         
         # Search Configuration
-        "max_results": int(os.getenv("MAX_RESULTS", "20")),
-        "similarity_threshold": float(os.getenv("SIMILARITY_THRESHOLD", "0.7")),
-        "rerank_top_k": int(os.getenv("RERANK_TOP_K", "10")),
+        "max_results": env_int("MAX_RESULTS", "20"),
+        "similarity_threshold": env_float("SIMILARITY_THRESHOLD", "0.7"),
+        "rerank_top_k": env_int("RERANK_TOP_K", "10"),
         
         # UI Configuration
-        "streamlit_theme": os.getenv("STREAMLIT_THEME", "light"),
-        "debug_mode": os.getenv("DEBUG_MODE", "false").lower() == "true",
+        "streamlit_theme": env.get("STREAMLIT_THEME", "light"),
+        "debug_mode": env_bool("DEBUG_MODE", "false"),
         
         # Optional APIs
-        "nhtsa_api_key": os.getenv("NHTSA_API_KEY"),
-        "recalls_api_endpoint": os.getenv("RECALLS_API_ENDPOINT", "https://api.nhtsa.gov/recalls/recallsByVehicle"),
+        "nhtsa_api_key": env.get("NHTSA_API_KEY"),
+        "recalls_api_endpoint": env.get("RECALLS_API_ENDPOINT", "https://api.nhtsa.gov/recalls/recallsByVehicle"),
         
         # Cloud LLM Fallback
-        "openai_api_key": os.getenv("OPENAI_API_KEY"),
-        "anthropic_api_key": os.getenv("ANTHROPIC_API_KEY"),
+        "openai_api_key": env.get("OPENAI_API_KEY"),
+        "anthropic_api_key": env.get("ANTHROPIC_API_KEY"),
         
         # Vehicle Data APIs
-        "auto_dev_api_key": os.getenv("AUTO_DEV_API_KEY"),
-        "autotrader_api_key": os.getenv("AUTOTRADER_API_KEY"),
-        "cargurus_api_key": os.getenv("CARGURUS_API_KEY"),
-        "cars_com_rate_limit": int(os.getenv("CARS_COM_RATE_LIMIT", "1")),
-        "enable_live_data": os.getenv("ENABLE_LIVE_DATA", "true").lower() == "true",
-        "cache_duration_hours": int(os.getenv("CACHE_DURATION_HOURS", "2")),
-        "max_results_per_source": int(os.getenv("MAX_RESULTS_PER_SOURCE", "20")),
-        "default_search_radius": int(os.getenv("DEFAULT_SEARCH_RADIUS", "50")),
+        "auto_dev_api_key": env.get("AUTO_DEV_API_KEY"),
+        "autotrader_api_key": env.get("AUTOTRADER_API_KEY"),
+        "cargurus_api_key": env.get("CARGURUS_API_KEY"),
+        "cars_com_rate_limit": env_int("CARS_COM_RATE_LIMIT", "1"),
+        "enable_live_data": env_bool("ENABLE_LIVE_DATA", "true"),
+        "cache_duration_hours": env_int("CACHE_DURATION_HOURS", "2"),
+        "max_results_per_source": env_int("MAX_RESULTS_PER_SOURCE", "20"),
+        "default_search_radius": env_int("DEFAULT_SEARCH_RADIUS", "50"),
         
         # Logging
-        "log_level": os.getenv("LOG_LEVEL", "INFO"),
-        "log_file": os.getenv("LOG_FILE", "logs/carfinder.log"),
+        "log_level": env.get("LOG_LEVEL", "INFO"),
+        "log_file": env.get("LOG_FILE", "logs/carfinder.log"),
         
         # Project paths
-        "project_root": Path(__file__).parent.parent,
-        "data_dir": Path(__file__).parent.parent / "data",
-        "models_dir": Path(__file__).parent.parent / "models",
+        "project_root": app_root,
+        "data_dir": app_root / "data",
+        "models_dir": app_root / "models",
     }
     
     # Ensure directories exist
@@ -0,0 +1,258 @@
+"""Shared database engine and batched vehicle queries."""
+import hashlib
+import math
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Index, create_engine, event, func, inspect, insert, select
+from sqlalchemy.orm import Session
+
+try:
+    from app.models.database import Vehicle, get_database_manager
+except ImportError:
+    import sys
+    from pathlib import Path
+    sys.path.append(str(Path(__file__).parent.parent))
+    from models.database import Vehicle, get_database_manager
+
+# Bound parameters per IN query; stays under SQLite's host parameter limit
+IN_CLAUSE_CHUNK = 500
+
+# Rows per executemany batch in insert_new_vehicles
+INSERT_CHUNK = 1000
+
+# False positive rate of the stored-VIN Bloom filter, and the fewest VINs it is
+# sized for (inserted VINs are added too; past capacity only the rate rises)
+VIN_BLOOM_ERROR_RATE = 0.01
+VIN_BLOOM_MIN_CAPACITY = 1_000_000
+
+# Applied to every new SQLite connection: WAL lets readers run alongside the
+# live-results cache writer; NORMAL sync is durable in WAL mode with fewer fsyncs
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-65536",  # 64 MiB page cache
+    "PRAGMA temp_store=MEMORY",
+)
+
+# Indexes for the local search filters; lower() expressions match the
+# case-insensitive comparisons in search_vehicles_by_makes. Declared on the
+# vehicles table, so create_all() builds them for new databases too
+SEARCH_INDEXES = (
+    Index('ix_vehicles_search_make_model', func.lower(Vehicle.make), func.lower(Vehicle.model)),
+    Index('ix_vehicles_search_year', Vehicle.year),
+    Index('ix_vehicles_search_price', Vehicle.price),
+    Index('ix_vehicles_search_mileage', Vehicle.mileage),
+)
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+@lru_cache(maxsize=None)
+def get_engine(database_url: str):
+    """Return one pooled engine per database URL for the life of the process.
+    
+    Missing SEARCH_INDEXES are created on first use of an existing database.
+    SQLite connections are switched to WAL journaling (see SQLITE_PRAGMAS). The
+    journal mode is stored in the database file, so connections opened by
+    DatabaseManager use WAL as well once any engine here has connected.
+    """
+    engine = create_engine(database_url)
+    if engine.dialect.name == 'sqlite':
+        event.listen(engine, 'connect', _apply_sqlite_pragmas)
+    
+    # Existing databases predate SEARCH_INDEXES; add any that are missing
+    if inspect(engine).has_table(Vehicle.__tablename__):
+        for index in SEARCH_INDEXES:
+            index.create(engine, checkfirst=True)
+    return engine
+
+@lru_cache(maxsize=None)
+def get_shared_database_manager(database_url: Optional[str] = None):
+    """Return one DatabaseManager per database URL (default URL if None), shared process-wide.
+    
+    Modules outlive Streamlit reruns, so pages and services calling this
+    share one manager and connection pool instead of opening a new one per run.
+    """
+    return get_database_manager(database_url) if database_url else get_database_manager()
+
+def get_vehicles_by_ids(database_url: str, vehicle_ids: Iterable[int]) -> Dict[int, Vehicle]:
+    """Fetch vehicles by primary key with a single ``WHERE id IN (...)`` query."""
+    ids = list(dict.fromkeys(vehicle_ids))
+    if not ids:
+        return {}
+    
+    with Session(get_engine(database_url)) as session:
+        vehicles = session.scalars(select(Vehicle).where(Vehicle.id.in_(ids))).all()
+        session.expunge_all()
+    
+    return {vehicle.id: vehicle for vehicle in vehicles}
+
+def search_vehicles_by_makes(database_url: str, makes: Sequence[str], model: Optional[str] = None,
+                             min_year: Optional[int] = None, max_year: Optional[int] = None,
+                             min_price: Optional[float] = None, max_price: Optional[float] = None,
+                             max_mileage: Optional[int] = None, fuel_type: Optional[str] = None,
+                             limit: int = 50) -> List[Vehicle]:
+    """Search vehicles of any of ``makes`` with one ``make IN (...)`` query.
+    
+    Makes, model and fuel type match case-insensitively; other filters are
+    inclusive bounds and are skipped when None.
+    """
+    conditions = [func.lower(Vehicle.make).in_([make.lower() for make in makes])]
+    if model:
+        conditions.append(func.lower(Vehicle.model) == model.lower())
+    if fuel_type:
+        conditions.append(func.lower(Vehicle.fuel_type) == fuel_type.lower())
+    if min_year is not None:
+        conditions.append(Vehicle.year >= min_year)
+    if max_year is not None:
+        conditions.append(Vehicle.year <= max_year)
+    if min_price is not None:
+        conditions.append(Vehicle.price >= min_price)
+    if max_price is not None:
+        conditions.append(Vehicle.price <= max_price)
+    if max_mileage is not None:
+        conditions.append(Vehicle.mileage <= max_mileage)
+    
+    with Session(get_engine(database_url)) as session:
+        vehicles = session.scalars(select(Vehicle).where(*conditions).limit(limit)).all()
+        session.expunge_all()
+    
+    return list(vehicles)
+
+def get_vehicles_frame(database_url: str, columns: Optional[Sequence[str]] = None,
+                       limit: Optional[int] = None) -> pd.DataFrame:
+    """Load the vehicles table (or just ``columns``) into a DataFrame in one query.
+    
+    Nullable dtypes keep integer columns with missing values as integers.
+    With ``limit``, only the first ``limit`` vehicles by id are loaded.
+    """
+    table = Vehicle.__table__
+    query = select(*(table.c[name] for name in columns)) if columns else select(table)
+    if limit is not None:
+        query = query.order_by(table.c.id).limit(limit)
+    
+    with get_engine(database_url).connect() as connection:
+        return pd.read_sql(query, connection, dtype_backend='numpy_nullable')
+
+def iter_vehicles_frames(database_url: str, columns: Optional[Sequence[str]] = None,
+                         chunksize: int = 5000) -> Iterator[pd.DataFrame]:
+    """Yield the vehicles table (or just ``columns``) by id, as DataFrames of up to ``chunksize`` rows.
+    
+    Rows are streamed from a server-side cursor where the driver supports it,
+    so only one chunk is held in memory at a time.
+    """
+    table = Vehicle.__table__
+    query = select(*(table.c[name] for name in columns)) if columns else select(table)
+    
+    with get_engine(database_url).connect() as connection:
+        connection = connection.execution_options(stream_results=True)
+        yield from pd.read_sql(query.order_by(table.c.id), connection, chunksize=chunksize,
+                               dtype_backend='numpy_nullable')
+
+def _existing_vins(connection, vins: Iterable[str]) -> Set[str]:
+    """Return which of ``vins`` are already stored, with one ``WHERE vin IN (...)`` query per chunk."""
+    vins = list(dict.fromkeys(vins))
+    existing = set()
+    for start in range(0, len(vins), IN_CLAUSE_CHUNK):
+        chunk = vins[start:start + IN_CLAUSE_CHUNK]
+        existing.update(connection.scalars(select(Vehicle.vin).where(Vehicle.vin.in_(chunk))))
+    return existing
+
+class _BloomFilter:
+    """Set-membership filter over strings in a NumPy bit array: no false negatives.
+    
+    Takes about 1.2 bytes per key at a 1% false positive rate, against ~100
+    for a Python set of VINs. Bit positions come from one blake2b digest per
+    key by double hashing.
+    """
+    
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+    
+    def _positions(self, keys: Sequence[str]) -> np.ndarray:
+        digests = b''.join(hashlib.blake2b(key.encode(), digest_size=16).digest() for key in keys)
+        h1, h2 = np.frombuffer(digests, dtype=np.uint64).reshape(-1, 2).T
+        steps = np.arange(self.hash_count, dtype=np.uint64)
+        return (h1[:, None] + steps * h2[:, None]) % np.uint64(self.size)
+    
+    def update(self, keys: Iterable[str]):
+        keys = list(keys)
+        if keys:
+            positions = self._positions(keys).ravel()
+            np.bitwise_or.at(self.bits, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
+    
+    def maybe_contained(self, keys: Iterable[str]) -> List[str]:
+        """Those of ``keys`` that may have been added; all others certainly were not."""
+        keys = list(keys)
+        if not keys:
+            return []
+        positions = self._positions(keys)
+        hits = ((self.bits[positions >> 3] >> (positions & 7).astype(np.uint8)) & 1).all(axis=1)
+        return [key for key, hit in zip(keys, hits) if hit]
+
+def _stored_vin_filter(connection) -> _BloomFilter:
+    """Bloom filter of every stored VIN, read with one streamed ``SELECT vin`` query."""
+    has_vin = Vehicle.vin.isnot(None)
+    count = connection.scalar(select(func.count()).select_from(Vehicle.__table__).where(has_vin))
+    stored = _BloomFilter(max(2 * count, VIN_BLOOM_MIN_CAPACITY), VIN_BLOOM_ERROR_RATE)
+    
+    result = connection.execution_options(stream_results=True).execute(select(Vehicle.vin).where(has_vin))
+    for vins in result.scalars().partitions(INSERT_CHUNK):
+        stored.update(vins)
+    return stored
+
+def insert_new_vehicles(database_url: str, rows: Iterable[Dict[str, Any]]) -> int:
+    """Insert vehicle rows (column -> value dicts) whose VIN is not stored yet; return how many.
+    
+    Rows are consumed and inserted INSERT_CHUNK at a time, so a generator over
+    a large file is streamed rather than held in memory. The VIN checks and
+    all executemany inserts share one transaction, so concurrent writers
+    cannot slip a duplicate VIN in between. Rows without a VIN are always
+    inserted; a VIN repeated within ``rows`` is inserted once.
+    
+    Once ``rows`` runs past one chunk, stored VINs are loaded into a Bloom
+    filter, and only VINs it may contain are checked against the database.
+    Inserted VINs join the filter, and the check sees them within the
+    transaction, so no set of VINs is kept in memory.
+    """
+    rows = iter(rows)
+    inserted = 0
+    
+    with get_engine(database_url).begin() as connection:
+        stored: Optional[_BloomFilter] = None
+        chunks_read = 0
+        while chunk := list(islice(rows, INSERT_CHUNK)):
+            vins = list(dict.fromkeys(row['vin'] for row in chunk if row.get('vin')))
+            # Small inserts (live results) skip the full VIN scan the filter needs
+            if chunks_read == 1:
+                stored = _stored_vin_filter(connection)
+            chunks_read += 1
+            seen = _existing_vins(connection, stored.maybe_contained(vins) if stored else vins)
+            
+            new_rows = []
+            for row in chunk:
+                vin = row.get('vin')
+                if vin:
+                    if vin in seen:
+                        continue
+                    seen.add(vin)
+                new_rows.append(row)
+            
+            if new_rows:
+                connection.execute(insert(Vehicle.__table__), new_rows)
+                inserted += len(new_rows)
+                if stored is not None:
+                    stored.update(row['vin'] for row in new_rows if row.get('vin'))
+    
+    return inserted
@@ -1,6 +1,45 @@
 """Ollama client integration for CarFinder."""
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+import numpy as np
 import requests
-from typing import Dict, Any, List, Optional
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    _json_dumps, _json_loads = orjson.dumps, orjson.loads
+else:
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+    _json_loads = json.loads
+
+# Concurrent embedding requests in embed_many; matches the session's pool size
+EMBED_WORKERS = 8
+
+# Seconds an is_available() answer is reused before probing the server again
+AVAILABILITY_TTL = 5.0
+
+# Prompt prefix per chat message role
+CHAT_ROLE_PREFIXES = {'system': "System: ", 'user': "Human: ", 'assistant': "Assistant: "}
+
+# Model used by embed()
+EMBED_MODEL = 'nomic-embed-text'
+
+# Embeddings kept in memory per client, least recently used evicted first
+EMBED_CACHE_SIZE = 4096
 
 class OllamaClient:
     """Client for interacting with Ollama API."""
@@ -8,28 +47,68 @@ class OllamaClient:
     def __init__(self, host: str = "http://localhost:11434", model: str = "llama3.1"):
         self.host = host.rstrip('/')
         self.model = model
+        
+        # Keep-alive session: calls reuse pooled connections instead of reconnecting
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=EMBED_WORKERS)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        
+        # Last availability probe: (monotonic time, result)
+        self._availability: Optional[tuple] = None
+        
+        # Successful embeddings: (model, text digest) -> read-only vector
+        self._embeddings: 'OrderedDict[tuple, np.ndarray]' = OrderedDict()
+        self._embeddings_lock = threading.Lock()
+    
+    def close(self) -> None:
+        """Close the session's pooled keep-alive connections."""
+        self._session.close()
+    
+    def __enter__(self) -> 'OllamaClient':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def _post(self, path: str, payload: Dict[str, Any], timeout: float, stream: bool = False) -> requests.Response:
+        """POST a JSON body to the API, encoded with orjson when available."""
+        return self._session.post(
+            f"{self.host}{path}",
+            data=_json_dumps(payload),
+            headers={'Content-Type': 'application/json'},
+            timeout=timeout,
+            stream=stream
+        )
     
     def is_available(self) -> bool:
-        """Check if Ollama is available."""
+        """Check if Ollama is available; the answer is reused for AVAILABILITY_TTL seconds."""
+        now = time.monotonic()
+        if self._availability and now - self._availability[0] < AVAILABILITY_TTL:
+            return self._availability[1]
+        
         try:
-            response = requests.get(f"{self.host}/api/tags", timeout=5)
-            return response.status_code == 200
+            response = self._session.get(f"{self.host}/api/tags", timeout=5)
+            available = response.status_code == 200
         except requests.RequestException:
-            return False
+            available = False
+        
+        self._availability = (now, available)
+        return available
     
     def list_models(self) -> List[str]:
         """List available models."""
         try:
-            response = requests.get(f"{self.host}/api/tags", timeout=10)
+            response = self._session.get(f"{self.host}/api/tags", timeout=10)
             if response.status_code == 200:
-                data = response.json()
+                data = _json_loads(response.content)
                 return [model['name'] for model in data.get('models', [])]
             return []
-        except requests.RequestException:
+        except (requests.RequestException, ValueError):  # ValueError: malformed JSON
             return []
     
-    def generate(self, prompt: str, system_prompt: str = "", **kwargs) -> str:
-        """Generate text using Ollama."""
+    def _generate_payload(self, prompt: str, system_prompt: str, stream: bool, **kwargs) -> Dict[str, Any]:
+        """Request body for /api/generate."""
         
         # Prepare the full prompt
         if system_prompt:
@@ -44,73 +123,142 @@ class OllamaClient:
             'max_tokens': kwargs.get('max_tokens', 500)
         }
         
+        return {
+            'model': self.model,
+            'prompt': full_prompt,
+            'stream': stream,
+            'options': options
+        }
+    
+    def generate(self, prompt: str, system_prompt: str = "", **kwargs) -> str:
+        """Generate text using Ollama."""
         try:
-            response = requests.post(
-                f"{self.host}/api/generate",
-                json={
-                    'model': self.model,
-                    'prompt': full_prompt,
-                    'stream': False,
-                    'options': options
-                },
-                timeout=30
-            )
+            response = self._post('/api/generate', self._generate_payload(prompt, system_prompt, False, **kwargs), 30)
             
             if response.status_code == 200:
-                return response.json().get('response', '')
+                return _json_loads(response.content).get('response', '')
             else:
                 raise Exception(f"Ollama API error: {response.status_code} - {response.text}")
                 
         except requests.RequestException as e:
             raise Exception(f"Failed to connect to Ollama: {e}")
     
-    def chat(self, messages: List[Dict[str, str]], **kwargs) -> str:
-        """Chat interface for conversation."""
+    def generate_stream(self, prompt: str, system_prompt: str = "", **kwargs) -> Iterator[str]:
+        """Generate text using Ollama, yielding chunks as they are produced.
         
-        # Convert chat messages to a single prompt
+        Suits ``st.write_stream``: the first words show up as soon as the model
+        emits them instead of after the whole response.
+        """
+        try:
+            with self._post('/api/generate', self._generate_payload(prompt, system_prompt, True, **kwargs), 30,
+                            stream=True) as response:
+                if response.status_code != 200:
+                    raise Exception(f"Ollama API error: {response.status_code} - {response.text}")
+                
+                # One JSON object per line; the last one has done=true
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = _json_loads(line)
+                    if chunk.get('response'):
+                        yield chunk['response']
+                    if chunk.get('done'):
+                        break
+                        
+        except requests.RequestException as e:
+            raise Exception(f"Failed to connect to Ollama: {e}")
+    
+    @staticmethod
+    def _chat_prompt(messages: List[Dict[str, str]]) -> str:
+        """Convert chat messages to a single prompt."""
         prompt_parts = []
         
         for message in messages:
-            role = message.get('role', 'user')
-            content = message.get('content', '')
-            
-            if role == 'system':
-                prompt_parts.append(f"System: {content}")
-            elif role == 'user':
-                prompt_parts.append(f"Human: {content}")
-            elif role == 'assistant':
-                prompt_parts.append(f"Assistant: {content}")
+            prefix = CHAT_ROLE_PREFIXES.get(message.get('role', 'user'))
+            if prefix:  # Messages with other roles are skipped
+                prompt_parts.append(prefix)
+                prompt_parts.append(message.get('content', ''))
+                prompt_parts.append("\n\n")
         
         prompt_parts.append("Assistant:")
-        full_prompt = "\n\n".join(prompt_parts)
-        
-        return self.generate(full_prompt, **kwargs)
+        return "".join(prompt_parts)
+    
+    def chat(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        """Chat interface for conversation."""
+        return self.generate(self._chat_prompt(messages), **kwargs)
     
-    def embed(self, text: str) -> List[float]:
-        """Generate embeddings (if Ollama supports it)."""
+    def chat_stream(self, messages: List[Dict[str, str]], **kwargs) -> Iterator[str]:
+        """Streaming variant of chat; see generate_stream."""
+        return self.generate_stream(self._chat_prompt(messages), **kwargs)
+    
+    def embed(self, text: str) -> np.ndarray:
+        """Generate embeddings (if Ollama supports it) as a float32 vector; empty on failure.
+        
+        Returns a 1-D ``np.ndarray`` rather than a list: check for failure with
+        ``embedding.size`` (``not embedding`` raises for arrays) and call
+        ``.tolist()`` where a plain list is needed, e.g. for JSON.
+        
+        Successful embeddings are cached per text, so repeated texts skip the
+        request. Cached vectors are shared and read-only; copy before modifying.
+        """
+        key = (EMBED_MODEL, hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest())
+        with self._embeddings_lock:
+            cached = self._embeddings.get(key)
+            if cached is not None:
+                self._embeddings.move_to_end(key)
+                return cached
+        
         try:
-            response = requests.post(
-                f"{self.host}/api/embeddings",
-                json={
-                    'model': 'nomic-embed-text',  # Default embedding model
-                    'prompt': text
-                },
-                timeout=15
-            )
+            response = self._post('/api/embeddings', {
+                'model': EMBED_MODEL,
+                'prompt': text
+            }, 15)
             
             if response.status_code == 200:
-                return response.json().get('embedding', [])
+                embedding = np.asarray(_json_loads(response.content).get('embedding', []), dtype=np.float32)
+                if embedding.size:
+                    embedding.flags.writeable = False
+                    with self._embeddings_lock:
+                        self._embeddings[key] = embedding
+                        while len(self._embeddings) > EMBED_CACHE_SIZE:
+                            self._embeddings.popitem(last=False)  # Evict least recently used
+                return embedding
             else:
                 # Fallback: use sentence transformers
-                return []
+                return np.empty(0, dtype=np.float32)
                 
-        except requests.RequestException:
+        except (requests.RequestException, ValueError):  # ValueError: malformed JSON
             # Fallback: use sentence transformers
-            return []
+            return np.empty(0, dtype=np.float32)
+    
+    def embed_many(self, texts: Iterable[str]) -> List[np.ndarray]:
+        """Embed several texts with up to EMBED_WORKERS requests in flight; one array per text, in input order."""
+        texts = list(texts)
+        if len(texts) <= 1:
+            return [self.embed(text) for text in texts]
+        
+        with ThreadPoolExecutor(max_workers=min(EMBED_WORKERS, len(texts))) as pool:
+            return list(pool.map(self.embed, texts))
+    
+    async def agenerate(self, prompt: str, system_prompt: str = "", **kwargs) -> str:
+        """Async variant of generate; the request runs in a worker thread."""
+        return await asyncio.to_thread(self.generate, prompt, system_prompt, **kwargs)
+    
+    async def aembed(self, text: str) -> np.ndarray:
+        """Async variant of embed; the request runs in a worker thread."""
+        return await asyncio.to_thread(self.embed, text)
 
 def get_ollama_client(config: Dict[str, Any]) -> OllamaClient:
-    """Get configured Ollama client."""
-    return OllamaClient(
-        host=config.get('ollama_host', 'http://localhost:11434'),
-        model=config.get('ollama_model', 'llama3.1')
-    )
\ No newline at end of file
+    """Get the configured Ollama client, shared process-wide per (host, model).
+    
+    Reusing one client keeps its keep-alive connection pool across Streamlit
+    reruns and sessions.
+    """
+    return _shared_ollama_client(
+        config.get('ollama_host', 'http://localhost:11434'),
+        config.get('ollama_model', 'llama3.1')
+    )
+
+@lru_cache(maxsize=None)
+def _shared_ollama_client(host: str, model: str) -> OllamaClient:
+    return OllamaClient(host=host, model=model)
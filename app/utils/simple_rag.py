@@ -2,87 +2,419 @@
 Simple but effective RAG implementation for vehicle recommendations
 Uses keyword matching, semantic similarity, and contextual understanding
 """
+import hashlib
+import json
 import re
-from typing import List, Dict, Any
-from collections import Counter
-import math
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..recommendations.engine import top_k_order
+
+from ._rag_kernels import NUMBA_AVAILABLE, accumulate_postings
+from .config import get_database_url, load_config
+from .db import get_vehicles_by_ids, iter_vehicles_frames
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from ..rag.retriever import ENCODE_BATCH_SIZE, SENTENCE_TRANSFORMERS_AVAILABLE, get_embedding_model
+    DENSE_SEARCH_AVAILABLE = SENTENCE_TRANSFORMERS_AVAILABLE
+except ImportError:
+    DENSE_SEARCH_AVAILABLE = False
+
+# BM25 term-frequency saturation and document-length normalization
+BM25_K1 = 0.82
+BM25_B = 0.68
+
+# Tokens of vehicle texts and queries
+TOKEN_RE = re.compile(r'\b\w+\b')
+
+# Common words dropped from queries
+STOP_WORDS = frozenset({
+    'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you', 'your', 'yours',
+    'yourself', 'yourselves', 'he', 'him', 'his', 'himself', 'she', 'her', 'hers',
+    'herself', 'it', 'its', 'itself', 'they', 'them', 'their', 'theirs', 'themselves',
+    'what', 'which', 'who', 'whom', 'this', 'that', 'these', 'those', 'am', 'is', 'are',
+    'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'having', 'do', 'does',
+    'did', 'doing', 'a', 'an', 'the', 'and', 'but', 'if', 'or', 'because', 'as', 'until',
+    'while', 'of', 'at', 'by', 'for', 'with', 'through', 'during', 'before', 'after',
+    'above', 'below', 'up', 'down', 'in', 'out', 'on', 'off', 'over', 'under', 'again',
+    'further', 'then', 'once', 'here', 'there', 'when', 'where', 'why', 'how', 'all',
+    'any', 'both', 'each', 'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor',
+    'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very', 's', 't', 'can', 'will',
+    'just', 'don', 'should', 'now', 'want', 'need', 'looking', 'find', 'get', 'car', 'vehicle'
+})
+
+# Important multi-word query phrases -> the terms they add
+QUERY_PHRASES = {phrase: tuple(phrase.split()) for phrase in (
+    'fuel efficient', 'gas mileage', 'low maintenance', 'family car',
+    'sports car', 'work truck', 'city driving', 'highway driving',
+    'all wheel drive', 'four wheel drive', 'manual transmission',
+    'automatic transmission', 'backup camera', 'navigation system'
+)}
+
+# Score boost for query terms that signal strong intent, when the vehicle matches them
+IMPORTANT_KEYWORDS = {
+    'reliable': 0.15, 'dependable': 0.15, 'toyota': 0.1, 'honda': 0.1,
+    'efficient': 0.12, 'hybrid': 0.12, 'electric': 0.12,
+    'safe': 0.1, 'safety': 0.1, 'family': 0.08,
+    'luxury': 0.1, 'premium': 0.1, 'bmw': 0.08, 'mercedes': 0.08,
+    'affordable': 0.08, 'budget': 0.08, 'economical': 0.08,
+    'spacious': 0.06, 'suv': 0.06, 'truck': 0.06
+}
+
+# Priority -> (vehicle terms that satisfy it, alignment boost)
+PRIORITY_TERMS = {
+    'reliability': (('reliable', 'dependable', 'toyota', 'honda'), 0.3),
+    'fuel_economy': (('hybrid', 'electric', 'efficient', 'eco'), 0.3),
+    'safety': (('safe', 'safety', 'family'), 0.2),
+    'luxury': (('luxury', 'premium', 'bmw', 'mercedes', 'audi'), 0.3),
+}
+
+# Explanation lines of a search result, each shown when any of its terms matched
+RELEVANCE_REASONS = (
+    (frozenset({'reliable', 'dependable'}), "Known for reliability"),
+    (frozenset({'efficient', 'hybrid', 'electric', 'eco'}), "Excellent fuel economy"),
+    (frozenset({'safe', 'safety', 'family'}), "Strong safety ratings"),
+    (frozenset({'luxury', 'premium'}), "Premium features and comfort"),
+    (frozenset({'budget', 'affordable', 'economical'}), "Great value for money"),
+)
+
+# Results returned by semantic_search, and the minimum score to be one
+SEARCH_RESULT_LIMIT = 10
+MIN_RELEVANCE = 0.1
+
+# Vehicles rescored with full-precision cosine after the 1-bit Hamming pass,
+# the nearest of those that get a dense score, and its weight in the score.
+# The Hamming pass scans every embedded vehicle: 48 bytes of code each, a few
+# milliseconds per query per 100k vehicles
+DENSE_RESCORE = 100
+DENSE_CANDIDATES = 50
+DENSE_WEIGHT = 0.3
+
+# Sentence embedding model (get_embedding_model's default), and the file under
+# the configured data directory holding the corpus embeddings; it is written by
+# scripts/update_embeddings.py and only read at app startup
+EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+EMBEDDING_CACHE_FILE = 'rag_embeddings.npz'
+
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+# Vehicles read per chunk while building the corpus, and the columns their
+# texts are built from
+CORPUS_CHUNK = 5000
+CORPUS_COLUMNS = ('id', 'make', 'model', 'year', 'price', 'mileage', 'fuel_type', 'description', 'features')
+
+# Contextual keywords added to a vehicle's text, per model-name fragment; the
+# first matching group wins
+MODEL_FAMILY_KEYWORDS = (
+    (('suv', 'cr-v', 'cx-5', 'escape', 'equinox'), "suv family spacious utility"),
+    (('civic', 'camry', 'accord', 'altima'), "sedan reliable practical"),
+    (('f-150', 'truck'), "truck work hauling capability"),
+)
+
+# One anchored match per model name: each alternative looks ahead for any
+# fragment of its group and captures an empty group, so ``lastindex - 1`` is
+# the first matching group regardless of where its fragment occurs
+MODEL_FAMILY_RE = re.compile("|".join(
+    f"(?=.*?(?:{'|'.join(map(re.escape, fragments))}))()" for fragments, _ in MODEL_FAMILY_KEYWORDS
+), re.DOTALL)
+
+# Contextual keywords per value band: bands start at each lower bound, and
+# values below the first bound or missing get none
+PRICE_BANDS = ((-np.inf, 25000, np.nextafter(40000, np.inf)),
+               ("budget affordable economical", "mid-range value", "luxury premium high-end"))
+YEAR_BANDS = ((2020, 2023), ("recent current", "new latest modern"))
+MILEAGE_BANDS = ((-np.inf, 20000), ("low-mileage like-new", ""))
+
+# Set bits per byte value, for NumPy versions without np.bitwise_count (< 2.0)
+_BYTE_POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+def pack_signs(embeddings: np.ndarray) -> np.ndarray:
+    """1-bit codes: the sign of each dimension packed into uint64 words, rows zero-padded."""
+    packed = np.packbits(embeddings > 0, axis=1)
+    padding = -packed.shape[1] % 8
+    if padding:
+        packed = np.pad(packed, ((0, 0), (0, padding)))
+    return np.ascontiguousarray(packed).view(np.uint64)
+
+def _text_hash(model_name: str, text: str) -> int:
+    """64-bit hash of a corpus text under a given embedding model."""
+    digest = hashlib.blake2b(f"{model_name}\0{text}".encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+def hamming_distances(codes: np.ndarray, query_code: np.ndarray) -> np.ndarray:
+    """Differing bits between each row of ``codes`` and the (1, words) ``query_code``."""
+    differing = codes ^ query_code
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(differing).sum(axis=1, dtype=np.int64)
+    return _BYTE_POPCOUNT[differing.view(np.uint8)].sum(axis=1, dtype=np.int64)
+
+@lru_cache(maxsize=4096)
+def _features_suffix_from_json(features: str) -> str:
+    # Stored feature lists repeat across vehicles, so each distinct JSON
+    # string is parsed once per process
+    try:
+        features = _json_loads(features)
+    except ValueError:  # json and orjson decode errors both subclass it
+        return ""
+    return _features_suffix(features) if isinstance(features, list) else ""
+
+def _features_suffix(features) -> str:
+    """' feature1 feature2 ...' for a stored features value (JSON string or list), else ''."""
+    if isinstance(features, list):
+        return "".join(f" {feature}" for feature in features)
+    if isinstance(features, str) and features:
+        return _features_suffix_from_json(features)
+    return ""
+
+def build_corpus_texts(df: pd.DataFrame) -> List[str]:
+    """Searchable text of every vehicle in a DataFrame of CORPUS_COLUMNS, in row order.
+    
+    Name, year, fuel type, description and features, followed by contextual
+    keywords for price band, powertrain, body style, brand, age and mileage.
+    Each keyword group is one column of per-row keywords, looked up by band
+    (np.searchsorted), model family (one regex match) or boolean mask, so
+    there is no per-row branching; only the vehicle fields need lowercasing,
+    the keywords already are.
+    """
+    def numbers(column: str) -> np.ndarray:
+        # Missing values become NaN, which fails every comparison
+        return pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    
+    def lowered(values: pd.Series) -> np.ndarray:
+        return np.char.lower(values.to_numpy(dtype=str))
+    
+    def strings(column: str) -> pd.Series:
+        # Missing values become "" (str casts keep them missing from pandas 3)
+        return df[column].astype(object).fillna("").astype(str)
+    
+    make, model, fuel_type = strings('make'), strings('model'), strings('fuel_type')
+    price, year, mileage = numbers('price'), numbers('year'), numbers('mileage')
+    
+    text = lowered(make + " " + model + " " + strings('year') + " model " + fuel_type + " "
+                   + strings('description')
+                   + df['features'].map(_features_suffix, na_action='ignore').fillna(""))
+    make, model, fuel_type = lowered(make), lowered(model), fuel_type.to_numpy(dtype=str)
+    
+    def banded(values: np.ndarray, bands) -> np.ndarray:
+        bounds, keywords = bands
+        lookup = np.array([f" {words}" if words else "" for words in keywords] + [""])
+        band = np.searchsorted(bounds, values, side='right') - 1
+        band[np.isnan(values)] = -1
+        return lookup[band]  # -1 selects the trailing ""
+    
+    # Model family: the first MODEL_FAMILY_KEYWORDS group with a fragment in the model name
+    family = np.fromiter((match.lastindex - 1 if (match := MODEL_FAMILY_RE.match(name)) else -1
+                          for name in model), dtype=np.intp, count=len(model))
+    family_keywords = np.array([f" {keywords}" for _, keywords in MODEL_FAMILY_KEYWORDS] + [""])
+    
+    keyword_columns = (
+        # Budget category
+        banded(price, PRICE_BANDS),
+        
+        # Vehicle type keywords
+        np.where((make == 'tesla') | (fuel_type == 'Electric'), " electric ev sustainable tech", ""),
+        np.where(fuel_type == 'Hybrid', " eco green efficient", ""),
+        
+        # Size/type inference from model name
+        family_keywords[family],
+        
+        # Reliability keywords for known reliable brands
+        np.where(np.isin(make, ('toyota', 'honda')), " reliable dependable long-lasting", ""),
+        
+        # Age and mileage keywords
+        banded(year, YEAR_BANDS),
+        banded(mileage, MILEAGE_BANDS),
+    )
+    for keywords in keyword_columns:
+        text = np.char.add(text, keywords)
+    
+    return text.tolist()
 
 class SimpleRAG:
     """Simple but effective RAG implementation for vehicle search."""
     
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, database_url: Optional[str] = None, encode_missing: bool = False):
+        """``database_url`` is that of ``db_manager``; defaults to the configured database.
+        
+        With ``encode_missing`` (scripts/update_embeddings.py), vehicles without
+        a saved embedding are encoded and the embedding cache is rewritten.
+        """
         self.db_manager = db_manager
+        self.database_url = database_url or get_database_url(load_config())
         self.vehicle_corpus = self._build_corpus()
+        self._build_bm25_index()
+        self._build_dense_index(encode_missing)
+        
+        # Compile the scoring kernel now rather than on the first user query
+        if NUMBA_AVAILABLE and self.vocab:
+            self._score_vehicles([next(iter(self.vocab))], {})
     
     def _build_corpus(self) -> Dict[int, str]:
-        """Build searchable text corpus for all vehicles."""
-        corpus = {}
-        vehicles = self.db_manager.search_vehicles(limit=100)
-        
-        for vehicle in vehicles:
-            # Create comprehensive text representation
-            text_parts = [
-                f"{vehicle.make} {vehicle.model}",
-                f"{vehicle.year} model",
-                vehicle.fuel_type or "",
-                vehicle.description or "",
-            ]
-            
-            # Add feature keywords
-            if vehicle.features:
-                try:
-                    import json
-                    features = json.loads(vehicle.features) if isinstance(vehicle.features, str) else vehicle.features
-                    text_parts.extend(features)
-                except:
-                    pass
-            
-            # Add contextual keywords based on vehicle characteristics
-            context_keywords = []
-            
-            # Budget category
-            if vehicle.price < 25000:
-                context_keywords.extend(["budget", "affordable", "economical"])
-            elif vehicle.price > 40000:
-                context_keywords.extend(["luxury", "premium", "high-end"])
-            else:
-                context_keywords.extend(["mid-range", "value"])
-            
-            # Vehicle type keywords
-            if vehicle.make.lower() == 'tesla' or vehicle.fuel_type == 'Electric':
-                context_keywords.extend(["electric", "ev", "sustainable", "tech"])
-            
-            if vehicle.fuel_type == 'Hybrid':
-                context_keywords.extend(["eco", "green", "efficient"])
-            
-            # Size/type inference from model name
-            model_lower = vehicle.model.lower()
-            if any(x in model_lower for x in ['suv', 'cr-v', 'cx-5', 'escape', 'equinox']):
-                context_keywords.extend(["suv", "family", "spacious", "utility"])
-            elif any(x in model_lower for x in ['civic', 'camry', 'accord', 'altima']):
-                context_keywords.extend(["sedan", "reliable", "practical"])
-            elif any(x in model_lower for x in ['f-150', 'truck']):
-                context_keywords.extend(["truck", "work", "hauling", "capability"])
-            
-            # Reliability keywords for known reliable brands
-            if vehicle.make.lower() in ['toyota', 'honda']:
-                context_keywords.extend(["reliable", "dependable", "long-lasting"])
-            
-            # Age keywords
-            if vehicle.year >= 2023:
-                context_keywords.extend(["new", "latest", "modern"])
-            elif vehicle.year >= 2020:
-                context_keywords.extend(["recent", "current"])
-            
-            # Mileage keywords
-            if vehicle.mileage < 20000:
-                context_keywords.extend(["low-mileage", "like-new"])
-            
-            text_parts.extend(context_keywords)
-            corpus[vehicle.id] = " ".join(text_parts).lower()
-        
+        """Build searchable text corpus for all vehicles.
+        
+        The corpus columns are streamed CORPUS_CHUNK vehicles at a time and
+        each chunk's texts are assembled column by column (see
+        build_corpus_texts), so only the texts outlive their chunk.
+        """
+        corpus: Dict[int, str] = {}
+        for df in iter_vehicles_frames(self.database_url, CORPUS_COLUMNS, CORPUS_CHUNK):
+            corpus.update(zip(df['id'].tolist(), build_corpus_texts(df)))
         return corpus
     
+    def _build_bm25_index(self):
+        """Tokenize the corpus once into a term -> vehicles index of BM25 weights.
+        
+        The index is stored column by column (CSC): the postings of term ``t``
+        are ``bm25_docs[bm25_ptr[t]:bm25_ptr[t + 1]]``, vehicle rows in corpus
+        order, with their precomputed BM25 term weights in ``bm25_weights``.
+        """
+        self.vehicle_ids = np.fromiter(self.vehicle_corpus, dtype=np.int64, count=len(self.vehicle_corpus))
+        self.vehicle_texts = list(self.vehicle_corpus.values())
+        self.vocab: Dict[str, int] = {}
+        
+        # (term, row, term frequency) per distinct term of each vehicle, in
+        # preallocated arrays that double when full
+        capacity = max(1024, 32 * len(self.vehicle_texts))
+        terms = np.empty(capacity, dtype=np.intp)
+        rows = np.empty(capacity, dtype=np.intp)
+        tfs = np.empty(capacity, dtype=np.float64)
+        nnz = 0
+        lengths = np.zeros(len(self.vehicle_texts), dtype=np.float64)
+        for row, text in enumerate(self.vehicle_texts):
+            tokens = TOKEN_RE.findall(text)
+            lengths[row] = len(tokens)
+            counts: Dict[int, int] = {}
+            for token in tokens:
+                term = self.vocab.setdefault(token, len(self.vocab))
+                counts[term] = counts.get(term, 0) + 1
+            
+            end = nnz + len(counts)
+            if end > capacity:
+                capacity = max(2 * capacity, end)
+                terms, rows, tfs = (np.resize(array, capacity) for array in (terms, rows, tfs))
+            terms[nnz:end] = list(counts)
+            rows[nnz:end] = row
+            tfs[nnz:end] = list(counts.values())
+            nnz = end
+        
+        terms, rows, tfs = terms[:nnz], rows[:nnz], tfs[:nnz]
+        
+        # Group postings by term; the stable sort keeps rows ascending within a term
+        order = np.argsort(terms, kind='stable')
+        terms, rows, tfs = terms[order], rows[order], tfs[order]
+        doc_freq = np.bincount(terms, minlength=len(self.vocab))
+        self.bm25_ptr = np.concatenate([[0], np.cumsum(doc_freq)])
+        
+        # Lucene-style IDF stays positive even for terms in most vehicles
+        n_docs = len(self.vehicle_texts)
+        self.bm25_idf = np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+        
+        avg_length = lengths.mean() if n_docs else 0.0
+        length_norm = 1 - BM25_B + BM25_B * lengths[rows] / (avg_length or 1.0)
+        self.bm25_docs = rows
+        self.bm25_weights = self.bm25_idf[terms] * tfs * (BM25_K1 + 1) / (tfs + BM25_K1 * length_norm)
+    
+    def _build_dense_index(self, encode_missing: bool = False):
+        """Sentence embeddings of the corpus texts plus their 1-bit codes.
+        
+        Sets ``dense_rows`` (the corpus rows that have an embedding),
+        ``dense_embeddings`` (M, d) float32 and ``dense_codes`` (M, words)
+        uint64 sign bits, all in that row order. They stay None when the
+        embedding model is unavailable or no embeddings are saved; search then
+        relies on the keyword scores alone.
+        """
+        self.dense_rows = self.dense_embeddings = self.dense_codes = None
+        self.embedding_model = get_embedding_model(EMBEDDING_MODEL) if DENSE_SEARCH_AVAILABLE and self.vehicle_texts else None
+        if self.embedding_model is None:
+            return
+        
+        rows, embeddings = self._load_or_encode_embeddings(encode_missing)
+        if len(rows):
+            self.dense_rows, self.dense_embeddings = rows, embeddings
+            self.dense_codes = pack_signs(embeddings)
+    
+    def _load_or_encode_embeddings(self, encode_missing: bool):
+        """(corpus rows, embeddings) of the vehicles with an embedding.
+        
+        Texts are keyed by a hash of model and text, so an unchanged corpus
+        costs one file read. At startup only saved embeddings are used: new or
+        edited vehicles go without a dense score until the next refresh, so
+        the app never encodes the table. With ``encode_missing`` they are
+        encoded in one batch and the cache is rewritten for the whole corpus.
+        """
+        hashes = np.fromiter((_text_hash(EMBEDDING_MODEL, text) for text in self.vehicle_texts),
+                             dtype=np.uint64, count=len(self.vehicle_texts))
+        cache_path = Path(load_config()['data_dir']) / EMBEDDING_CACHE_FILE
+        
+        cached = None
+        rows = np.full(len(hashes), -1, dtype=np.int64)
+        try:
+            with np.load(cache_path) as cache:
+                cached_hashes, cached = cache['hashes'], cache['embeddings']
+            row_by_hash = {h: i for i, h in enumerate(cached_hashes.tolist())}
+            rows[:] = [row_by_hash.get(h, -1) for h in hashes.tolist()]
+        except (OSError, KeyError, ValueError):
+            pass  # No usable cache
+        
+        hit = rows >= 0
+        if hit.all() and len(cached) == len(hashes) and np.array_equal(rows, np.arange(len(rows))):
+            return np.arange(len(hashes)), cached  # Unchanged corpus
+        if not encode_missing:
+            covered = np.flatnonzero(hit)
+            return covered, (cached[rows[covered]] if len(covered) else None)
+        
+        missing = np.flatnonzero(~hit)
+        encoded = None
+        if len(missing):
+            encoded = self.embedding_model.encode(
+                [self.vehicle_texts[i] for i in missing],
+                batch_size=ENCODE_BATCH_SIZE,
+                normalize_embeddings=True,
+                convert_to_numpy=True
+            ).astype(np.float32, copy=False)
+        
+        embeddings = np.empty((len(hashes), (cached if encoded is None else encoded).shape[1]), dtype=np.float32)
+        if encoded is not None:
+            embeddings[missing] = encoded
+        if hit.any():
+            embeddings[hit] = cached[rows[hit]]
+        
+        # Keep exactly the current corpus, so removed vehicles drop out of the cache
+        try:
+            np.savez(cache_path, hashes=hashes, embeddings=embeddings)
+        except OSError as e:
+            print(f"Warning: Could not save RAG embedding cache: {e}")
+        return np.arange(len(hashes)), embeddings
+    
+    def _dense_similarity(self, query: str) -> np.ndarray:
+        """Cosine similarity of the query to its nearest vehicles (0 elsewhere), in corpus row order.
+        
+        Every embedded vehicle is ranked by the Hamming distance between
+        sign-bit codes; only the DENSE_RESCORE closest are scored with
+        full-precision cosine.
+        """
+        similarity = np.zeros(len(self.vehicle_texts), dtype=np.float64)
+        
+        query_embedding = self.embedding_model.encode([query], normalize_embeddings=True,
+                                                      convert_to_numpy=True).astype(np.float32, copy=False)
+        distances = hamming_distances(self.dense_codes, pack_signs(query_embedding))
+        candidates = top_k_order(-distances, DENSE_RESCORE)
+        
+        cosine = self.dense_embeddings[candidates] @ query_embedding[0]
+        best = top_k_order(cosine, DENSE_CANDIDATES)
+        similarity[self.dense_rows[candidates[best]]] = np.maximum(cosine[best], 0.0)
+        return similarity
+    
     def semantic_search(self, query: str, preferences: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Perform semantic search using keyword matching and contextual understanding."""
         query_lower = query.lower()
@@ -90,172 +422,140 @@ class SimpleRAG:
         # Extract key terms from query
         query_terms = self._extract_key_terms(query_lower)
         
-        # Score each vehicle
+        # Score every vehicle at once, then load only the best ones
+        scores = self._score_vehicles(query_terms, preferences)
+        if self.dense_embeddings is not None and query.strip():
+            scores = np.minimum(scores + self._dense_similarity(query) * DENSE_WEIGHT, 1.0)
+        rows = [row for row in top_k_order(scores, SEARCH_RESULT_LIMIT) if scores[row] > MIN_RELEVANCE]
+        
+        # Load the winners in one query
+        vehicles = get_vehicles_by_ids(self.database_url, (int(self.vehicle_ids[row]) for row in rows))
         scored_vehicles = []
         
-        for vehicle_id, vehicle_text in self.vehicle_corpus.items():
-            score = self._calculate_text_similarity(query_terms, vehicle_text, preferences)
-            
-            if score > 0.1:  # Minimum relevance threshold
-                vehicle = self.db_manager.get_vehicle_by_id(vehicle_id)
-                if vehicle:
-                    scored_vehicles.append({
-                        'vehicle': vehicle,
-                        'score': score,
-                        'relevance': self._explain_relevance(query_terms, vehicle_text, vehicle)
-                    })
-        
-        # Sort by score
-        scored_vehicles.sort(key=lambda x: x['score'], reverse=True)
-        return scored_vehicles[:10]
+        for row in rows:
+            vehicle = vehicles.get(int(self.vehicle_ids[row]))
+            if vehicle:
+                scored_vehicles.append({
+                    'vehicle': vehicle,
+                    'score': float(scores[row]),
+                    'relevance': self._explain_relevance(query_terms, row, vehicle)
+                })
+        
+        return scored_vehicles
     
     def _extract_key_terms(self, query: str) -> List[str]:
         """Extract meaningful terms from user query."""
-        # Remove common stop words
-        stop_words = {'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you', 'your', 'yours',
-                     'yourself', 'yourselves', 'he', 'him', 'his', 'himself', 'she', 'her', 'hers',
-                     'herself', 'it', 'its', 'itself', 'they', 'them', 'their', 'theirs', 'themselves',
-                     'what', 'which', 'who', 'whom', 'this', 'that', 'these', 'those', 'am', 'is', 'are',
-                     'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'having', 'do', 'does',
-                     'did', 'doing', 'a', 'an', 'the', 'and', 'but', 'if', 'or', 'because', 'as', 'until',
-                     'while', 'of', 'at', 'by', 'for', 'with', 'through', 'during', 'before', 'after',
-                     'above', 'below', 'up', 'down', 'in', 'out', 'on', 'off', 'over', 'under', 'again',
-                     'further', 'then', 'once', 'here', 'there', 'when', 'where', 'why', 'how', 'all',
-                     'any', 'both', 'each', 'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor',
-                     'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very', 's', 't', 'can', 'will',
-                     'just', 'don', 'should', 'now', 'want', 'need', 'looking', 'find', 'get', 'car', 'vehicle'}
-        
-        # Extract words and important phrases
-        words = re.findall(r'\b\w+\b', query)
-        filtered_terms = [word for word in words if word not in stop_words and len(word) > 2]
+        # Extract words (minus stop words) and important phrases
+        filtered_terms = [word for word in TOKEN_RE.findall(query) if word not in STOP_WORDS and len(word) > 2]
         
         # Add important multi-word phrases
-        phrases = [
-            'fuel efficient', 'gas mileage', 'low maintenance', 'family car',
-            'sports car', 'work truck', 'city driving', 'highway driving',
-            'all wheel drive', 'four wheel drive', 'manual transmission',
-            'automatic transmission', 'backup camera', 'navigation system'
-        ]
-        
-        for phrase in phrases:
+        for phrase, terms in QUERY_PHRASES.items():
             if phrase in query:
-                filtered_terms.extend(phrase.split())
+                filtered_terms.extend(terms)
         
         return filtered_terms
     
-    def _calculate_text_similarity(self, query_terms: List[str], vehicle_text: str, preferences: Dict[str, Any]) -> float:
-        """Calculate similarity between query and vehicle using multiple factors."""
-        score = 0.0
-        
-        # Term frequency scoring
-        vehicle_words = vehicle_text.split()
-        vehicle_word_count = Counter(vehicle_words)
-        
-        # TF-IDF style scoring
-        total_terms = len(query_terms)
-        matched_terms = 0
-        
-        for term in query_terms:
-            if term in vehicle_text:
-                matched_terms += 1
-                # Boost score based on term frequency
-                tf = vehicle_word_count.get(term, 0)
-                score += (1 + math.log(1 + tf)) * 0.1
-        
-        # Base relevance from term matching
-        if total_terms > 0:
-            score += (matched_terms / total_terms) * 0.4
+    def _score_vehicles(self, query_terms: List[str], preferences: Dict[str, Any]) -> np.ndarray:
+        """Similarity between the query and every vehicle, in corpus row order, capped at 1.0."""
+        n_docs = len(self.vehicle_texts)
+        score = np.zeros(n_docs, dtype=np.float64)
+        
+        # Query terms in the vocabulary; repeated terms count again, as they do in the query
+        cols = np.fromiter((self.vocab[term] for term in query_terms if term in self.vocab), dtype=np.intp)
+        if cols.size:
+            # BM25 relevance, scaled by the most any vehicle could score for this query
+            weight_scale = 0.3 / (self.bm25_idf[cols].sum() * (BM25_K1 + 1))
+            
+            # Flat score per matched term: base relevance from the share of query
+            # terms matched, plus keyword importance weighting
+            term_bonus = np.fromiter(
+                (0.4 / len(query_terms) + IMPORTANT_KEYWORDS.get(term, 0.0) for term in query_terms if term in self.vocab),
+                dtype=np.float64, count=cols.size
+            )
+            
+            if NUMBA_AVAILABLE:
+                accumulate_postings(self.bm25_ptr, self.bm25_docs, self.bm25_weights, cols,
+                                    weight_scale, term_bonus, score)
+            else:
+                # Concatenated postings of the query's terms, summed per vehicle
+                starts, ends = self.bm25_ptr[cols], self.bm25_ptr[cols + 1]
+                docs = np.concatenate([self.bm25_docs[start:end] for start, end in zip(starts, ends)])
+                weights = np.concatenate([self.bm25_weights[start:end] for start, end in zip(starts, ends)])
+                score += np.bincount(docs, weights=weights * weight_scale + np.repeat(term_bonus, ends - starts),
+                                     minlength=n_docs)
         
         # Preference alignment boost
         if preferences:
-            preference_boost = self._calculate_preference_alignment(preferences, vehicle_text)
-            score += preference_boost * 0.3
-        
-        # Keyword importance weighting
-        important_keywords = {
-            'reliable': 0.15, 'dependable': 0.15, 'toyota': 0.1, 'honda': 0.1,
-            'efficient': 0.12, 'hybrid': 0.12, 'electric': 0.12,
-            'safe': 0.1, 'safety': 0.1, 'family': 0.08,
-            'luxury': 0.1, 'premium': 0.1, 'bmw': 0.08, 'mercedes': 0.08,
-            'affordable': 0.08, 'budget': 0.08, 'economical': 0.08,
-            'spacious': 0.06, 'suv': 0.06, 'truck': 0.06
-        }
-        
-        for term in query_terms:
-            if term in important_keywords and term in vehicle_text:
-                score += important_keywords[term]
-        
-        return min(score, 1.0)  # Cap at 1.0
-    
-    def _calculate_preference_alignment(self, preferences: Dict[str, Any], vehicle_text: str) -> float:
-        """Calculate how well vehicle aligns with extracted preferences."""
-        alignment_score = 0.0
-        
-        # Check priority alignments
-        priorities = preferences.get('priorities', [])
+            score += self._calculate_preference_alignment(preferences) * 0.3
         
-        if 'reliability' in priorities:
-            if any(term in vehicle_text for term in ['reliable', 'dependable', 'toyota', 'honda']):
-                alignment_score += 0.3
-        
-        if 'fuel_economy' in priorities:
-            if any(term in vehicle_text for term in ['hybrid', 'electric', 'efficient', 'eco']):
-                alignment_score += 0.3
+        return np.minimum(score, 1.0)  # Cap at 1.0
+    
+    def _rows_with_any(self, terms) -> np.ndarray:
+        """Boolean mask of the vehicles whose text contains at least one of ``terms``."""
+        mask = np.zeros(len(self.vehicle_texts), dtype=bool)
+        for term in terms:
+            col = self.vocab.get(term)
+            if col is not None:
+                mask[self.bm25_docs[self.bm25_ptr[col]:self.bm25_ptr[col + 1]]] = True
+        return mask
+    
+    def _rows_with_all(self, terms) -> np.ndarray:
+        """Boolean mask of the vehicles whose text contains every one of ``terms``."""
+        mask = np.ones(len(self.vehicle_texts), dtype=bool)
+        for term in set(terms):
+            mask &= self._rows_with_any((term,))
+        return mask
+    
+    def _calculate_preference_alignment(self, preferences: Dict[str, Any]) -> np.ndarray:
+        """Calculate how well each vehicle aligns with extracted preferences, in corpus row order.
         
-        if 'safety' in priorities:
-            if any(term in vehicle_text for term in ['safe', 'safety', 'family']):
-                alignment_score += 0.2
+        Reads the postings of the few preference terms instead of scanning
+        every vehicle's text.
+        """
+        alignment_score = np.zeros(len(self.vehicle_texts), dtype=np.float64)
         
-        if 'luxury' in priorities:
-            if any(term in vehicle_text for term in ['luxury', 'premium', 'bmw', 'mercedes', 'audi']):
-                alignment_score += 0.3
+        # Check priority alignments
+        priorities = set(preferences.get('priorities') or ())
+        for priority, (terms, boost) in PRIORITY_TERMS.items():
+            if priority in priorities:
+                alignment_score[self._rows_with_any(terms)] += boost
         
         # Check vehicle type alignment
         if preferences.get('vehicle_type'):
-            vehicle_type = preferences['vehicle_type']
-            if vehicle_type in vehicle_text:
-                alignment_score += 0.2
+            vehicle_type = preferences['vehicle_type'].lower()
+            alignment_score[self._rows_with_all(TOKEN_RE.findall(vehicle_type))] += 0.2
         
         # Check make alignment
         if preferences.get('make'):
             make = preferences['make'].lower()
-            if make in vehicle_text:
-                alignment_score += 0.4
+            alignment_score[self._rows_with_all(TOKEN_RE.findall(make))] += 0.4
         
         return alignment_score
     
-    def _explain_relevance(self, query_terms: List[str], vehicle_text: str, vehicle) -> str:
-        """Explain why this vehicle is relevant to the query."""
-        matches = []
-        
-        # Find direct term matches
-        for term in query_terms:
-            if term in vehicle_text:
-                matches.append(term)
+    def _has_term(self, row: int, term: str) -> bool:
+        """Whether the vehicle at corpus ``row`` contains ``term``, by binary search of its postings."""
+        col = self.vocab.get(term)
+        if col is None:
+            return False
+        postings = self.bm25_docs[self.bm25_ptr[col]:self.bm25_ptr[col + 1]]  # Rows ascending
+        i = np.searchsorted(postings, row)
+        return i < len(postings) and postings[i] == row
+    
+    def _explain_relevance(self, query_terms: List[str], row: int, vehicle) -> str:
+        """Explain why the vehicle at corpus ``row`` is relevant to the query."""
+        # Find direct term matches in the precomputed index, as in scoring
+        matches = [term for term in query_terms if self._has_term(row, term)]
         
         # Build explanation
         if not matches:
             return "General compatibility with your requirements"
         
-        explanation_parts = []
-        
-        if any(term in matches for term in ['reliable', 'dependable']):
-            explanation_parts.append("Known for reliability")
-        
-        if any(term in matches for term in ['efficient', 'hybrid', 'electric', 'eco']):
-            explanation_parts.append("Excellent fuel economy")
-        
-        if any(term in matches for term in ['safe', 'safety', 'family']):
-            explanation_parts.append("Strong safety ratings")
-        
-        if any(term in matches for term in ['luxury', 'premium']):
-            explanation_parts.append("Premium features and comfort")
-        
-        if any(term in matches for term in ['budget', 'affordable', 'economical']):
-            explanation_parts.append("Great value for money")
+        # Terms come from the lowercased query, so the make compares lowercased too
+        matched = set(matches)
+        explanation_parts = [reason for terms, reason in RELEVANCE_REASONS if not terms.isdisjoint(matched)]
         
         # Vehicle-specific matches
-        if vehicle.make.lower() in [m.lower() for m in matches]:
+        if vehicle.make.lower() in matched:
             explanation_parts.append(f"Matches your {vehicle.make} preference")
         
         return " • ".join(explanation_parts) if explanation_parts else f"Matches {len(matches)} of your search criteria"
\ No newline at end of file
@@ -1,73 +1,55 @@
 """Input validation utilities for CarFinder."""
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 import re
 
-def validate_budget(budget: Any) -> Optional[float]:
-    """Validate budget input."""
-    if budget is None or budget == "":
+# 17 characters, alphanumeric except I, O and Q
+VIN_RE = re.compile(r'^[A-HJ-NPR-Z0-9]{17}$')
+
+# Control characters except newlines and tabs
+CONTROL_CHARS_RE = re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]')
+
+# Known makes, for reference; unknown makes are still accepted
+KNOWN_MAKES = frozenset({
+    'Toyota', 'Honda', 'Ford', 'Chevrolet', 'BMW', 'Mercedes-Benz',
+    'Audi', 'Volkswagen', 'Subaru', 'Mazda', 'Hyundai', 'Kia',
+    'Nissan', 'Tesla', 'Jeep', 'Ram', 'GMC', 'Cadillac', 'Lexus',
+    'Acura', 'Infiniti', 'Lincoln', 'Buick', 'Chrysler', 'Dodge',
+    'Mitsubishi', 'Volvo', 'Jaguar', 'Land Rover', 'Porsche',
+    'Maserati', 'Ferrari', 'Lamborghini', 'Bentley', 'Rolls-Royce'
+})
+
+VALID_FUEL_TYPES = frozenset({'Gasoline', 'Hybrid', 'Electric', 'Diesel', 'CNG', 'Ethanol'})
+
+def _validate_number(value: Any, cast: Callable[[Any], Any], low: float, high: float) -> Optional[Any]:
+    """``cast(value)`` if it converts and lies within [low, high], else None."""
+    if value is None or value == "":
         return None
     
     try:
-        budget_float = float(budget)
-        if budget_float < 0:
-            return None
-        if budget_float > 1000000:  # Reasonable upper limit
-            return None
-        return budget_float
+        number = cast(value)
     except (ValueError, TypeError):
         return None
+    return number if low <= number <= high else None
+
+def validate_budget(budget: Any) -> Optional[float]:
+    """Validate budget input."""
+    return _validate_number(budget, float, 0, 1000000)  # Reasonable upper limit
 
 def validate_year(year: Any) -> Optional[int]:
     """Validate year input."""
-    if year is None or year == "":
-        return None
-    
-    try:
-        year_int = int(year)
-        if year_int < 1900 or year_int > 2030:
-            return None
-        return year_int
-    except (ValueError, TypeError):
-        return None
+    return _validate_number(year, int, 1900, 2030)
 
 def validate_mileage(mileage: Any) -> Optional[int]:
     """Validate mileage input."""
-    if mileage is None or mileage == "":
-        return None
-    
-    try:
-        mileage_int = int(mileage)
-        if mileage_int < 0 or mileage_int > 500000:  # Reasonable limits
-            return None
-        return mileage_int
-    except (ValueError, TypeError):
-        return None
+    return _validate_number(mileage, int, 0, 500000)  # Reasonable limits
 
 def validate_mpg(mpg: Any) -> Optional[int]:
     """Validate MPG input."""
-    if mpg is None or mpg == "":
-        return None
-    
-    try:
-        mpg_int = int(mpg)
-        if mpg_int < 5 or mpg_int > 150:  # Reasonable limits
-            return None
-        return mpg_int
-    except (ValueError, TypeError):
-        return None
+    return _validate_number(mpg, int, 5, 150)  # Reasonable limits
 
 def validate_safety_rating(rating: Any) -> Optional[float]:
     """Validate safety rating input."""
-    if rating is None or rating == "":
-        return None
-    
-    try:
-        rating_float = float(rating)
-        if rating_float < 0 or rating_float > 5:
-            return None
-        return rating_float
-    except (ValueError, TypeError):
-        return None
+    return _validate_number(rating, float, 0, 5)
 
 def validate_vin(vin: str) -> Optional[str]:
     """Validate VIN (Vehicle Identification Number)."""
@@ -79,7 +61,7 @@ def validate_vin(vin: str) -> Optional[str]:
     if len(vin) != 17:
         return None
     
-    if not re.match(r'^[A-HJ-NPR-Z0-9]{17}$', vin):
+    if not VIN_RE.match(vin):
         return None
     
     return vin
@@ -91,17 +73,7 @@ def validate_make(make: str) -> Optional[str]:
     
     make = make.strip().title()
     
-    # List of known makes for validation
-    known_makes = {
-        'Toyota', 'Honda', 'Ford', 'Chevrolet', 'BMW', 'Mercedes-Benz',
-        'Audi', 'Volkswagen', 'Subaru', 'Mazda', 'Hyundai', 'Kia',
-        'Nissan', 'Tesla', 'Jeep', 'Ram', 'GMC', 'Cadillac', 'Lexus',
-        'Acura', 'Infiniti', 'Lincoln', 'Buick', 'Chrysler', 'Dodge',
-        'Mitsubishi', 'Volvo', 'Jaguar', 'Land Rover', 'Porsche',
-        'Maserati', 'Ferrari', 'Lamborghini', 'Bentley', 'Rolls-Royce'
-    }
-    
-    # Allow unknown makes but with reasonable length
+    # Allow unknown makes (see KNOWN_MAKES) but with reasonable length
     if len(make) > 50:
         return None
     
@@ -114,11 +86,7 @@ def validate_fuel_type(fuel_type: str) -> Optional[str]:
     
     fuel_type = fuel_type.strip().title()
     
-    valid_fuel_types = {
-        'Gasoline', 'Hybrid', 'Electric', 'Diesel', 'CNG', 'Ethanol'
-    }
-    
-    if fuel_type not in valid_fuel_types:
+    if fuel_type not in VALID_FUEL_TYPES:
         return None
     
     return fuel_type
@@ -147,7 +115,7 @@ def sanitize_text_input(text: str, max_length: int = 1000) -> str:
     text = str(text).strip()
     
     # Remove control characters except newlines and tabs
-    text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
+    text = CONTROL_CHARS_RE.sub('', text)
     
     # Limit length
     if len(text) > max_length:
@@ -155,59 +123,40 @@ def sanitize_text_input(text: str, max_length: int = 1000) -> str:
     
     return text
 
+def _validate_location(location: Any) -> Optional[str]:
+    """Validate location input (simple text)."""
+    return sanitize_text_input(location, 200) if location and isinstance(location, str) else None
+
+def _validate_query(query: Any) -> Optional[str]:
+    """Validate free-text query input."""
+    return sanitize_text_input(query, 500) if query and isinstance(query, str) else None
+
+# Preference key -> validator returning the cleaned value, or None to drop it
+PREFERENCE_VALIDATORS: Dict[str, Callable[[Any], Any]] = {
+    'budget_max': validate_budget,
+    'budget_min': validate_budget,
+    'min_year': validate_year,
+    'max_year': validate_year,
+    'make': validate_make,
+    'fuel_type': validate_fuel_type,
+    'max_mileage': validate_mileage,
+    'min_mpg': validate_mpg,
+    'min_safety_rating': validate_safety_rating,
+    'desired_features': validate_features,
+    'location': _validate_location,
+    'query': _validate_query,
+}
+
 def validate_preferences(preferences: Dict[str, Any]) -> Dict[str, Any]:
-    """Validate and clean user preferences."""
-    cleaned = {}
-    
-    # Budget validation
-    if 'budget_max' in preferences:
-        cleaned['budget_max'] = validate_budget(preferences['budget_max'])
-    
-    if 'budget_min' in preferences:
-        cleaned['budget_min'] = validate_budget(preferences['budget_min'])
+    """Validate and clean user preferences.
     
-    # Year validation
-    if 'min_year' in preferences:
-        cleaned['min_year'] = validate_year(preferences['min_year'])
-    
-    if 'max_year' in preferences:
-        cleaned['max_year'] = validate_year(preferences['max_year'])
-    
-    # Make validation
-    if 'make' in preferences:
-        cleaned['make'] = validate_make(preferences['make'])
-    
-    # Fuel type validation
-    if 'fuel_type' in preferences:
-        cleaned['fuel_type'] = validate_fuel_type(preferences['fuel_type'])
-    
-    # Mileage validation
-    if 'max_mileage' in preferences:
-        cleaned['max_mileage'] = validate_mileage(preferences['max_mileage'])
-    
-    # MPG validation
-    if 'min_mpg' in preferences:
-        cleaned['min_mpg'] = validate_mpg(preferences['min_mpg'])
-    
-    # Safety rating validation
-    if 'min_safety_rating' in preferences:
-        cleaned['min_safety_rating'] = validate_safety_rating(preferences['min_safety_rating'])
-    
-    # Features validation
-    if 'desired_features' in preferences:
-        cleaned['desired_features'] = validate_features(preferences['desired_features'])
-    
-    # Location validation (simple text)
-    if 'location' in preferences:
-        location = preferences['location']
-        if location and isinstance(location, str):
-            cleaned['location'] = sanitize_text_input(location, 200)
-    
-    # Query validation
-    if 'query' in preferences:
-        query = preferences['query']
-        if query and isinstance(query, str):
-            cleaned['query'] = sanitize_text_input(query, 500)
-    
-    # Remove None values
-    return {k: v for k, v in cleaned.items() if v is not None}
\ No newline at end of file
+    Keys without a validator in PREFERENCE_VALIDATORS are dropped, as are
+    values that fail validation.
+    """
+    cleaned = {}
+    for key, validator in PREFERENCE_VALIDATORS.items():
+        if key in preferences:
+            value = validator(preferences[key])
+            if value is not None:
+                cleaned[key] = value
+    return cleaned
@@ -1,10 +1,21 @@
 #!/usr/bin/env python3
 """Ingest sample vehicle data into CarFinder database."""
 
+import ast
 import sys
 import csv
 import json
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import islice
 from pathlib import Path
+from typing import Iterator
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Add the app directory to Python path
 project_root = Path(__file__).parent.parent
@@ -12,6 +23,71 @@ sys.path.append(str(project_root))
 
 from app.utils.config import load_config, get_database_url
 from app.models.database import get_database_manager
+from app.utils.db import insert_new_vehicles
+
+# CSV rows read per block, the block size from which parsing moves to worker
+# processes, and rows sent to a worker per task
+PARSE_BLOCK = 10000
+PARALLEL_PARSE_MIN_ROWS = 2000
+PARSE_CHUNKSIZE = 256
+
+def parse_features(features_str: str) -> list:
+    """Features of a CSV row: a Python- or JSON-style list literal ([] if absent or malformed)."""
+    if not features_str or not features_str.startswith('['):
+        return []
+    try:
+        features = ast.literal_eval(features_str)
+    except (ValueError, SyntaxError):
+        return []
+    return features if isinstance(features, list) else []
+
+def features_json(features: list) -> str:
+    """Serialize a features list for the features TEXT column."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(features).decode()
+    return json.dumps(features)
+
+def parse_row(row: dict) -> dict:
+    """Vehicle column values for one CSV row."""
+    # Parse features from the list literal (Python-style quotes in the sample data)
+    features = parse_features(row.get('features', '[]'))
+    
+    return {
+        'make': row['make'],
+        'model': row['model'],
+        'year': int(row['year']) if row['year'] else None,
+        'price': float(row['price']) if row['price'] else None,
+        'mileage': int(row['mileage']) if row['mileage'] else None,
+        'fuel_type': row['fuel_type'] if row['fuel_type'] else None,
+        'transmission': row['transmission'] if row['transmission'] else None,
+        'location': row['location'] if row['location'] else None,
+        'safety_rating': float(row['safety_rating']) if row['safety_rating'] else None,
+        'mpg_city': int(row['mpg_city']) if row['mpg_city'] else None,
+        'mpg_highway': int(row['mpg_highway']) if row['mpg_highway'] else None,
+        'vin': row['vin'] if row['vin'] else None,
+        'description': row['description'] if row['description'] else None,
+        'features': features_json(features)
+    }
+
+def read_vehicle_rows(path: Path) -> Iterator[dict]:
+    """Parsed vehicle rows of a listings CSV, in file order, read PARSE_BLOCK rows at a time.
+    
+    Blocks of at least PARALLEL_PARSE_MIN_ROWS rows are parsed in worker
+    processes; smaller ones are parsed inline, where starting a pool would
+    cost more than it saves.
+    """
+    with open(path, 'r', encoding='utf-8') as file, ExitStack() as stack:
+        reader = csv.DictReader(file)
+        pool = None
+        
+        while block := list(islice(reader, PARSE_BLOCK)):
+            if len(block) < PARALLEL_PARSE_MIN_ROWS:
+                yield from map(parse_row, block)
+                continue
+            
+            if pool is None:
+                pool = stack.enter_context(ProcessPoolExecutor())
+            yield from pool.map(parse_row, block, chunksize=PARSE_CHUNKSIZE)
 
 def main():
     """Ingest sample vehicle data."""
@@ -33,49 +109,18 @@ def main():
     print(f"📁 Loading data from: {sample_data_path}")
     
     try:
-        vehicles_added = 0
+        rows_read = 0
         
-        with open(sample_data_path, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            
-            for row in reader:
-                # Parse features from JSON string
-                features_str = row.get('features', '[]')
-                try:
-                    features = json.loads(features_str.replace("'", '"'))
-                except (json.JSONDecodeError, AttributeError):
-                    features = []
-                
-                # Prepare vehicle data
-                vehicle_data = {
-                    'make': row['make'],
-                    'model': row['model'],
-                    'year': int(row['year']) if row['year'] else None,
-                    'price': float(row['price']) if row['price'] else None,
-                    'mileage': int(row['mileage']) if row['mileage'] else None,
-                    'fuel_type': row['fuel_type'] if row['fuel_type'] else None,
-                    'transmission': row['transmission'] if row['transmission'] else None,
-                    'location': row['location'] if row['location'] else None,
-                    'safety_rating': float(row['safety_rating']) if row['safety_rating'] else None,
-                    'mpg_city': int(row['mpg_city']) if row['mpg_city'] else None,
-                    'mpg_highway': int(row['mpg_highway']) if row['mpg_highway'] else None,
-                    'vin': row['vin'] if row['vin'] else None,
-                    'description': row['description'] if row['description'] else None,
-                    'features': json.dumps(features)
-                }
-                
-                # Check if vehicle already exists by VIN
-                if vehicle_data['vin']:
-                    existing = db_manager.get_vehicle_by_vin(vehicle_data['vin'])
-                    if existing:
-                        print(f"⏭️  Skipping existing vehicle: {vehicle_data['year']} {vehicle_data['make']} {vehicle_data['model']}")
-                        continue
-                
-                # Add vehicle to database
-                vehicle = db_manager.add_vehicle(vehicle_data)
-                vehicles_added += 1
-                
-                print(f"✅ Added: {vehicle.year} {vehicle.make} {vehicle.model} (ID: {vehicle.id})")
+        def read_rows():
+            nonlocal rows_read
+            for vehicle_data in read_vehicle_rows(sample_data_path):
+                rows_read += 1
+                yield vehicle_data
+        
+        # Streamed in batches within one transaction; vehicles whose VIN is already stored are skipped
+        vehicles_added = insert_new_vehicles(database_url, read_rows())
+        if vehicles_added < rows_read:
+            print(f"⏭️  Skipped {rows_read - vehicles_added} existing vehicles")
         
         print(f"\n🎉 Successfully added {vehicles_added} vehicles to the database!")
         
@@ -9,7 +9,9 @@ project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
 from app.utils.config import load_config
-from app.rag.retriever import VehicleRetriever
+from app.utils.db import get_shared_database_manager
+from app.utils.simple_rag import SimpleRAG
+from app.rag.retriever import get_retriever
 
 def main():
     """Update the vehicle embeddings and search index."""
@@ -21,11 +23,14 @@ def main():
     
     try:
         print("🔍 Initializing retriever...")
-        retriever = VehicleRetriever(config)
+        retriever = get_retriever(config)
         
         print("🔄 Updating embeddings and search index...")
         retriever.update_index()
         
+        print("🔄 Refreshing the chat search embedding cache...")
+        SimpleRAG(get_shared_database_manager(), encode_missing=True)  # Encodes new or changed vehicles, saves the cache
+        
         print("✅ Embeddings updated successfully!")
         print("\n💡 You can now run the Streamlit app with better search capabilities.")
         
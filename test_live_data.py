@@ -10,13 +10,8 @@ from pathlib import Path
 app_dir = Path(__file__).parent / 'app'
 sys.path.insert(0, str(app_dir))
 
-try:
-    from utils.config import load_config
-    print("✅ Config module loaded")
-    
-    from models.database import DatabaseManager
-    print("✅ Database manager loaded")
-    
+def _check_imports():
+    """Import the live data sources (the slow part) and return the aggregator class."""
     from data_sources.base import VehicleDataSource, VehicleListing
     print("✅ Base data source classes loaded")
     
@@ -30,8 +25,16 @@ try:
     
     print("\n🎉 All live data components loaded successfully!")
     print("📦 Ready for real-time vehicle data integration")
+    return VehicleDataAggregator
+
+try:
+    from utils.config import load_config
+    print("✅ Config module loaded")
+    
+    from models.database import DatabaseManager
+    print("✅ Database manager loaded")
     
-    # Test basic functionality
+    # Test basic functionality; the database check runs before the data sources load
     config = load_config()
     db = DatabaseManager(f"sqlite:///{config['database_path']}")
     
@@ -45,6 +48,7 @@ try:
         print("💡 Run 'python scripts/setup_database.py' to initialize")
     
     # Test aggregator
+    VehicleDataAggregator = _check_imports()
     aggregator = VehicleDataAggregator(config)
     stats = aggregator.get_source_statistics()
     print(f"🌐 {stats['total_sources']} live data sources configured")
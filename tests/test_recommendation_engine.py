@@ -0,0 +1,102 @@
+"""Top-k selection and batch scoring in the recommendation engine."""
+import numpy as np
+import pytest
+
+from app.recommendations.engine import RecommendationEngine, top_k_order
+
+
+class TestTopKOrder:
+    def test_matches_stable_descending_sort(self):
+        scores = np.random.default_rng(0).integers(0, 5, size=200).astype(np.float64)
+        expected = np.argsort(-scores, kind='stable')
+        for k in (1, 7, 50, 199):
+            np.testing.assert_array_equal(top_k_order(scores, k), expected[:k])
+    
+    def test_ties_at_the_cut_are_taken_in_input_order(self):
+        scores = np.array([0.5, 0.9, 0.5, 0.5, 0.1])
+        np.testing.assert_array_equal(top_k_order(scores, 2), [1, 0])
+        np.testing.assert_array_equal(top_k_order(scores, 3), [1, 0, 2])
+    
+    @pytest.mark.parametrize('k', [5, 6, 100])
+    def test_k_at_least_n_returns_everything_sorted(self, k):
+        scores = np.array([0.2, 0.8, 0.2, 0.6, 0.8])
+        np.testing.assert_array_equal(top_k_order(scores, k), [1, 4, 3, 0, 2])
+    
+    def test_k_zero_or_empty_scores(self):
+        assert len(top_k_order(np.array([0.3, 0.1]), 0)) == 0
+        assert len(top_k_order(np.array([]), 3)) == 0
+
+
+def make_results():
+    vehicles = [
+        {'make': 'Toyota', 'price': 21000, 'year': 2022, 'mileage': 15000, 'mpg_city': 51, 'mpg_highway': 53,
+         'safety_rating': 5, 'features': ['navigation', 'backup camera']},
+        {'make': 'BMW', 'price': 52000, 'year': 2016, 'mileage': 90000, 'mpg_city': 20, 'mpg_highway': 28,
+         'safety_rating': 4, 'features': ['heated seats']},
+        {'make': 'Ford', 'price': None, 'year': None, 'mileage': None, 'mpg_city': None, 'mpg_highway': 25,
+         'safety_rating': None, 'features': []},
+        {'make': 'Honda', 'price': 29500, 'year': 2019, 'mileage': 45000, 'mpg_city': 28, 'mpg_highway': 34,
+         'safety_rating': 0, 'features': ['sunroof', 'bluetooth', 'navigation']},
+    ]
+    return [{'vehicle': vehicle, 'score': score} for vehicle, score in zip(vehicles, (0.9, 0.5, 0.7, 0.6))]
+
+
+@pytest.mark.parametrize('preferences', [
+    {},
+    {'budget_max': 30000, 'desired_features': ['navigation', 'sunroof']},
+    {'budget_max': 25000, 'weights': {'price': 3, 'fuel_efficiency': 1}},
+])
+def test_batch_scores_match_per_vehicle_scores(preferences):
+    recommender = RecommendationEngine({})
+    results = make_results()
+    weights = recommender._get_scoring_weights(preferences)
+    
+    recommendations = recommender.recommend(results, preferences)
+    
+    assert len(recommendations) == len(results)
+    for recommendation in recommendations:
+        result = next(r for r in results if r['vehicle'] is recommendation.vehicle)
+        objective, scores = recommender._calculate_scores(result['vehicle'], preferences, weights)
+        assert recommendation.objective_score == pytest.approx(objective, abs=1e-12)
+        assert recommendation.score == pytest.approx(0.6 * objective + 0.4 * result['score'], abs=1e-12)
+        for name, score in scores.items():
+            assert recommendation.scores_breakdown[f'{name}_score'] == pytest.approx(score, abs=1e-12)
+    
+    final_scores = [recommendation.score for recommendation in recommendations]
+    assert final_scores == sorted(final_scores, reverse=True)
+
+
+def test_per_vehicle_scores_at_curve_points_match_the_original_steps():
+    recommender = RecommendationEngine({})
+    preferences = {'budget_max': 30000, 'desired_features': ['navigation', 'sunroof']}
+    vehicle = {'make': 'Honda', 'price': 21000, 'year': 2019, 'mileage': 60000, 'mpg_city': 28,
+               'mpg_highway': 32, 'safety_rating': 4, 'features': ['navigation', 'bluetooth']}
+    
+    _, scores = recommender._calculate_scores(vehicle, preferences, recommender._get_scoring_weights(preferences))
+    
+    assert scores['price'] == pytest.approx(1.0)  # At 0.7 x budget
+    assert scores['reliability'] == pytest.approx(0.92 * 0.95 * 0.95)  # Five years old, 60k miles
+    assert scores['fuel_efficiency'] == pytest.approx(0.8)  # 30 MPG average
+    assert scores['safety'] == pytest.approx(0.8)
+    assert scores['features'] == pytest.approx(0.5 + 2 * 0.05)  # One of two desired, two common-feature bonuses
+
+
+def test_limit_keeps_the_best_in_order():
+    recommender = RecommendationEngine({})
+    everything = recommender.recommend(make_results(), {'budget_max': 30000})
+    top_two = recommender.recommend(make_results(), {'budget_max': 30000}, limit=2)
+    
+    assert [r.vehicle for r in top_two] == [r.vehicle for r in everything[:2]]
+
+
+def test_feature_score_counts_only_listed_features():
+    recommender = RecommendationEngine({})
+    preferences = {'desired_features': ['sunroof']}
+    weights = recommender._get_scoring_weights(preferences)
+    
+    def features_score(features):
+        return recommender._calculate_scores({'make': 'Kia', 'features': features}, preferences, weights)[1]['features']
+    
+    assert features_score(['sunroof', 'bluetooth']) == pytest.approx(1.0)  # Capped at 1
+    assert features_score(['tow hitch']) == pytest.approx(0.0)  # Features listed, none that matter
+    assert features_score([]) == pytest.approx(0.3)  # No features listed
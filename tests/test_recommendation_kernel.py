@@ -0,0 +1,50 @@
+"""The compiled scoring kernel against the NumPy scorers."""
+import numpy as np
+import pytest
+
+from app.recommendations import engine
+from app.recommendations.engine import COMPILED_MIN_BATCH, RecommendationEngine
+
+pytestmark = pytest.mark.skipif(not engine.NUMBA_AVAILABLE, reason="numba not installed")
+
+
+def random_results(rng, n):
+    makes = ['Toyota', 'Honda', 'Ford', 'BMW', 'Tesla', None]
+    features = ['backup camera', 'bluetooth', 'navigation', 'heated seats', 'sunroof']
+    
+    def maybe(value):
+        return None if rng.random() < 0.1 else value
+    
+    results = []
+    for _ in range(n):
+        vehicle = {
+            'make': makes[rng.integers(len(makes))],
+            'price': maybe(float(rng.uniform(5000, 80000))),
+            'year': maybe(int(rng.integers(2005, 2025))),
+            'mileage': maybe(int(rng.integers(0, 200000))),
+            'mpg_city': maybe(int(rng.integers(10, 60))),
+            'mpg_highway': maybe(int(rng.integers(15, 70))),
+            'safety_rating': maybe(float(rng.integers(0, 6))),
+            'features': list(rng.choice(features, size=rng.integers(0, 4), replace=False)),
+        }
+        results.append({'vehicle': vehicle, 'score': float(rng.random())})
+    return results
+
+
+@pytest.mark.parametrize('preferences', [
+    {},
+    {'budget_max': 30000, 'desired_features': ['navigation', 'sunroof']},
+    {'budget_max': 45000, 'weights': {'price': 2, 'safety': 1}},
+])
+def test_score_batch_matches_numpy_scorers(preferences):
+    recommender = RecommendationEngine({})
+    rng = np.random.default_rng(7)
+    columns = recommender._vectorize_results(random_results(rng, 2 * COMPILED_MIN_BATCH), preferences)
+    weights = recommender._get_scoring_weights(preferences)
+    
+    expected_scores = recommender._score_matrix(columns, preferences)
+    expected_objective = np.clip(weights.vector @ expected_scores, 0, 1)
+    scores, objective = recommender._score_compiled(columns, preferences, weights)
+    
+    np.testing.assert_allclose(scores, expected_scores, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(objective, expected_objective, rtol=0, atol=1e-12)
@@ -0,0 +1,76 @@
+"""BM25 ranking in SimpleRAG, over an in-memory vehicle table.
+
+Needs app.models.database, which this tree does not ship (there is no
+app/models package), so the module is skipped until the models are added.
+"""
+import json
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+simple_rag = pytest.importorskip("app.utils.simple_rag")
+
+VEHICLES = [
+    {'id': 1, 'make': 'Toyota', 'model': 'Camry', 'year': 2021, 'price': 24000, 'mileage': 30000,
+     'fuel_type': 'Hybrid', 'description': 'Hybrid sedan, reliable commuter', 'features': json.dumps(['Navigation'])},
+    {'id': 2, 'make': 'Tesla', 'model': 'Model 3', 'year': 2022, 'price': 39000, 'mileage': 12000,
+     'fuel_type': 'Electric', 'description': 'Long range', 'features': json.dumps(['Autopilot'])},
+    {'id': 3, 'make': 'Ford', 'model': 'F-150', 'year': 2018, 'price': 31000, 'mileage': 70000,
+     'fuel_type': 'Gasoline', 'description': 'Tow package', 'features': None},
+    {'id': 4, 'make': 'Honda', 'model': 'CR-V', 'year': 2019, 'price': 26000, 'mileage': 41000,
+     'fuel_type': 'Gasoline', 'description': None, 'features': json.dumps(['Backup Camera', 'Sunroof'])},
+    {'id': 5, 'make': 'BMW', 'model': 'X5', 'year': 2017, 'price': 45000, 'mileage': 60000,
+     'fuel_type': 'Gasoline', 'description': 'Sunroof, sunroof and more sunroof', 'features': None},
+]
+
+
+@pytest.fixture
+def rag(monkeypatch):
+    frame = pd.DataFrame(VEHICLES)
+    
+    def iter_vehicles_frames(database_url, columns, chunksize):
+        # Two-row chunks exercise the streamed corpus build
+        for start in range(0, len(frame), 2):
+            yield frame.iloc[start:start + 2][list(columns)]
+    
+    def get_vehicles_by_ids(database_url, vehicle_ids):
+        wanted = set(vehicle_ids)
+        return {vehicle['id']: SimpleNamespace(**vehicle) for vehicle in VEHICLES if vehicle['id'] in wanted}
+    
+    monkeypatch.setattr(simple_rag, 'iter_vehicles_frames', iter_vehicles_frames)
+    monkeypatch.setattr(simple_rag, 'get_vehicles_by_ids', get_vehicles_by_ids)
+    monkeypatch.setattr(simple_rag, 'DENSE_SEARCH_AVAILABLE', False)
+    return simple_rag.SimpleRAG(None, 'sqlite://')
+
+
+def ranked_ids(rag, query, preferences=None):
+    return [result['vehicle'].id for result in rag.semantic_search(query, preferences or {})]
+
+
+def test_corpus_covers_every_vehicle(rag):
+    assert sorted(rag.vehicle_corpus) == [vehicle['id'] for vehicle in VEHICLES]
+
+
+def test_rare_term_ranks_its_vehicle_first(rag):
+    assert ranked_ids(rag, "tow package")[0] == 3
+    assert ranked_ids(rag, "electric car")[0] == 2
+
+
+def test_repeated_term_outranks_single_mention(rag):
+    ranking = ranked_ids(rag, "sunroof")
+    assert ranking.index(5) < ranking.index(4)
+
+
+def test_make_preference_boosts_that_make(rag):
+    assert ranked_ids(rag, "reliable hybrid", {'make': 'Toyota'})[0] == 1
+
+
+def test_unknown_terms_return_nothing(rag):
+    assert ranked_ids(rag, "zzzz qqqq") == []
+
+
+def test_scores_are_descending_and_bounded(rag):
+    scores = [result['score'] for result in rag.semantic_search("reliable family sunroof", {})]
+    assert scores == sorted(scores, reverse=True)
+    assert all(simple_rag.MIN_RELEVANCE < score <= 1.0 for score in scores)
@@ -0,0 +1,46 @@
+"""Deduplication of combined live and local results.
+
+Needs requests and app.models.database, which this tree does not ship
+(there is no app/models package), so the module is skipped until both are
+available.
+"""
+import pytest
+
+vehicle_data = pytest.importorskip("app.services.vehicle_data")
+
+
+@pytest.fixture
+def service():
+    # Deduplication needs no config, database or sources, so skip __init__
+    return vehicle_data.VehicleDataService.__new__(vehicle_data.VehicleDataService)
+
+
+def listing(service, make, vin, mileage=30000):
+    return service._add_match_keys({'make': make, 'model': 'Camry', 'year': 2020, 'mileage': mileage,
+                                    'price': 21000, 'vin': vin})
+
+
+def tricky_results(service):
+    return [
+        listing(service, 'Toyota', 'X'),
+        listing(service, 'Toyota', 'Y'),               # Same key as the first: dropped
+        listing(service, 'Toyota', 'Y', mileage=40000),  # VIN Y was only seen on a dropped row: kept
+        listing(service, 'Honda', 'X'),                # VIN of the first: dropped
+        listing(service, 'Honda', 'W'),                # Key only seen on a dropped row: kept
+    ]
+
+
+@pytest.mark.parametrize('filler', [0, 59, 60, 200])
+def test_survivors_do_not_depend_on_result_count(service, filler):
+    results = tricky_results(service) + [listing(service, f'Make{i}', f'F{i}') for i in range(filler)]
+    
+    unique = service._deduplicate_results(results)
+    
+    assert unique == [results[0], results[2], results[4]] + results[5:]
+
+
+def test_listings_without_vin_dedupe_on_the_similarity_key(service):
+    results = [listing(service, 'Toyota', None), listing(service, 'TOYOTA', ''),
+               listing(service, 'Toyota', None, mileage=1)]
+    
+    assert service._deduplicate_results(results) == [results[0], results[2]]